@@ -1,4 +1,32 @@
 from django.contrib import admin
-from .models import Attendance
+from .models import Attendance, AttendanceDailySummary, AttendanceEvent
+from .utils import get_daily_summary_service
 
-admin.site.register(Attendance)
\ No newline at end of file
+
+@admin.register(Attendance)
+class AttendanceAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        previous_date = form.initial.get('date') if change else None
+        super().save_model(request, obj, form, change)
+        daily_summary_service = get_daily_summary_service()
+        daily_summary_service.refresh_summary(obj.employee, obj.date)
+        if previous_date and previous_date != obj.date:
+            daily_summary_service.refresh_summary(obj.employee, previous_date)
+
+    def delete_model(self, request, obj):
+        employee, target_date = obj.employee, obj.date
+        super().delete_model(request, obj)
+        get_daily_summary_service().refresh_summary(employee, target_date)
+
+
+@admin.register(AttendanceDailySummary)
+class AttendanceDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'date', 'status', 'presence', 'lateness', 'session_count', 'is_frozen', 'version')
+    list_filter = ('is_frozen', 'status', 'date')
+
+
+@admin.register(AttendanceEvent)
+class AttendanceEventAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'direction', 'timestamp', 'source', 'result', 'detail', 'received_at')
+    list_filter = ('result', 'direction', 'source')
+    search_fields = ('idempotency_key',)
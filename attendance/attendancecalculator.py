@@ -1,35 +1,39 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 from django.utils import timezone
 from employee_tracking_system.utils.time_utils import TimeCalculator
 from employee_tracking_system.services.working_hours_service import WorkingHoursService
-from .models import Attendance  
-from typing import List, Optional
+from .attendancereportengine import to_epoch_us
+from .attendancerow import AttendanceLike
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
 
+class DailyAttendanceResult:
+    __slots__ = ('lateness', 'work_duration', 'status', 'last_action_time')
+
+    def __init__(self, lateness: timedelta, work_duration: timedelta, status: str, last_action_time: Optional[datetime]):
+        self.lateness = lateness
+        self.work_duration = work_duration
+        self.status = status
+        self.last_action_time = last_action_time
+
+
 class AttendanceCalculator:
 
     @staticmethod
     def calculate_lateness(
-        attendances: List['Attendance'],
+        attendances: List[AttendanceLike],
         now: Optional[datetime] = None,
         include_no_check_in: bool = False,
         registration_dt: Optional[datetime] = None 
     ) -> timedelta:
-        working_hours = WorkingHoursService.get_working_hours()
-
         if now is None:
             now = timezone.localtime(timezone.now())
         today = now.date()
 
-
-        start_of_work = timezone.localtime(timezone.make_aware(
-            datetime.combine(today, working_hours['start_time'])
-        ))
-        end_of_work = timezone.localtime(timezone.make_aware(
-            datetime.combine(today, working_hours['end_time'])
-        ))
+        start_of_work, end_of_work = WorkingHoursService.get_work_bounds(today)
 
         if now > end_of_work:
             scheduled_end = end_of_work
@@ -78,17 +82,14 @@ class AttendanceCalculator:
 
     @staticmethod
     def calculate_work_duration(
-        attendances: List['Attendance'],
+        attendances: List[AttendanceLike],
         now: Optional[datetime] = None
     ) -> timedelta:
-        working_hours = WorkingHoursService.get_working_hours()
-
         if now is None:
             now = timezone.localtime(timezone.now())
         today = now.date()
 
-        start_of_work = timezone.localtime(timezone.make_aware(datetime.combine(today, working_hours['start_time'])))
-        end_of_work = timezone.localtime(timezone.make_aware(datetime.combine(today, working_hours['end_time'])))
+        start_of_work, end_of_work = WorkingHoursService.get_work_bounds(today)
 
         if now > end_of_work:
             scheduled_end = end_of_work
@@ -110,39 +111,46 @@ class AttendanceCalculator:
         return work_duration
 
     @staticmethod
-    def get_total_presence_time(attendances: List['Attendance'], scheduled_start: datetime, scheduled_end: datetime) -> timedelta:
-        total_presence = timedelta()
-
-        sorted_attendances = sorted(attendances, key=lambda x: x.check_in if x.check_in else x.check_out)
-
-        for att in sorted_attendances:
-            if att.status == 'on_leave':
-                continue  
-
-            check_in = att.check_in
-            check_out = att.check_out
-
-
-            if not check_in:
-                continue
-
-            actual_check_in = max(check_in, scheduled_start)
-            if check_out:
-                actual_check_out = min(check_out, scheduled_end)
-            else:
-                actual_check_out = scheduled_end
-
-            if actual_check_in > scheduled_end:
+    def merged_presence_us(intervals: Iterable[Tuple[int, int]], presorted: bool = False) -> int:
+        if not presorted:
+            intervals = sorted(intervals)
+        total = 0
+        run_start = run_end = None
+        for start, end in intervals:
+            if end <= start:
                 continue
+            if run_end is None or start > run_end:
+                if run_end is not None:
+                    total += run_end - run_start
+                run_start, run_end = start, end
+            elif end > run_end:
+                run_end = end
+        if run_end is not None:
+            total += run_end - run_start
+        return total
 
-            if check_out and check_out < scheduled_start:
+    @staticmethod
+    def clipped_intervals(attendances: Iterable[AttendanceLike], scheduled_start: datetime, scheduled_end: datetime) -> List[Tuple[int, int]]:
+        window_start = to_epoch_us(scheduled_start)
+        window_end = to_epoch_us(scheduled_end)
+        intervals = []
+        for att in attendances:
+            if att.status == 'on_leave' or not att.check_in:
                 continue
+            check_out = to_epoch_us(att.check_out) if att.check_out else window_end
+            intervals.append((max(to_epoch_us(att.check_in), window_start), min(check_out, window_end)))
+        return intervals
 
-            if actual_check_out > actual_check_in:
-                presence = actual_check_out - actual_check_in
-                total_presence += presence
-
-        return total_presence
+    @staticmethod
+    def get_total_presence_time(
+        attendances: List[AttendanceLike],
+        scheduled_start: datetime,
+        scheduled_end: datetime,
+        presorted: bool = False
+    ) -> timedelta:
+        # Clipping keeps the check-in order, so sessions sorted by check_in give sorted intervals.
+        intervals = AttendanceCalculator.clipped_intervals(attendances, scheduled_start, scheduled_end)
+        return timedelta(microseconds=AttendanceCalculator.merged_presence_us(intervals, presorted))
 
     @staticmethod
     def is_working_time(current_time: datetime) -> bool:
@@ -150,3 +158,84 @@ class AttendanceCalculator:
             TimeCalculator.is_working_day(current_time.date())
             and WorkingHoursService.is_working_hours(current_time)
         )
+
+    @staticmethod
+    def group_sessions(attendances: Iterable[AttendanceLike]) -> Dict[Tuple[int, date], List[AttendanceLike]]:
+        sessions = defaultdict(list)
+        for att in attendances:
+            sessions[(att.employee_id, att.date)].append(att)
+        return sessions
+
+    @staticmethod
+    def _last_action_time(attendances: List[AttendanceLike]) -> Optional[datetime]:
+        # Mirrors order_by('-check_out', '-check_in').first(): open sessions (NULL check_out) sort first.
+        open_sessions = [att for att in attendances if att.check_out is None]
+        if open_sessions:
+            if any(att.check_in is None for att in open_sessions):
+                return None
+            return max(att.check_in for att in open_sessions)
+        return max((att.check_out for att in attendances), default=None)
+
+    @staticmethod
+    def calculate_batch(
+        sessions: Dict[Tuple[int, date], List[AttendanceLike]],
+        now: Optional[datetime] = None,
+        registrations: Optional[Dict[int, Optional[datetime]]] = None,
+        include_no_check_in: bool = False,
+        presorted: bool = False
+    ) -> Dict[Tuple[int, date], DailyAttendanceResult]:
+        if now is None:
+            now = timezone.localtime(timezone.now())
+        registrations = registrations or {}
+        in_working_hours = WorkingHoursService.is_working_hours(now)
+
+        days = {}
+        for _, day in sessions:
+            if day not in days:
+                start_of_work, end_of_work = WorkingHoursService.get_work_bounds(day)
+                days[day] = (start_of_work, end_of_work, min(now, end_of_work), TimeCalculator.is_working_day(day))
+
+        results = {}
+        for (employee_id, day), attendances in sessions.items():
+            start_of_work, end_of_work, scheduled_end, is_working_day = days[day]
+            on_leave = any(att.status == 'on_leave' for att in attendances)
+
+            work_duration = timedelta()
+            if attendances and not on_leave:
+                work_duration = AttendanceCalculator.get_total_presence_time(attendances, start_of_work, scheduled_end, presorted)
+
+            lateness = timedelta()
+            lateness_start = start_of_work
+            registration_dt = registrations.get(employee_id)
+            registered_after_work = False
+            if registration_dt and registration_dt.date() == day:
+                registered_after_work = registration_dt > end_of_work
+                if registration_dt > start_of_work:
+                    lateness_start = registration_dt
+            scheduled_work_duration = scheduled_end - lateness_start
+            if not registered_after_work and scheduled_work_duration >= timedelta(0) and not on_leave:
+                if not attendances:
+                    if include_no_check_in and is_working_day and now > lateness_start:
+                        lateness = scheduled_work_duration
+                else:
+                    presence = work_duration if lateness_start == start_of_work else \
+                        AttendanceCalculator.get_total_presence_time(attendances, lateness_start, scheduled_end, presorted)
+                    lateness = max(scheduled_work_duration - presence, timedelta(0))
+
+            if not is_working_day:
+                status = 'not_working_day'
+            elif not in_working_hours:
+                status = 'not_working_hour'
+            elif on_leave:
+                status = 'on_leave'
+            elif not attendances:
+                status = 'not_checked_in'
+            elif any(att.check_out is None for att in attendances):
+                status = 'checked_in'
+            else:
+                status = 'checked_out'
+
+            results[(employee_id, day)] = DailyAttendanceResult(
+                lateness, work_duration, status, AttendanceCalculator._last_action_time(attendances)
+            )
+        return results
@@ -0,0 +1,488 @@
+from datetime import datetime, timedelta, date, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from itertools import groupby
+from operator import attrgetter, itemgetter
+from django.utils import timezone
+from employee_tracking_system.utils.time_utils import TimeCalculator
+from employee_tracking_system.services.working_hours_service import WorkingHoursService
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATUS_CODES = {
+    'not_working_day': 0,
+    'not_working_hour': 1,
+    'not_checked_in': 2,
+    'checked_in': 3,
+    'checked_out': 4,
+    'on_leave': 5,
+}
+ON_LEAVE = STATUS_CODES['on_leave']
+WEEKLY_EXCLUDED_STATUSES = (
+    STATUS_CODES['on_leave'],
+    STATUS_CODES['not_working_day'],
+    STATUS_CODES['not_working_hour'],
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime) -> int:
+    return (value - _EPOCH) // _ONE_US
+
+
+def from_epoch_us(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class AttendanceColumns:
+    __slots__ = ('employee_idx', 'day', 'check_in', 'check_out', 'has_check_in', 'has_check_out', 'status')
+
+    def __init__(self, employee_idx, day, check_in, check_out, has_check_in, has_check_out, status):
+        self.employee_idx = employee_idx
+        self.day = day
+        self.check_in = check_in
+        self.check_out = check_out
+        self.has_check_in = has_check_in
+        self.has_check_out = has_check_out
+        self.status = status
+
+    def __len__(self):
+        return len(self.employee_idx)
+
+    @classmethod
+    def from_attendances(cls, attendances: Iterable[Any], employee_index: Dict[int, int]) -> 'AttendanceColumns':
+        employee_idx, day, check_in, check_out, status = [], [], [], [], []
+        for att in attendances:
+            idx = employee_index.get(att.employee_id)
+            if idx is None:
+                continue
+            employee_idx.append(idx)
+            day.append(att.date.toordinal())
+            check_in.append(to_epoch_us(att.check_in) if att.check_in else -1)
+            check_out.append(to_epoch_us(att.check_out) if att.check_out else -1)
+            status.append(STATUS_CODES.get(att.status, -1))
+
+        check_in = np.array(check_in, dtype=np.int64)
+        check_out = np.array(check_out, dtype=np.int64)
+        return cls(
+            employee_idx=np.array(employee_idx, dtype=np.int64),
+            day=np.array(day, dtype=np.int64),
+            check_in=check_in,
+            check_out=check_out,
+            has_check_in=check_in >= 0,
+            has_check_out=check_out >= 0,
+            status=np.array(status, dtype=np.int8),
+        )
+
+
+class DailyMatrix:
+    __slots__ = ('days', 'work_us', 'lateness_us', 'session_count', 'on_leave', 'registered', 'counted', 'failed')
+
+    def __init__(self, days, work_us, lateness_us, session_count, on_leave, registered, counted, failed):
+        self.days = days
+        self.work_us = work_us
+        self.lateness_us = lateness_us
+        self.session_count = session_count
+        self.on_leave = on_leave
+        self.registered = registered
+        self.counted = counted
+        self.failed = failed
+
+
+class PeriodFrame:
+    __slots__ = ('days', 'first_day', 'start_us', 'end_us', 'scheduled_end_us', 'is_working_day', 'not_future')
+
+    def __init__(self, days, first_day, start_us, end_us, scheduled_end_us, is_working_day, not_future):
+        self.days = days
+        self.first_day = first_day
+        self.start_us = start_us
+        self.end_us = end_us
+        self.scheduled_end_us = scheduled_end_us
+        self.is_working_day = is_working_day
+        self.not_future = not_future
+
+
+class EmployeeTotals:
+    __slots__ = ('work_us', 'lateness_us', 'days_worked', 'days_late', 'failed')
+
+    def __init__(self, work_us, lateness_us, days_worked, days_late, failed):
+        self.work_us = work_us
+        self.lateness_us = lateness_us
+        self.days_worked = days_worked
+        self.days_late = days_late
+        self.failed = failed
+
+    def to_array(self) -> np.ndarray:
+        return np.stack([self.work_us, self.lateness_us, self.days_worked, self.days_late, self.failed], axis=-1).astype(np.int64)
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> 'EmployeeTotals':
+        return cls(
+            work_us=values[..., 0],
+            lateness_us=values[..., 1],
+            days_worked=values[..., 2],
+            days_late=values[..., 3],
+            failed=values[..., 4] > 0,
+        )
+
+
+class AttendanceReportEngine:
+
+    @staticmethod
+    def clipped_intervals(columns: AttendanceColumns, window_start: np.ndarray, window_end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        valid = columns.has_check_in & (columns.status != ON_LEAVE)
+        actual_check_in = np.maximum(columns.check_in, window_start)
+        actual_check_out = np.where(
+            columns.has_check_out,
+            np.minimum(columns.check_out, window_end),
+            window_end
+        )
+        return actual_check_in, np.where(valid, np.maximum(actual_check_out, actual_check_in), actual_check_in)
+
+    @staticmethod
+    def merged_presence(group_ids: np.ndarray, start: np.ndarray, end: np.ndarray, size: int) -> np.ndarray:
+        # Union length of each group's intervals: sort by (group, start) and only count the part
+        # of an interval that reaches past the furthest end seen so far in the same group.
+        if not len(group_ids):
+            return np.zeros(size, dtype=np.int64)
+        order = np.lexsort((start, group_ids))
+        groups, start, end = group_ids[order], start[order], end[order]
+        new_group = np.empty(len(groups), dtype=bool)
+        new_group[0] = True
+        new_group[1:] = groups[1:] != groups[:-1]
+        rank = np.cumsum(new_group) - 1
+        base = start[new_group][rank]
+        span = int((end - base).max()) + 1
+        reach = np.maximum.accumulate(rank * span + (end - base))
+        covered = np.empty_like(start)
+        covered[0] = start[0]
+        covered[1:] = reach[:-1] - rank[1:] * span + base[1:]
+        covered = np.where(new_group, start, covered)
+        contribution = np.maximum(end - np.maximum(start, covered), 0)
+        return AttendanceReportEngine._group_sum(groups, contribution, size)
+
+    @staticmethod
+    def _group_sum(group_ids: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+        # Sums stay well below 2**53 microseconds, so the float accumulation is exact.
+        return np.rint(np.bincount(group_ids, weights=values, minlength=size)).astype(np.int64)
+
+    def period_frame(self, start_date: date, end_date: date, working_days: List[date], now_local: datetime) -> PeriodFrame:
+        today = now_local.date()
+        first_day = start_date.toordinal()
+        n_days = max(end_date.toordinal() - first_day + 1, 1)
+        days = [start_date + timedelta(days=offset) for offset in range(n_days)]
+
+        start_us = np.empty(n_days, dtype=np.int64)
+        end_us = np.empty(n_days, dtype=np.int64)
+        scheduled_end_us = np.empty(n_days, dtype=np.int64)
+        for offset, day in enumerate(days):
+            start_of_work, end_of_work = WorkingHoursService.get_work_bounds(day)
+            current_now = now_local if day == today else end_of_work
+            start_us[offset] = to_epoch_us(start_of_work)
+            end_us[offset] = to_epoch_us(end_of_work)
+            scheduled_end_us[offset] = to_epoch_us(min(current_now, end_of_work))
+
+        working_day_set = set(working_days)
+        return PeriodFrame(
+            days=days,
+            first_day=first_day,
+            start_us=start_us,
+            end_us=end_us,
+            scheduled_end_us=scheduled_end_us,
+            is_working_day=np.array([day in working_day_set for day in days], dtype=bool),
+            not_future=np.array([day <= today for day in days], dtype=bool),
+        )
+
+    def daily_matrix(
+        self,
+        columns: AttendanceColumns,
+        registrations: List[Optional[datetime]],
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        frame: Optional[PeriodFrame] = None
+    ) -> DailyMatrix:
+        frame = frame or self.period_frame(start_date, end_date, working_days, now_local)
+        n_employees = len(registrations)
+        days, first_day, n_days = frame.days, frame.first_day, len(frame.days)
+        start_us, end_us, scheduled_end_us = frame.start_us, frame.end_us, frame.scheduled_end_us
+        is_working_day, not_future = frame.is_working_day, frame.not_future
+
+        reg_day = np.full(n_employees, np.iinfo(np.int64).min, dtype=np.int64)
+        reg_us = np.zeros(n_employees, dtype=np.int64)
+        has_reg = np.zeros(n_employees, dtype=bool)
+        for idx, reg_dt in enumerate(registrations):
+            if reg_dt:
+                reg_day[idx] = reg_dt.date().toordinal()
+                reg_us[idx] = to_epoch_us(reg_dt)
+                has_reg[idx] = True
+
+        day_ordinals = first_day + np.arange(n_days, dtype=np.int64)
+        registered = day_ordinals[None, :] >= reg_day[:, None]
+
+        registration_day = has_reg[:, None] & (day_ordinals[None, :] == reg_day[:, None])
+        registered_after_work = registration_day & (reg_us[:, None] > end_us[None, :])
+        lateness_start = np.where(
+            registration_day & (reg_us[:, None] > start_us[None, :]),
+            reg_us[:, None],
+            start_us[None, :]
+        )
+        scheduled = scheduled_end_us[None, :] - lateness_start
+        lateness_possible = ~registered_after_work & (scheduled >= 0)
+
+        size = n_employees * n_days
+        in_range = (columns.day >= first_day) & (columns.day < first_day + n_days)
+        offsets = columns.day[in_range] - first_day
+        group_ids = columns.employee_idx[in_range] * n_days + offsets
+        sessions = AttendanceColumns(
+            columns.employee_idx[in_range], offsets,
+            columns.check_in[in_range], columns.check_out[in_range],
+            columns.has_check_in[in_range], columns.has_check_out[in_range],
+            columns.status[in_range],
+        )
+
+        work_intervals = self.clipped_intervals(
+            sessions, start_us[sessions.day], scheduled_end_us[sessions.day]
+        )
+        lateness_intervals = self.clipped_intervals(
+            sessions, lateness_start.reshape(-1)[group_ids], scheduled_end_us[sessions.day]
+        )
+
+        session_count = np.bincount(group_ids, minlength=size).reshape(n_employees, n_days)
+        leave_count = np.bincount(
+            group_ids, weights=(sessions.status == ON_LEAVE), minlength=size
+        ).reshape(n_employees, n_days)
+        unsortable_count = np.bincount(
+            group_ids, weights=(~sessions.has_check_in & ~sessions.has_check_out), minlength=size
+        ).reshape(n_employees, n_days)
+        work_sum = self.merged_presence(group_ids, *work_intervals, size).reshape(n_employees, n_days)
+        presence_sum = self.merged_presence(group_ids, *lateness_intervals, size).reshape(n_employees, n_days)
+
+        has_sessions = session_count > 0
+        on_leave = leave_count > 0
+
+        daily_work = np.where(has_sessions & ~on_leave, work_sum, 0)
+        daily_lateness = np.where(
+            has_sessions,
+            np.where(on_leave, 0, np.maximum(scheduled - presence_sum, 0)),
+            np.where(is_working_day[None, :], scheduled, 0)
+        )
+        daily_lateness = np.where(lateness_possible & registered, daily_lateness, 0)
+
+        return DailyMatrix(
+            days=days,
+            work_us=daily_work,
+            lateness_us=daily_lateness,
+            session_count=session_count,
+            on_leave=on_leave,
+            registered=registered,
+            counted=registered & not_future[None, :],
+            # Days that mix in a session with neither check_in nor check_out are treated as
+            # corrupt and reported as unavailable rather than summarised.
+            failed=has_sessions & ~on_leave & (session_count > 1) & (unsortable_count > 0),
+        )
+
+    @staticmethod
+    def apply_frozen_summaries(matrix: DailyMatrix, summaries: Iterable[Any], employee_index: Dict[int, int]) -> DailyMatrix:
+        first_day = matrix.days[0].toordinal()
+        n_days = len(matrix.days)
+        rows = [
+            (employee_index[employee_id], day.toordinal() - first_day, presence // _ONE_US, lateness // _ONE_US, session_count)
+            for employee_id, day, presence, lateness, session_count in summaries
+            if employee_id in employee_index and 0 <= day.toordinal() - first_day < n_days
+        ]
+        if not rows:
+            return matrix
+        employee_idx, offsets, work_us, lateness_us, session_count = (np.array(column, dtype=np.int64) for column in zip(*rows))
+        matrix.work_us[employee_idx, offsets] = work_us
+        matrix.lateness_us[employee_idx, offsets] = lateness_us
+        matrix.session_count[employee_idx, offsets] = session_count
+        matrix.failed[employee_idx, offsets] = False
+        return matrix
+
+    @staticmethod
+    def totals(matrix: DailyMatrix) -> EmployeeTotals:
+        counted = matrix.counted
+        worked = counted & (matrix.session_count > 0)
+        return EmployeeTotals(
+            work_us=np.where(worked, matrix.work_us, 0).sum(axis=1),
+            lateness_us=np.where(counted, matrix.lateness_us, 0).sum(axis=1),
+            days_worked=worked.sum(axis=1),
+            days_late=(counted & (matrix.lateness_us > 0)).sum(axis=1),
+            failed=(counted & matrix.failed).any(axis=1),
+        )
+
+    @staticmethod
+    def bucket_totals(matrix: DailyMatrix, bucket_starts: List[int]) -> np.ndarray:
+        counted = matrix.counted
+        worked = counted & (matrix.session_count > 0)
+        columns = np.stack([
+            np.where(worked, matrix.work_us, 0),
+            np.where(counted, matrix.lateness_us, 0),
+            worked,
+            counted & (matrix.lateness_us > 0),
+            counted & matrix.failed,
+        ]).astype(np.int64)
+        sums = np.add.reduceat(columns, bucket_starts, axis=2)
+        sums[4] = sums[4] > 0
+        return sums.transpose(2, 1, 0)
+
+    def weekly_totals(self, columns: AttendanceColumns, n_employees: int, now: datetime) -> EmployeeTotals:
+        # Weekly reports evaluate every session on its own against today's working window.
+        working_hours = WorkingHoursService.get_working_hours()
+        today = now.date()
+        start_of_work = timezone.localtime(timezone.make_aware(datetime.combine(today, working_hours['start_time'])))
+        end_of_work = timezone.localtime(timezone.make_aware(datetime.combine(today, working_hours['end_time'])))
+        start_us = to_epoch_us(start_of_work)
+        scheduled_end_us = to_epoch_us(end_of_work if now > end_of_work else now)
+
+        included = ~np.isin(columns.status, WEEKLY_EXCLUDED_STATUSES)
+        actual_check_in, actual_check_out = self.clipped_intervals(
+            columns,
+            np.full(len(columns), start_us, dtype=np.int64),
+            np.full(len(columns), scheduled_end_us, dtype=np.int64)
+        )
+        presence = actual_check_out - actual_check_in
+        lateness = np.maximum((scheduled_end_us - start_us) - presence, 0)
+
+        employee_idx = columns.employee_idx[included]
+        presence = presence[included]
+        lateness = lateness[included]
+        work_us = self._group_sum(employee_idx, presence, n_employees)
+        lateness_us = self._group_sum(employee_idx, lateness, n_employees)
+
+        first_day = int(columns.day.min()) if len(columns) else 0
+        n_days = int(columns.day.max()) - first_day + 1 if len(columns) else 1
+        day_groups = employee_idx * n_days + (columns.day[included] - first_day)
+        worked_groups = np.unique(day_groups)
+        late_groups = np.unique(day_groups[lateness > 0])
+
+        return EmployeeTotals(
+            work_us=work_us,
+            lateness_us=lateness_us,
+            days_worked=np.bincount(worked_groups // n_days, minlength=n_employees),
+            days_late=np.bincount(late_groups // n_days, minlength=n_employees),
+            failed=np.zeros(n_employees, dtype=bool),
+        )
+
+    def weekly_report(self, employees: List[Any], attendances: Iterable[Any], now: datetime) -> List[Dict[str, Any]]:
+        employee_index = {employee.id: idx for idx, employee in enumerate(employees)}
+        columns = AttendanceColumns.from_attendances(attendances, employee_index)
+        totals = self.weekly_totals(columns, len(employees), now)
+        return self.build_rows(employees, totals, 'weekly')
+
+    @staticmethod
+    def format_row(username: str, work_us: int, lateness_us: int, days_worked: int, days_late: int) -> Dict[str, Any]:
+        total_work_time = timedelta(microseconds=int(work_us))
+        total_lateness = timedelta(microseconds=int(lateness_us))
+        days_worked = int(days_worked)
+        avg_daily_hours = total_work_time / days_worked if days_worked > 0 else timedelta(0)
+        return {
+            'employee': username,
+            'total_hours': TimeCalculator.timedelta_to_hhmm(total_work_time),
+            'total_lateness': TimeCalculator.timedelta_to_hhmm(total_lateness),
+            'avg_daily_hours': TimeCalculator.timedelta_to_hhmm(avg_daily_hours),
+            'days_worked': days_worked,
+            'days_late': int(days_late),
+        }
+
+    @staticmethod
+    def unavailable_row(username: str) -> Dict[str, Any]:
+        return {
+            'employee': username,
+            'total_hours': "N/A",
+            'total_lateness': "N/A",
+            'avg_daily_hours': "N/A",
+            'days_worked': "N/A",
+            'days_late': "N/A",
+        }
+
+    def build_rows(self, employees: List[Any], totals: EmployeeTotals, report_name: str) -> List[Dict[str, Any]]:
+        rows = []
+        for idx, employee in enumerate(employees):
+            username = employee.user.username
+            if totals.failed[idx]:
+                logger.error(f"Error processing {report_name} report for employee {employee.id}: unsortable attendance sessions")
+                rows.append(self.unavailable_row(username))
+                continue
+            rows.append(self.format_row(
+                username,
+                totals.work_us[idx],
+                totals.lateness_us[idx],
+                totals.days_worked[idx],
+                totals.days_late[idx],
+            ))
+        return rows
+
+    def employee_matrix(
+        self,
+        employees: List[Any],
+        attendances: Iterable[Any],
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        frozen_summaries: Iterable[Any] = (),
+        frame: Optional[PeriodFrame] = None
+    ) -> DailyMatrix:
+        employee_index = {employee.id: idx for idx, employee in enumerate(employees)}
+        columns = AttendanceColumns.from_attendances(attendances, employee_index)
+        registrations = [getattr(employee, 'registration_datetime', None) for employee in employees]
+        matrix = self.daily_matrix(columns, registrations, start_date, end_date, working_days, now_local, frame)
+        return self.apply_frozen_summaries(matrix, frozen_summaries, employee_index)
+
+    def period_report(
+        self,
+        employees: List[Any],
+        attendances: Iterable[Any],
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        frozen_summaries: Iterable[Any] = (),
+        report_name: str = 'period',
+        frame: Optional[PeriodFrame] = None
+    ) -> List[Dict[str, Any]]:
+        matrix = self.employee_matrix(
+            employees, attendances, start_date, end_date, working_days, now_local, frozen_summaries, frame
+        )
+        return self.build_rows(employees, self.totals(matrix), report_name)
+
+    def stream_period_report(
+        self,
+        employees: Iterable[Any],
+        attendances: Iterable[Any],
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        frozen_summaries: Iterable[Any] = (),
+        report_name: str = 'period'
+    ) -> Iterator[Dict[str, Any]]:
+        # Merge-join: employees, attendances and frozen summaries must all be ordered by employee id,
+        # so only the current employee's sessions are held in memory.
+        frame = self.period_frame(start_date, end_date, working_days, now_local)
+        session_groups = groupby(attendances, key=attrgetter('employee_id'))
+        summary_groups = groupby(frozen_summaries, key=itemgetter(0))
+        session_group = next(session_groups, None)
+        summary_group = next(summary_groups, None)
+        for employee in employees:
+            while session_group is not None and session_group[0] < employee.id:
+                session_group = next(session_groups, None)
+            while summary_group is not None and summary_group[0] < employee.id:
+                summary_group = next(summary_groups, None)
+            sessions, summaries = [], []
+            if session_group is not None and session_group[0] == employee.id:
+                sessions = list(session_group[1])
+                session_group = next(session_groups, None)
+            if summary_group is not None and summary_group[0] == employee.id:
+                summaries = list(summary_group[1])
+                summary_group = next(summary_groups, None)
+            yield self.period_report(
+                [employee], sessions, start_date, end_date, working_days, now_local,
+                frozen_summaries=summaries, report_name=report_name, frame=frame
+            )[0]
@@ -1,12 +1,14 @@
 
-from typing import List, Any
+from typing import Dict, Iterator, List, Optional
+from collections import defaultdict
 from datetime import date, timedelta
 from .models import Attendance
 from .iattendancerepository import IAttendanceRepository
 from employee.models import Employee
 from .attendancecalculator import AttendanceCalculator
+from .attendancerow import AttendanceRow, ATTENDANCE_ROW_FIELDS
 from django.utils import timezone
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Exists, OuterRef
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,9 +23,12 @@ class AttendanceRepository(IAttendanceRepository):
             logger.error(f"Error getting attendances for employee {employee_id} on {target_date}: {e}")
             return Attendance.objects.none()
 
-    def get_all_attendances_between_dates(self, start_date: date, end_date: date) -> List['Attendance']:
+    def get_all_attendances_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> List[AttendanceRow]:
         Attendance = apps.get_model('attendance', 'Attendance')
-        return Attendance.objects.filter(date__range=(start_date, end_date)).select_related('employee')
+        attendances = Attendance.objects.filter(date__range=(start_date, end_date))
+        if employee_ids is not None:
+            attendances = attendances.filter(employee_id__in=employee_ids)
+        return AttendanceRow.from_queryset(attendances)
 
     def create_attendance(self, data: dict) -> 'Attendance':
         Attendance = apps.get_model('attendance', 'Attendance')
@@ -47,4 +52,101 @@ class AttendanceRepository(IAttendanceRepository):
         return Attendance.objects.filter(employee_id=employee_id, date=date, status='on_leave').exists()
 
     def get_authorized_employees(self) -> List[Employee]:
-        return Employee.objects.filter(user__is_staff=True)
\ No newline at end of file
+        return Employee.objects.filter(user__is_staff=True)
+    def get_attendances_for_employees(self, employee_ids: List[int], date: date) -> List[AttendanceRow]:
+        Attendance = apps.get_model('attendance', 'Attendance')
+        attendances = Attendance.objects.filter(employee_id__in=employee_ids, date=date).order_by('employee_id', 'check_in', 'id')
+        return AttendanceRow.from_queryset(attendances)
+
+    def get_unfrozen_attendances_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> List[AttendanceRow]:
+        Attendance = apps.get_model('attendance', 'Attendance')
+        AttendanceDailySummary = apps.get_model('attendance', 'AttendanceDailySummary')
+        frozen = AttendanceDailySummary.objects.filter(
+            employee_id=OuterRef('employee_id'), date=OuterRef('date'), is_frozen=True
+        )
+        attendances = Attendance.objects.filter(date__range=(start_date, end_date))
+        if employee_ids is not None:
+            attendances = attendances.filter(employee_id__in=employee_ids)
+        return AttendanceRow.from_queryset(attendances.exclude(Exists(frozen)))
+
+    def iter_unfrozen_attendances_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None, chunk_size: int = 2000) -> Iterator[AttendanceRow]:
+        Attendance = apps.get_model('attendance', 'Attendance')
+        AttendanceDailySummary = apps.get_model('attendance', 'AttendanceDailySummary')
+        frozen = AttendanceDailySummary.objects.filter(
+            employee_id=OuterRef('employee_id'), date=OuterRef('date'), is_frozen=True
+        )
+        attendances = Attendance.objects.filter(date__range=(start_date, end_date))
+        if employee_ids is not None:
+            attendances = attendances.filter(employee_id__in=employee_ids)
+        rows = attendances.exclude(Exists(frozen)).order_by('employee_id', 'date', 'check_in').values_list(*ATTENDANCE_ROW_FIELDS)
+        return (AttendanceRow(*row) for row in rows.iterator(chunk_size=chunk_size))
+
+    def get_daily_summaries(self, employee_ids: List[int], date: date) -> QuerySet:
+        AttendanceDailySummary = apps.get_model('attendance', 'AttendanceDailySummary')
+        return AttendanceDailySummary.objects.filter(employee_id__in=employee_ids, date=date)
+
+    def get_frozen_daily_summaries(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> QuerySet:
+        AttendanceDailySummary = apps.get_model('attendance', 'AttendanceDailySummary')
+        summaries = AttendanceDailySummary.objects.filter(date__range=(start_date, end_date), is_frozen=True)
+        if employee_ids is not None:
+            summaries = summaries.filter(employee_id__in=employee_ids)
+        return summaries.values_list('employee_id', 'date', 'presence', 'lateness', 'session_count')
+
+    def iter_frozen_daily_summaries(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None, chunk_size: int = 2000) -> Iterator[tuple]:
+        return self.get_frozen_daily_summaries(start_date, end_date, employee_ids).order_by('employee_id', 'date').iterator(chunk_size=chunk_size)
+
+    def get_pending_daily_summaries(self, start_date: date, end_date: date) -> Dict[date, List[int]]:
+        AttendanceDailySummary = apps.get_model('attendance', 'AttendanceDailySummary')
+        pending = defaultdict(list)
+        rows = AttendanceDailySummary.objects.filter(
+            date__gte=start_date, date__lt=end_date, is_frozen=False
+        ).values_list('date', 'employee_id')
+        for pending_date, employee_id in rows:
+            pending[pending_date].append(employee_id)
+        return dict(pending)
+
+    def unfreeze_daily_summaries(self, dates: Optional[List[date]] = None, start_date: Optional[date] = None) -> List[date]:
+        AttendanceDailySummary = apps.get_model('attendance', 'AttendanceDailySummary')
+        summaries = AttendanceDailySummary.objects.filter(is_frozen=True)
+        if dates is not None:
+            summaries = summaries.filter(date__in=dates)
+        if start_date is not None:
+            summaries = summaries.filter(date__gte=start_date)
+        unfrozen_dates = sorted(set(summaries.values_list('date', flat=True)))
+        summaries.update(is_frozen=False)
+        return unfrozen_dates
+
+    def iter_sessions_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None, chunk_size: int = 2000) -> Iterator[tuple]:
+        Attendance = apps.get_model('attendance', 'Attendance')
+        attendances = Attendance.objects.filter(date__range=(start_date, end_date))
+        if employee_ids is not None:
+            attendances = attendances.filter(employee_id__in=employee_ids)
+        return attendances.order_by('date', 'employee_id', 'id').values_list(
+            'id', 'employee_id', 'employee__user__username', 'date', 'check_in', 'check_out', 'status'
+        ).iterator(chunk_size=chunk_size)
+
+    def get_attendances_for_update(self, employee_ids: List[int], dates: List[date]) -> QuerySet:
+        Attendance = apps.get_model('attendance', 'Attendance')
+        return Attendance.objects.select_for_update().filter(employee_id__in=employee_ids, date__in=dates).order_by('id')
+
+    def bulk_apply_attendances(self, created: List['Attendance'], updated: List['Attendance']):
+        Attendance = apps.get_model('attendance', 'Attendance')
+        if updated:
+            Attendance.objects.bulk_update(updated, ['check_out', 'status'])
+        if created:
+            Attendance.objects.bulk_create(created)
+
+    def get_ingested_event_keys(self, keys: List[str]) -> set:
+        # Only applied events dedupe; a rejected one may be resent with the same key once it can apply.
+        AttendanceEvent = apps.get_model('attendance', 'AttendanceEvent')
+        return set(
+            AttendanceEvent.objects.filter(idempotency_key__in=keys, result='applied').values_list('idempotency_key', flat=True)
+        )
+
+    def create_attendance_events(self, events: List['AttendanceEvent']):
+        AttendanceEvent = apps.get_model('attendance', 'AttendanceEvent')
+        # A resent event replaces the record of its earlier rejection.
+        AttendanceEvent.objects.filter(
+            idempotency_key__in=[event.idempotency_key for event in events], result='rejected'
+        ).delete()
+        AttendanceEvent.objects.bulk_create(events)
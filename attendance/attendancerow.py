@@ -0,0 +1,33 @@
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import Attendance
+
+ATTENDANCE_ROW_FIELDS = ('id', 'employee_id', 'date', 'check_in', 'check_out', 'status')
+
+
+class AttendanceRow:
+    __slots__ = ATTENDANCE_ROW_FIELDS
+
+    def __init__(self, id: int, employee_id: int, date: date, check_in: Optional[datetime], check_out: Optional[datetime], status: str):
+        self.id = id
+        self.employee_id = employee_id
+        self.date = date
+        self.check_in = check_in
+        self.check_out = check_out
+        self.status = status
+
+    def __repr__(self):
+        return f"AttendanceRow(id={self.id}, employee_id={self.employee_id}, date={self.date}, status={self.status})"
+
+    @classmethod
+    def from_values(cls, rows: Iterable[tuple]) -> List['AttendanceRow']:
+        return [cls(*row) for row in rows]
+
+    @classmethod
+    def from_queryset(cls, queryset) -> List['AttendanceRow']:
+        return cls.from_values(queryset.values_list(*ATTENDANCE_ROW_FIELDS))
+
+
+AttendanceLike = Union['Attendance', AttendanceRow]
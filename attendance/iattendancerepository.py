@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, TYPE_CHECKING
+from typing import Dict, Iterator, List, Optional, TYPE_CHECKING
 from datetime import date, timedelta
 from employee.models import Employee
 from django.db.models import QuerySet
+from .attendancerow import AttendanceRow
 
 if TYPE_CHECKING:
-    from .models import Attendance  
+    from .models import Attendance, AttendanceDailySummary, AttendanceEvent
 
 class IAttendanceRepository(ABC):
     
@@ -14,7 +15,7 @@ class IAttendanceRepository(ABC):
         pass
 
     @abstractmethod
-    def get_all_attendances_between_dates(self, start_date: date, end_date: date) -> List['Attendance']:
+    def get_all_attendances_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> List[AttendanceRow]:
         pass
 
     @abstractmethod
@@ -39,4 +40,56 @@ class IAttendanceRepository(ABC):
 
     @abstractmethod
     def get_authorized_employees(self) -> List[Employee]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_attendances_for_employees(self, employee_ids: List[int], date: date) -> List[AttendanceRow]:
+        pass
+
+    @abstractmethod
+    def get_unfrozen_attendances_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> List[AttendanceRow]:
+        pass
+
+    @abstractmethod
+    def get_daily_summaries(self, employee_ids: List[int], date: date) -> QuerySet['AttendanceDailySummary']:
+        pass
+
+    @abstractmethod
+    def get_frozen_daily_summaries(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> QuerySet['AttendanceDailySummary']:
+        pass
+
+    @abstractmethod
+    def get_pending_daily_summaries(self, start_date: date, end_date: date) -> Dict[date, List[int]]:
+        pass
+
+    @abstractmethod
+    def unfreeze_daily_summaries(self, dates: Optional[List[date]] = None, start_date: Optional[date] = None) -> List[date]:
+        pass
+
+    @abstractmethod
+    def iter_sessions_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None, chunk_size: int = 2000) -> Iterator[tuple]:
+        pass
+
+    @abstractmethod
+    def iter_unfrozen_attendances_between_dates(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None, chunk_size: int = 2000) -> Iterator[AttendanceRow]:
+        pass
+
+    @abstractmethod
+    def iter_frozen_daily_summaries(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None, chunk_size: int = 2000) -> Iterator[tuple]:
+        pass
+
+    @abstractmethod
+    def get_attendances_for_update(self, employee_ids: List[int], dates: List[date]) -> QuerySet['Attendance']:
+        pass
+
+    @abstractmethod
+    def bulk_apply_attendances(self, created: List['Attendance'], updated: List['Attendance']):
+        pass
+
+    @abstractmethod
+    def get_ingested_event_keys(self, keys: List[str]) -> set:
+        pass
+
+    @abstractmethod
+    def create_attendance_events(self, events: List['AttendanceEvent']):
+        pass
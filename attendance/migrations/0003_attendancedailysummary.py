@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:52
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0001_initial'),
+        ('attendance', '0002_attendance_employee'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('presence', models.DurationField(default=datetime.timedelta)),
+                ('lateness', models.DurationField(default=datetime.timedelta)),
+                ('status', models.CharField(choices=[('not_working_day', 'Not Working Day'), ('not_working_hour', 'Not Working Hour'), ('not_checked_in', 'Not Checked In'), ('checked_in', 'Checked In'), ('checked_out', 'Checked Out'), ('on_leave', 'On Leave')], default='not_checked_in', max_length=20)),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('is_frozen', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='employee.employee')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendancedailysummary',
+            index=models.Index(fields=['date', 'is_frozen'], name='attendance__date_ec8315_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='attendancedailysummary',
+            unique_together={('employee', 'date')},
+        ),
+    ]
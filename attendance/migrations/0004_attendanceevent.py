@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0001_initial'),
+        ('attendance', '0003_attendancedailysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=128, unique=True)),
+                ('direction', models.CharField(choices=[('in', 'In'), ('out', 'Out')], max_length=3)),
+                ('timestamp', models.DateTimeField()),
+                ('source', models.CharField(blank=True, default='', max_length=64)),
+                ('result', models.CharField(choices=[('applied', 'Applied'), ('rejected', 'Rejected')], max_length=10)),
+                ('detail', models.CharField(blank=True, default='', max_length=255)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_events', to='employee.employee')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='attendanceevent',
+            index=models.Index(fields=['employee', 'timestamp'], name='attendance__employe_7086f1_idx'),
+        ),
+    ]
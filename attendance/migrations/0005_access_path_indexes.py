@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def close_duplicate_open_sessions(apps, schema_editor):
+    # Older open sessions are closed when the newest one started, as a check-in would have done.
+    Attendance = apps.get_model('attendance', 'Attendance')
+    open_sessions = Attendance.objects.filter(check_in__isnull=False, check_out__isnull=True)
+    duplicated = (
+        open_sessions.values('employee_id', 'date').annotate(sessions=Count('id')).filter(sessions__gt=1)
+    )
+    for group in duplicated:
+        sessions = list(open_sessions.filter(employee_id=group['employee_id'], date=group['date']).order_by('-check_in', '-id'))
+        latest = sessions[0]
+        Attendance.objects.filter(id__in=[session.id for session in sessions[1:]]).update(
+            check_out=latest.check_in, status='checked_out'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendanceevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['employee', 'date'], name='attendance_employee_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'employee'], name='attendance_date_employee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('status', 'on_leave')), fields=['employee', 'date'], name='attendance_on_leave_idx'),
+        ),
+        migrations.RunPython(close_duplicate_open_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(condition=models.Q(('check_in__isnull', False), ('check_out__isnull', True)), fields=('employee', 'date'), name='attendance_one_open_session'),
+        ),
+    ]
@@ -3,7 +3,7 @@ from django.db import models
 from employee.models import Employee
 from django.utils import timezone
 from django.core.exceptions import ValidationError 
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from employee_tracking_system.utils.time_utils import TimeCalculator  
 from employee_tracking_system.services.working_hours_service import WorkingHoursService  
 from django.db.models import QuerySet
@@ -46,6 +46,20 @@ class Attendance(models.Model):
         
     objects = AttendanceManager()  
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'date'], name='attendance_employee_date_idx'),
+            models.Index(fields=['date', 'employee'], name='attendance_date_employee_idx'),
+            models.Index(fields=['employee', 'date'], condition=models.Q(status='on_leave'), name='attendance_on_leave_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employee', 'date'],
+                condition=models.Q(check_in__isnull=False, check_out__isnull=True),
+                name='attendance_one_open_session',
+            ),
+        ]
+
     def clean(self):
         if self.check_out and self.check_in and self.check_out <= self.check_in:
             raise ValidationError("Check-out time must be after check-in time.")
@@ -62,4 +76,53 @@ class Attendance(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.employee} - {self.date} - {self.status}"
\ No newline at end of file
+        return f"{self.employee} - {self.date} - {self.status}"
+
+
+class AttendanceDailySummary(models.Model):
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="daily_summaries")
+    date = models.DateField()
+    presence = models.DurationField(default=timedelta)
+    lateness = models.DurationField(default=timedelta)
+    status = models.CharField(max_length=20, choices=Attendance.STATUS_CHOICES, default='not_checked_in')
+    session_count = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+    is_frozen = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('employee', 'date')
+        indexes = [
+            models.Index(fields=['date', 'is_frozen']),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.date} - {self.status}"
+
+
+class AttendanceEvent(models.Model):
+    DIRECTION_CHOICES = [
+        ('in', 'In'),
+        ('out', 'Out'),
+    ]
+    RESULT_CHOICES = [
+        ('applied', 'Applied'),
+        ('rejected', 'Rejected'),
+    ]
+
+    idempotency_key = models.CharField(max_length=128, unique=True)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="attendance_events")
+    direction = models.CharField(max_length=3, choices=DIRECTION_CHOICES)
+    timestamp = models.DateTimeField()
+    source = models.CharField(max_length=64, blank=True, default='')
+    result = models.CharField(max_length=10, choices=RESULT_CHOICES)
+    detail = models.CharField(max_length=255, blank=True, default='')
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.direction} - {self.timestamp} ({self.result})"
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from employee.signals import leave_balance_changed
+from employee_tracking_system.models import HolidayCalendar, WorkingHours
+from .signals import attendance_changed
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _schedule_report_patch(employee_id, dates):
+    from .tasks import patch_report_rows
+    iso_dates = sorted({day.isoformat() for day in dates})
+    transaction.on_commit(lambda: patch_report_rows.delay(employee_id, iso_dates))
+
+
+@receiver(attendance_changed)
+def patch_reports_on_attendance_change(sender, employee_ids, dates, **kwargs):
+    for employee_id in employee_ids:
+        _schedule_report_patch(employee_id, dates)
+    logger.debug(f"Report patch scheduled for employees {employee_ids} on {dates}")
+
+
+def schedule_real_time_push(employee_ids):
+    from .tasks import push_real_time_attendance
+    transaction.on_commit(lambda: push_real_time_attendance.delay(list(employee_ids)))
+
+
+@receiver(leave_balance_changed)
+def patch_reports_on_leave_balance_change(sender, employee_id, **kwargs):
+    _schedule_report_patch(employee_id, [timezone.localdate()])
+    schedule_real_time_push([employee_id])
+
+
+def _refreeze_daily_summaries(dates=None, start_date=None):
+    # Frozen rollups bake in the working hours and the holiday calendar; unfreeze the affected days
+    # with the change so reports fall back to raw sessions, and re-freeze them once it has committed.
+    from .tasks import refresh_daily_summaries
+    from .utils import get_attendance_repository
+    unfrozen = get_attendance_repository().unfreeze_daily_summaries(dates, start_date)
+
+    def dispatch():
+        for day in unfrozen:
+            refresh_daily_summaries.delay([day.isoformat()])
+
+    if unfrozen:
+        transaction.on_commit(dispatch)
+    logger.info(f"Unfroze daily summaries on {len(unfrozen)} days after a calendar change")
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def refreeze_on_working_hours_change(sender, instance, **kwargs):
+    # New working hours apply from the current month on; closed months keep the hours they were frozen with.
+    _refreeze_daily_summaries(start_date=timezone.localdate().replace(day=1))
+
+
+@receiver(pre_save, sender=HolidayCalendar)
+def remember_previous_holiday_date(sender, instance, **kwargs):
+    instance._previous_date = sender.objects.filter(pk=instance.pk).values_list('date', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=HolidayCalendar)
+@receiver(post_delete, sender=HolidayCalendar)
+def refreeze_on_holiday_change(sender, instance, **kwargs):
+    dates = {instance.date, getattr(instance, '_previous_date', None)} - {None}
+    _refreeze_daily_summaries(sorted(dates))
@@ -1,4 +1,11 @@
 from .checkinoutservice import CheckInOutService
 from .attendancereportservice import AttendanceReportService
 from .realtimeupdateservice import RealTimeUpdateService
-from .attendanceservice import AttendanceService
\ No newline at end of file
+from .attendanceservice import AttendanceService
+from .dailysummaryservice import DailySummaryService
+from .exportservice import AttendanceExportService
+from .rangereportservice import AttendanceRangeReportService
+from .fanoutservice import AttendanceFanoutService
+from .liveattendanceservice import LiveAttendanceService
+from .ingestionservice import AttendanceIngestionService
+from .realtimesnapshotservice import RealTimeSnapshotService
@@ -1,23 +1,34 @@
 from datetime import datetime, timedelta, date
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from django.utils import timezone
 from employee_tracking_system.utils.time_utils import TimeCalculator
-from django.core.cache import cache
 from django.conf import settings
-from redis import Redis
-from redis.lock import Lock
-from ..serializers import AttendanceReportSerializer  
-from collections import defaultdict  
-from employee_tracking_system.services.working_hours_service import WorkingHoursService
+from django.core.cache import cache
+from django.db import connections
+from ..serializers import AttendanceReportSerializer
+from ..attendancereportengine import AttendanceReportEngine
+from .reportcacheservice import ReportCacheService
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _compute_report_shard(report_name: str, period: tuple, employee_ids: List[int], now_local: str) -> Dict[int, Dict[str, Any]]:
+    from ..utils import get_attendance_report_service
+    report_service = get_attendance_report_service()
+    return report_service.compute_report_shard(report_name, period, employee_ids, datetime.fromisoformat(now_local))
+
+
 class AttendanceReportService:
-    def __init__(self, repository, attendance_calculator, employee_service):
+    def __init__(self, repository, attendance_calculator, employee_service, report_engine=None, report_cache=None):
         self.repository = repository
         self.attendance_calculator = attendance_calculator
         self.employee_service = employee_service
+        self.report_engine = report_engine or AttendanceReportEngine()
+        self.report_cache = report_cache or ReportCacheService()
 
     def get_week_start_end_date(self, year: int, month: int, week: int):
         first_day_of_month = date(year, month, 1)
@@ -26,205 +37,306 @@ class AttendanceReportService:
         end_date = start_date + timedelta(days=6)
         return start_date, end_date
 
-    def get_weekly_report(self, year: int, month: int, week: int) -> List[Dict[str, Any]]:
+    def _weekly_period(self, year: int, month: int, week: int) -> Tuple[date, date, List[date]]:
         start_date, end_date = self.get_week_start_end_date(year, month, week)
-        cache_key = f'weekly_report_{year}_{month}_{week}'
-        cached_report = cache.get(cache_key)
-        if cached_report:
-            logger.info(f"Fetching weekly report from cache {cache_key}")
-            return cached_report
-
-        all_attendances = self.repository.get_all_attendances_between_dates(start_date, end_date)
-        employees = self.employee_service.get_all_employees()  
-        weekly_report = []
-
-        for employee in employees:
-            try:
-                employee_attendances = [a for a in all_attendances if a.employee == employee]
-                total_work_time = timedelta()
-                total_lateness = timedelta()
-                days_worked = set()
-                days_late = set()
-                for attendance in employee_attendances:
-                    if attendance.status in ['on_leave', 'not_working_day', 'not_working_hour']:
-                        continue  # Bu durumlarda lateness hesaplanmaz
-                    daily_work_time = self.attendance_calculator.calculate_work_duration(
-                        attendances=[attendance], 
-                        now=timezone.now()
-                    )
-                    daily_lateness = self.attendance_calculator.calculate_lateness(
-                        attendances=[attendance],
-                        now=timezone.now(),
-                        include_no_check_in=False
-                    )
-                    total_work_time += daily_work_time
-                    total_lateness += daily_lateness
-                    days_worked.add(attendance.date)
-                    if daily_lateness > timedelta():
-                        days_late.add(attendance.date)
-                days_worked_count = len(days_worked)
-                days_late_count = len(days_late)
-                avg_daily_hours = total_work_time / days_worked_count if days_worked_count > 0 else timedelta()
-
-                weekly_report.append({
-                    'employee': employee.user.username,
-                    'total_hours': TimeCalculator.timedelta_to_hhmm(total_work_time),
-                    'total_lateness': TimeCalculator.timedelta_to_hhmm(total_lateness),
-                    'avg_daily_hours': TimeCalculator.timedelta_to_hhmm(avg_daily_hours),
-                    'days_worked': days_worked_count,
-                    'days_late': days_late_count,
-                })
-            except Exception as e:
-                logger.error(f"Error processing weekly report for employee {employee.id}: {e}")
-                weekly_report.append({
-                    'employee': employee.user.username,
-                    'total_hours': "N/A",
-                    'total_lateness': "N/A",
-                    'avg_daily_hours': "N/A",
-                    'days_worked': "N/A",
-                    'days_late': "N/A",
-                })
-
-        cache.set(cache_key, weekly_report, settings.WEEKLY_REPORT_CACHE_TIMEOUT)
-        logger.info(f"Weekly report cached with key {cache_key}")
-        return weekly_report
+        working_days = [
+            start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+            if TimeCalculator.is_working_day(start_date + timedelta(days=offset))
+        ]
+        return start_date, end_date, working_days
 
-    def get_monthly_report(self, year: int, month: int) -> List[Dict[str, Any]]:
+    def _monthly_period(self, year: int, month: int, today: date) -> Tuple[date, date, List[date]]:
         start_date = date(year, month, 1)
-        now_local = timezone.localtime(timezone.now())
-        today = now_local.date()
-
         if (year, month) > (today.year, today.month):
             working_days = []
         else:
             working_days = TimeCalculator.get_working_days_in_month(year, month)
 
-        cache_key = f"monthly_report_{year}_{month}"
-        cached_report = cache.get(cache_key)
-        if cached_report:
-            logger.info(f"Fetching monthly report from cache {cache_key}")
-            return cached_report
-
         if working_days:
             if today in working_days:
                 end_date = today
             else:
                 end_date = working_days[-1]
         else:
-            end_date = start_date  
-
-        all_attendances = self.repository.get_all_attendances_between_dates(start_date, end_date)
-        employees = self.employee_service.get_all_employees()
-        monthly_report = []
-
-        for employee in employees:
-            try:
-
-                reg_dt = getattr(employee, 'registration_datetime', None)
-                employee_attendances = [
-                    att for att in all_attendances if att.employee_id == employee.id
-                ]
-                attendances_by_date = defaultdict(list)
-                for attendance in employee_attendances:
-                    attendances_by_date[attendance.date].append(attendance)
-
-                total_work_time = timedelta(0)
-                total_lateness = timedelta(0)
-                days_worked = set()
-                days_late = set()
-
-                for attendance_date, attendances_list in attendances_by_date.items():
-
-                    if reg_dt and attendance_date < reg_dt.date():
-                        continue
-                    if attendance_date > today:
-                        continue
-
-                    working_hours = WorkingHoursService.get_working_hours()
-                    if attendance_date == today:
-                        current_now = now_local
-                    else:
-                        current_now = timezone.localtime(
-                            timezone.make_aware(datetime.combine(
-                                attendance_date, working_hours['end_time']
-                            ))
-                        )
-
-                    daily_lateness = self.attendance_calculator.calculate_lateness(
-                        attendances=attendances_list,
-                        now=current_now,
-                        include_no_check_in=True,
-                        registration_dt=reg_dt  
-                    )
-                    daily_work_time = self.attendance_calculator.calculate_work_duration(
-                        attendances=attendances_list,
-                        now=current_now
-                    )
-
-                    total_lateness += daily_lateness
-                    total_work_time += daily_work_time
-                    days_worked.add(attendance_date)
-
-                    if daily_lateness > timedelta(0):
-                        days_late.add(attendance_date)
-
-                for wd in working_days:
-                    if reg_dt and wd < reg_dt.date():
-                        continue
-                    if wd > today:
-                        continue
-                    if wd in days_worked:
-                        continue
-
-                    working_hours = WorkingHoursService.get_working_hours()
-                    if wd == today:
-                        current_now = now_local
-                    else:
-                        current_now = timezone.localtime(
-                            timezone.make_aware(datetime.combine(wd, working_hours['end_time']))
-                        )
-                    lateness = self.attendance_calculator.calculate_lateness(
-                        attendances=[],
-                        now=current_now,
-                        include_no_check_in=True,
-                        registration_dt=reg_dt 
-                    )
-                    total_lateness += lateness
-                    if lateness > timedelta(0):
-                        days_late.add(wd)
-
-                days_worked_count = len(days_worked)
-                days_late_count = len(days_late)
-                if days_worked_count > 0:
-                    avg_daily_hours = total_work_time / days_worked_count
-                else:
-                    avg_daily_hours = timedelta(0)
-
-                monthly_report.append({
-                    'employee': employee.user.username,
-                    'total_hours': TimeCalculator.timedelta_to_hhmm(total_work_time),
-                    'total_lateness': TimeCalculator.timedelta_to_hhmm(total_lateness),
-                    'avg_daily_hours': TimeCalculator.timedelta_to_hhmm(avg_daily_hours),
-                    'days_worked': days_worked_count,
-                    'days_late': days_late_count,
-                })
-
-            except Exception as e:
-                logger.error(f"Error processing monthly report for employee {employee.id}: {e}")
-                monthly_report.append({
-                    'employee': employee.user.username,
-                    'total_hours': "N/A",
-                    'total_lateness': "N/A",
-                    'avg_daily_hours': "N/A",
-                    'days_worked': "N/A",
-                    'days_late': "N/A",
-                })
-
-        cache.set(cache_key, monthly_report, settings.MONTHLY_REPORT_CACHE_TIMEOUT)
-        logger.info(f"Monthly report cached with key {cache_key}")
-        return monthly_report
+            end_date = start_date
+        return start_date, end_date, working_days
+
+    def _build_period_report(
+        self,
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        report_name: str,
+        employees: List[Any],
+        scoped: bool = False
+    ) -> List[Dict[str, Any]]:
+        employee_ids = [employee.id for employee in employees] if scoped else None
+        if report_name == 'weekly':
+            # Weekly rows are not per-day rules, so they cannot be served from the frozen rollups.
+            attendances = self.repository.get_all_attendances_between_dates(start_date, end_date, employee_ids)
+            return self.report_engine.weekly_report(employees, attendances, now_local)
+        frozen_summaries = self.repository.get_frozen_daily_summaries(start_date, end_date, employee_ids)
+        open_attendances = self.repository.get_unfrozen_attendances_between_dates(start_date, end_date, employee_ids)
+        return self.report_engine.period_report(
+            employees, open_attendances, start_date, end_date, working_days, now_local,
+            frozen_summaries=frozen_summaries, report_name=report_name
+        )
+
+    def _rebuild_report(self, cache_key: str, timeout: int, employees: List[Any], compute, blocking: bool) -> Optional[Dict[int, Dict[str, Any]]]:
+        lock = self.report_cache.lock(cache_key)
+        acquired = lock.acquire(blocking=blocking, blocking_timeout=self.report_cache.lock_wait if blocking else None)
+        if not acquired:
+            return None
+        try:
+            if blocking:
+                rows, meta = self.report_cache.get_rows(cache_key, [employee.id for employee in employees])
+                if len(rows) == len(employees) and not self.report_cache.is_expired(meta):
+                    self.report_cache.record('coalesced')
+                    return rows
+            self.report_cache.begin_rebuild(cache_key)
+            started = time.monotonic()
+            rows = compute(employees)
+            self.report_cache.store_rows(cache_key, rows, timeout, full=True, delta=time.monotonic() - started)
+            self.report_cache.record('rebuild')
+            return rows
+        finally:
+            self.report_cache.release(lock)
+
+    def _get_cached_report(
+        self,
+        cache_key: str,
+        timeout: int,
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        report_name: str
+    ) -> List[Dict[str, Any]]:
+        employees = list(self.employee_service.get_all_employees())
+        employee_ids = [employee.id for employee in employees]
+
+        def compute(targets: List[Any], scoped: bool = False) -> Dict[int, Dict[str, Any]]:
+            rows = self._build_period_report(
+                start_date, end_date, working_days, now_local, report_name, targets, scoped=scoped
+            )
+            return {employee.id: row for employee, row in zip(targets, rows)}
+
+        cached_rows, meta = self.report_cache.get_rows(cache_key, employee_ids)
+        if not meta:
+            self.report_cache.record('miss')
+            rows = self._rebuild_report(cache_key, timeout, employees, compute, blocking=True)
+            if rows is None:
+                logger.warning(f"Timed out waiting for {report_name} report rebuild of {cache_key}, computing locally")
+                rows = compute(employees)
+            return [rows[employee_id] for employee_id in employee_ids]
+
+        if self.report_cache.is_expired(meta):
+            rows = self._rebuild_report(cache_key, timeout, employees, compute, blocking=False)
+            if rows is not None:
+                return [rows[employee_id] for employee_id in employee_ids]
+            self.report_cache.record('stale')
+            logger.info(f"Serving stale {report_name} report {cache_key} while it is rebuilt")
+        elif self.report_cache.should_refresh_early(meta):
+            rows = self._rebuild_report(cache_key, timeout, employees, compute, blocking=False)
+            if rows is not None:
+                self.report_cache.record('early_refresh')
+                return [rows[employee_id] for employee_id in employee_ids]
+            self.report_cache.record('hit')
+        else:
+            self.report_cache.record('hit')
+
+        missing = [employee for employee in employees if employee.id not in cached_rows]
+        if missing:
+            fresh_rows = compute(missing, scoped=True)
+            self.report_cache.store_rows(cache_key, fresh_rows, timeout)
+            cached_rows.update(fresh_rows)
+            logger.info(f"Computed {len(fresh_rows)} missing {report_name} report rows for cache {cache_key}")
+        else:
+            logger.info(f"Fetching {report_name} report from cache {cache_key}")
+        return [cached_rows[employee_id] for employee_id in employee_ids]
+
+    def get_weekly_report(self, year: int, month: int, week: int) -> List[Dict[str, Any]]:
+        start_date, end_date, working_days = self._weekly_period(year, month, week)
+        now_local = timezone.localtime(timezone.now())
+        return self._get_cached_report(
+            ReportCacheService.weekly_key(year, month, week), settings.WEEKLY_REPORT_CACHE_TIMEOUT,
+            start_date, end_date, working_days, now_local, 'weekly'
+        )
+
+    def get_monthly_report(self, year: int, month: int) -> List[Dict[str, Any]]:
+        now_local = timezone.localtime(timezone.now())
+        start_date, end_date, working_days = self._monthly_period(year, month, now_local.date())
+        return self._get_cached_report(
+            ReportCacheService.monthly_key(year, month), settings.MONTHLY_REPORT_CACHE_TIMEOUT,
+            start_date, end_date, working_days, now_local, 'monthly'
+        )
+
+    def iter_monthly_report_rows(
+        self,
+        year: int,
+        month: int,
+        chunk_size: int,
+        employees: Optional[Iterable[Any]] = None,
+        clip_start: Optional[date] = None,
+        clip_end: Optional[date] = None
+    ) -> Iterator[Dict[str, Any]]:
+        now_local = timezone.localtime(timezone.now())
+        start_date, end_date, working_days = self._monthly_period(year, month, now_local.date())
+        # Exports of a partial month only count the days inside the requested window.
+        if clip_start and clip_start > start_date:
+            start_date = clip_start
+        if clip_end and clip_end < end_date:
+            end_date = clip_end
+        if start_date > end_date:
+            return iter(())
+        working_days = [day for day in working_days if start_date <= day <= end_date]
+        if employees is None:
+            employee_ids = None
+            employees = self.employee_service.get_all_employees().order_by('id').iterator(chunk_size=chunk_size)
+        else:
+            employees = sorted(employees, key=lambda employee: employee.id)
+            employee_ids = [employee.id for employee in employees]
+        attendances = self.repository.iter_unfrozen_attendances_between_dates(start_date, end_date, employee_ids, chunk_size)
+        frozen_summaries = self.repository.iter_frozen_daily_summaries(start_date, end_date, employee_ids, chunk_size)
+        return self.report_engine.stream_period_report(
+            employees, attendances, start_date, end_date, working_days, now_local,
+            frozen_summaries=frozen_summaries, report_name='monthly'
+        )
+
+    def _resolve_period(self, report_name: str, period: Iterable[int], now_local: datetime) -> Tuple[str, int, date, date, List[date]]:
+        period = tuple(period)
+        if report_name == 'monthly':
+            start_date, end_date, working_days = self._monthly_period(period[0], period[1], now_local.date())
+            return ReportCacheService.monthly_key(*period), settings.MONTHLY_REPORT_CACHE_TIMEOUT, start_date, end_date, working_days
+        start_date, end_date, working_days = self._weekly_period(*period)
+        return ReportCacheService.weekly_key(*period), settings.WEEKLY_REPORT_CACHE_TIMEOUT, start_date, end_date, working_days
+
+    def shard_employee_ids(self, shard_size: int) -> List[List[int]]:
+        employee_ids = list(self.employee_service.get_all_employees().order_by('id').values_list('id', flat=True))
+        return [employee_ids[offset:offset + shard_size] for offset in range(0, len(employee_ids), shard_size)]
+
+    def compute_report_shard(self, report_name: str, period: Iterable[int], employee_ids: List[int], now_local: datetime) -> Dict[int, Dict[str, Any]]:
+        _, _, start_date, end_date, working_days = self._resolve_period(report_name, period, now_local)
+        employees = list(self.employee_service.get_all_employees().filter(id__in=employee_ids).order_by('id'))
+        rows = self._build_period_report(
+            start_date, end_date, working_days, now_local, report_name, employees, scoped=True
+        )
+        return {employee.id: row for employee, row in zip(employees, rows)}
+
+    def store_report_shards(self, report_name: str, period: Iterable[int], shard_rows: Iterable[Optional[Dict[int, Dict[str, Any]]]], delta: float = 0.0) -> int:
+        cache_key, timeout, *_ = self._resolve_period(report_name, period, timezone.localtime(timezone.now()))
+        rows = {}
+        failed = 0
+        for shard in shard_rows:
+            if shard is None:
+                failed += 1
+                continue
+            rows.update({int(employee_id): row for employee_id, row in shard.items()})
+        if failed:
+            # Keep the rows that were computed but leave the period stale, so the next read rebuilds it.
+            self.report_cache.store_rows(cache_key, rows, timeout)
+            logger.warning(f"{failed} {report_name} report shards failed, stored {len(rows)} rows in {cache_key} as partial")
+            return len(rows)
+        self.report_cache.begin_rebuild(cache_key)
+        self.report_cache.store_rows(cache_key, rows, timeout, full=True, delta=delta)
+        self.report_cache.record('sharded_rebuild')
+        logger.info(f"Merged {len(rows)} {report_name} report rows into cache {cache_key}")
+        return len(rows)
+
+    def build_report_locally(self, report_name: str, period: Iterable[int], shard_size: int, max_workers: Optional[int] = None) -> int:
+        period = tuple(period)
+        now_local = timezone.localtime(timezone.now())
+        shards = self.shard_employee_ids(shard_size)
+        started = time.monotonic()
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            shard_rows = list(executor.map(
+                _compute_report_shard,
+                repeat(report_name), repeat(period), shards, repeat(now_local.isoformat())
+            ))
+        return self.store_report_shards(report_name, period, shard_rows, delta=time.monotonic() - started)
+
+    @staticmethod
+    def employee_report_key(cache_key: str, employee_id: int) -> str:
+        return f"{cache_key}_employee_{employee_id}"
+
+    def _get_employee_report(
+        self,
+        employee: Any,
+        cache_key: str,
+        timeout: int,
+        start_date: date,
+        end_date: date,
+        working_days: List[date],
+        now_local: datetime,
+        report_name: str
+    ) -> Dict[str, Any]:
+        rows, meta = self.report_cache.get_rows(cache_key, [employee.id])
+        if employee.id in rows and not self.report_cache.is_expired(meta):
+            self.report_cache.record('employee_hit')
+            return rows[employee.id]
+
+        employee_key = self.employee_report_key(cache_key, employee.id)
+        cached_row = cache.get(employee_key)
+        if cached_row:
+            self.report_cache.record('employee_hit')
+            return cached_row
+
+        self.report_cache.record('employee_miss')
+        row = self._build_period_report(
+            start_date, end_date, working_days, now_local, report_name, [employee], scoped=True
+        )[0]
+        cache.set(employee_key, row, timeout)
+        logger.info(f"Computed {report_name} report row for employee {employee.id} ({employee_key})")
+        return row
+
+    def get_employee_weekly_report(self, employee: Any, year: int, month: int, week: int) -> Dict[str, Any]:
+        start_date, end_date, working_days = self._weekly_period(year, month, week)
+        now_local = timezone.localtime(timezone.now())
+        return self._get_employee_report(
+            employee, ReportCacheService.weekly_key(year, month, week), settings.WEEKLY_REPORT_CACHE_TIMEOUT,
+            start_date, end_date, working_days, now_local, 'weekly'
+        )
+
+    def get_employee_monthly_report(self, employee: Any, year: int, month: int) -> Dict[str, Any]:
+        now_local = timezone.localtime(timezone.now())
+        start_date, end_date, working_days = self._monthly_period(year, month, now_local.date())
+        return self._get_employee_report(
+            employee, ReportCacheService.monthly_key(year, month), settings.MONTHLY_REPORT_CACHE_TIMEOUT,
+            start_date, end_date, working_days, now_local, 'monthly'
+        )
+
+    def _periods_for_dates(self, dates: Iterable[date]) -> Dict[str, tuple]:
+        periods = {}
+        for day in dates:
+            periods[ReportCacheService.monthly_key(day.year, day.month)] = ('monthly', day.year, day.month)
+            previous_month = day.replace(day=1) - timedelta(days=1)
+            for year, month in {(day.year, day.month), (previous_month.year, previous_month.month)}:
+                for week in range(1, 7):
+                    start_date, end_date = self.get_week_start_end_date(year, month, week)
+                    if start_date <= day <= end_date:
+                        periods[ReportCacheService.weekly_key(year, month, week)] = ('weekly', year, month, week)
+        return periods
+
+    def patch_employee_rows(self, employee: Any, dates: Iterable[date]) -> int:
+        now_local = timezone.localtime(timezone.now())
+        patched = 0
+        periods = self._periods_for_dates(dates)
+        cache.delete_many([self.employee_report_key(cache_key, employee.id) for cache_key in periods])
+        for cache_key, period in periods.items():
+            if not self.report_cache.exists(cache_key):
+                continue
+            _, timeout, start_date, end_date, working_days = self._resolve_period(period[0], period[1:], now_local)
+            rows = self._build_period_report(
+                start_date, end_date, working_days, now_local, period[0], [employee], scoped=True
+            )
+            if self.report_cache.patch_rows(cache_key, {employee.id: rows[0]}, timeout) is not None:
+                patched += 1
+        return patched
 
     def get_monthly_report_serialized(self, year: int, month: int) -> List[Dict[str, Any]]:
         report_data = self.get_monthly_report(year, month)
         serializer = AttendanceReportSerializer(report_data, many=True)
-        return serializer.data
\ No newline at end of file
+        return serializer.data
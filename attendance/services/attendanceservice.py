@@ -4,11 +4,17 @@ from django.utils import timezone
 from datetime import timedelta, date
 from employee.models import Employee
 from ..models import Attendance
+from ..attendancerepository import AttendanceRepository
+from ..receivers import schedule_real_time_push
+from .dailysummaryservice import DailySummaryService
 import logging
 
 logger = logging.getLogger(__name__)
 
 class AttendanceService:
+    def __init__(self, daily_summary_service: DailySummaryService = None):
+        self.daily_summary_service = daily_summary_service or DailySummaryService(AttendanceRepository())
+
     @transaction.atomic
     def set_employee_on_leave(self, employee: Employee, start_date: date, end_date: date):
         current_date = start_date
@@ -28,4 +34,8 @@ class AttendanceService:
             except Exception as e:
                 logger.error(f"Failed to set 'on_leave' for {employee.user.username} on {current_date}: {e}")
                 raise ValidationError(f"Failed to set 'on_leave' for {current_date}: {e}")
-            current_date += timedelta(days=1)
\ No newline at end of file
+            current_date += timedelta(days=1)
+
+        self.daily_summary_service.refresh_date_range(employee, start_date, end_date)
+        if start_date <= timezone.localdate() <= end_date:
+            schedule_real_time_push([employee.id])
@@ -1,12 +1,13 @@
 from django.utils import timezone
-from django.db import transaction
-from django.apps import apps
-from django.core.cache import cache  
+from django.db import transaction, IntegrityError
 from ..attendancerepository import AttendanceRepository 
 from employee.services import EmployeeService
 from ..attendancecalculator import AttendanceCalculator
 from employee_tracking_system.utils.time_utils import TimeCalculator  
 from attendance.services.realtimeupdateservice import RealTimeUpdateService
+from attendance.services.dailysummaryservice import DailySummaryService
+from attendance.services.fanoutservice import AttendanceFanoutService
+from attendance.services.liveattendanceservice import LiveAttendanceService
 from employee.models import Employee
 import logging
 
@@ -18,12 +19,18 @@ class CheckInOutService:
         repository: AttendanceRepository,
         employee_service: EmployeeService,
         real_time_service: RealTimeUpdateService,
-        attendance_calculator: AttendanceCalculator  
+        attendance_calculator: AttendanceCalculator,
+        daily_summary_service: DailySummaryService = None,
+        fanout_service: AttendanceFanoutService = None,
+        live_attendance_service: LiveAttendanceService = None
     ):
         self.repository = repository
         self.employee_service = employee_service
         self.real_time_service = real_time_service
         self.attendance_calculator = attendance_calculator
+        self.daily_summary_service = daily_summary_service or DailySummaryService(repository, employee_service)
+        self.fanout_service = fanout_service or AttendanceFanoutService(real_time_service, employee_service, self.daily_summary_service)
+        self.live_attendance_service = live_attendance_service or LiveAttendanceService()
     
     @transaction.atomic
     def handle_check_in(self, employee: Employee) -> dict:
@@ -41,28 +48,35 @@ class CheckInOutService:
             return {"error": "Cannot check in while on leave."}
     
 
-        open_atts = self.repository.get_employee_attendances(employee.id, today).filter(check_out__isnull=True)
-        if open_atts.exists():
-            open_atts.update(check_out=now_local, status='checked_out')
+        attendances_today = list(self.repository.get_employee_attendances(employee.id, today))
+        open_atts = [att for att in attendances_today if att.check_out is None]
+        if open_atts:
+            self.repository.get_employee_attendances(employee.id, today).filter(
+                id__in=[att.id for att in open_atts]
+            ).update(check_out=now_utc, status='checked_out')
+            for att in open_atts:
+                att.check_out, att.status = now_utc, 'checked_out'
     
 
-        attendance = self.repository.create_attendance({
-            "employee": employee,
-            "date": today,
-            "check_in": now_local,
-            "status": "checked_in"
-        })
-    
-
-        self.real_time_service.update_all_real_time_attendance(employee, now_local)
-    
-
-        cache_key = f"attendance:{employee.id}:{today}"
-        cache_data = {"check_in": now_local.isoformat(), "check_out": None}
-        cache.set(cache_key, cache_data, timeout=86400)
-    
-
-        return self.get_attendance_status(employee)
+        try:
+            with transaction.atomic():
+                attendance = self.repository.create_attendance({
+                    "employee": employee,
+                    "date": today,
+                    "check_in": now_utc,
+                    "status": "checked_in"
+                })
+        except IntegrityError:
+            # attendance_one_open_session: a concurrent check-in opened today's session first.
+            logger.warning(f"Concurrent check-in rejected for employee {employee.id} on {today}")
+            return {"error": "A check-in is already in progress."}
+        attendances_today.append(attendance)
+
+        # Only the attendance write holds the row locks; the rollup is refreshed by the fan-out job.
+        self.live_attendance_service.discard_on_commit(employee.id, today)
+        self.fanout_service.schedule(employee.id, 'check_in', now_local, refresh_summary=True)
+
+        return self._status_from_attendances(employee, attendances_today, now_local)
     
     @transaction.atomic
     def handle_check_out(self, employee: Employee) -> dict:
@@ -77,60 +91,57 @@ class CheckInOutService:
         if self.repository.is_employee_on_leave(employee.id, today):
             return {"error": "Cannot check out while on leave."}
     
-        latest_att = (
-            self.repository.get_employee_attendances(employee.id, today)
-                        .filter(check_out__isnull=True)
-                        .last()
-        )
-        if not latest_att:
+        attendances_today = list(self.repository.get_employee_attendances(employee.id, today).order_by('id'))
+        open_atts = [att for att in attendances_today if att.check_out is None]
+        if not open_atts:
             return {"error": "You need to check in first."}
 
-        latest_att.check_out = now_local
+        latest_att = open_atts[-1]
+        latest_att.check_out = now_utc
         latest_att.status = 'checked_out'
-        latest_att.save()
-    
+        latest_att.save(update_fields=['check_out', 'status'])
 
-        self.real_time_service.update_all_real_time_attendance(employee, now_local)
-    
-        cache_key = f"attendance:{employee.id}:{today}"
-        cache_data = cache.get(cache_key) or {}
-        cache_data["check_out"] = now_local.isoformat()
-        cache.set(cache_key, cache_data, timeout=86400)
-    
+        self.live_attendance_service.discard_on_commit(employee.id, today)
+        self.fanout_service.schedule(employee.id, 'check_out', now_local, refresh_summary=True)
 
-        return self.get_attendance_status(employee)
+        return self._status_from_attendances(employee, attendances_today, now_local)
     
     def get_attendance_status(self, employee: Employee, include_no_check_in: bool = True) -> dict:
         now_local = timezone.localtime(timezone.now())
         today = now_local.date()
+        record = self.live_attendance_service.get_record(employee.id, today)
+        if record is None:
+            attendances_today = list(self.repository.get_employee_attendances(employee.id, today))
+            self.live_attendance_service.backfill([employee], today, {(employee.id, today): attendances_today})
+            return self._status_from_attendances(employee, attendances_today, now_local, include_no_check_in)
 
-        attendances_today = self.repository.get_employee_attendances(employee.id, today)
-
-
-        reg_dt = getattr(employee, 'registration_datetime', None)  
+        result = self.live_attendance_service.evaluate(record, now_local, include_no_check_in)
+        check_ins, check_outs = record.session_times()
+        return self._format_status(today, check_ins, check_outs, result)
 
-        daily_lateness = self.attendance_calculator.calculate_lateness(
-            attendances=attendances_today,
+    def _status_from_attendances(self, employee: Employee, attendances_today: list, now_local, include_no_check_in: bool = True) -> dict:
+        today = now_local.date()
+        reg_dt = getattr(employee, 'registration_datetime', None)
+        result = self.attendance_calculator.calculate_batch(
+            {(employee.id, today): attendances_today},
             now=now_local,
-            include_no_check_in=include_no_check_in,
-            registration_dt=reg_dt 
-        )
-        daily_work = self.attendance_calculator.calculate_work_duration(
-            attendances=attendances_today,
-            now=now_local
-        )
-        AttendanceModel = apps.get_model("attendance", "Attendance")
-        status = AttendanceModel.objects.determine_attendance_status(attendances_today, now_local, today)
-    
-    
-        check_in_times = [TimeCalculator.format_datetime(a.check_in) for a in attendances_today if a.check_in]
-        check_out_times = [TimeCalculator.format_datetime(a.check_out) for a in attendances_today if a.check_out]
+            registrations={employee.id: reg_dt},
+            include_no_check_in=include_no_check_in
+        )[(employee.id, today)]
+        check_ins = [a.check_in for a in attendances_today if a.check_in]
+        check_outs = [a.check_out for a in attendances_today if a.check_out]
+        return self._format_status(today, check_ins, check_outs, result)
+
+    @staticmethod
+    def _format_status(today, check_ins: list, check_outs: list, result) -> dict:
+        check_in_times = [TimeCalculator.format_datetime(check_in) for check_in in check_ins]
+        check_out_times = [TimeCalculator.format_datetime(check_out) for check_out in check_outs]
     
         return {
             "date": str(today),
             "check_ins": check_in_times if check_in_times else ["N/A"],
             "check_outs": check_out_times if check_out_times else ["N/A"],
-            "lateness": TimeCalculator.timedelta_to_hhmm(daily_lateness),
-            "work_duration": TimeCalculator.timedelta_to_hhmm(daily_work),
-            "status": status
-        }
\ No newline at end of file
+            "lateness": TimeCalculator.timedelta_to_hhmm(result.lateness),
+            "work_duration": TimeCalculator.timedelta_to_hhmm(result.work_duration),
+            "status": result.status
+        }
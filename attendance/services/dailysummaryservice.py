@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta, date
+from typing import Any, Iterable, List, Optional
+from collections import defaultdict
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from employee_tracking_system.utils.time_utils import TimeCalculator
+from employee_tracking_system.services.working_hours_service import WorkingHoursService
+from employee.models import Employee
+from ..attendancereportengine import AttendanceReportEngine, AttendanceColumns
+from ..models import AttendanceDailySummary
+from ..signals import attendance_changed
+from .liveattendanceservice import LiveAttendanceService
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ['presence', 'lateness', 'status', 'session_count', 'is_frozen', 'version', 'updated_at']
+CHANGE_FIELDS = ['presence', 'lateness', 'status', 'session_count']
+
+
+class DailySummaryService:
+    def __init__(self, repository, employee_service=None, report_engine: AttendanceReportEngine = None,
+                 live_attendance_service: LiveAttendanceService = None):
+        self.repository = repository
+        self.employee_service = employee_service
+        self.report_engine = report_engine or AttendanceReportEngine()
+        self.live_attendance_service = live_attendance_service or LiveAttendanceService()
+
+    @staticmethod
+    def is_day_closed(target_date: date, now_local: datetime) -> bool:
+        today = now_local.date()
+        if target_date != today:
+            return target_date < today
+        _, end_of_work = WorkingHoursService.get_work_bounds(target_date)
+        return now_local >= end_of_work
+
+    @staticmethod
+    def _day_status(attendances: List[Any], is_working_day: bool) -> str:
+        statuses = {att.status for att in attendances}
+        for status in ('on_leave', 'checked_in', 'checked_out'):
+            if status in statuses:
+                return status
+        if attendances or is_working_day:
+            return 'not_checked_in'
+        return 'not_working_day'
+
+    def refresh_summary(self, employee: Employee, target_date: date, now_local: Optional[datetime] = None) -> Optional[AttendanceDailySummary]:
+        summaries = self.refresh_summaries([employee], target_date, now_local)
+        return summaries[0] if summaries else None
+
+    def refresh_date_range(self, employee: Employee, start_date: date, end_date: date, now_local: Optional[datetime] = None):
+        current_date = start_date
+        while current_date <= end_date:
+            self.refresh_summary(employee, current_date, now_local)
+            current_date += timedelta(days=1)
+
+    def refresh_summaries(self, employees: Iterable[Employee], target_date: date, now_local: Optional[datetime] = None) -> List[AttendanceDailySummary]:
+        employees = list(employees)
+        if not employees:
+            return []
+        now_local = now_local or timezone.localtime(timezone.now())
+        try:
+            return self._refresh_summaries(employees, target_date, now_local)
+        except IntegrityError:
+            logger.warning(f"Concurrent daily summary insert for {target_date}, retrying")
+            return self._refresh_summaries(employees, target_date, now_local)
+
+    @transaction.atomic
+    def _refresh_summaries(self, employees: List[Employee], target_date: date, now_local: datetime) -> List[AttendanceDailySummary]:
+        employee_ids = [employee.id for employee in employees]
+        employee_index = {employee_id: idx for idx, employee_id in enumerate(employee_ids)}
+        existing = {
+            summary.employee_id: summary
+            for summary in self.repository.get_daily_summaries(employee_ids, target_date).select_for_update()
+        }
+        attendances = list(self.repository.get_attendances_for_employees(employee_ids, target_date))
+
+        is_working_day = TimeCalculator.is_working_day(target_date)
+        columns = AttendanceColumns.from_attendances(attendances, employee_index)
+        registrations = [getattr(employee, 'registration_datetime', None) for employee in employees]
+        matrix = self.report_engine.daily_matrix(
+            columns, registrations, target_date, target_date,
+            [target_date] if is_working_day else [], now_local
+        )
+        closed = self.is_day_closed(target_date, now_local)
+        attendances_by_employee = defaultdict(list)
+        for att in attendances:
+            attendances_by_employee[att.employee_id].append(att)
+        updated_at = timezone.now()
+
+        summaries, to_create, to_update, changed = [], [], [], []
+        for idx, employee in enumerate(employees):
+            if matrix.failed[idx, 0]:
+                logger.error(f"Daily summary for employee {employee.id} on {target_date} left open: unsortable attendance sessions")
+            values = {
+                'presence': timedelta(microseconds=int(matrix.work_us[idx, 0])),
+                'lateness': timedelta(microseconds=int(matrix.lateness_us[idx, 0])),
+                'status': self._day_status(attendances_by_employee[employee.id], is_working_day),
+                'session_count': int(matrix.session_count[idx, 0]),
+                'is_frozen': closed and not matrix.failed[idx, 0],
+                'updated_at': updated_at,
+            }
+            summary = existing.get(employee.id)
+            if summary is None:
+                summary = AttendanceDailySummary(employee=employee, date=target_date, version=1, **values)
+                to_create.append(summary)
+                if summary.session_count:
+                    changed.append(employee.id)
+            else:
+                if any(getattr(summary, field) != values[field] for field in CHANGE_FIELDS):
+                    changed.append(employee.id)
+                for field, value in values.items():
+                    setattr(summary, field, value)
+                summary.version += 1
+                to_update.append(summary)
+            summaries.append(summary)
+
+        if to_create:
+            AttendanceDailySummary.objects.bulk_create(to_create)
+        if to_update:
+            AttendanceDailySummary.objects.bulk_update(to_update, SUMMARY_FIELDS)
+        if changed:
+            attendance_changed.send(sender=self.__class__, employee_ids=changed, dates=[target_date])
+        if target_date == now_local.date():
+            self.live_attendance_service.write_on_commit([
+                self.live_attendance_service.build_record(
+                    employee, target_date, attendances_by_employee[employee.id], summary.version
+                )
+                for employee, summary in zip(employees, summaries)
+            ])
+        logger.debug(f"Daily summaries refreshed for {len(summaries)} employees on {target_date} (frozen={closed})")
+        return summaries
+
+    def refresh_days(self, dates: Iterable[date], now_local: Optional[datetime] = None) -> int:
+        # Recomputes every employee's rollup on the given days; closed days are frozen again.
+        now_local = now_local or timezone.localtime(timezone.now())
+        employees = list(self.employee_service.get_all_employees())
+        frozen_count = 0
+        for target_date in sorted(set(dates)):
+            summaries = self.refresh_summaries(employees, target_date, now_local)
+            frozen_count += sum(1 for summary in summaries if summary.is_frozen)
+        logger.info(f"Refreshed daily summaries on {len(set(dates))} days: {frozen_count} frozen")
+        return frozen_count
+
+    def close_day(self, target_date: Optional[date] = None, now_local: Optional[datetime] = None, lookback_days: int = 7) -> int:
+        now_local = now_local or timezone.localtime(timezone.now())
+        if target_date is None:
+            today = now_local.date()
+            target_date = today if self.is_day_closed(today, now_local) else today - timedelta(days=1)
+
+        employees = list(self.employee_service.get_all_employees())
+        summaries = self.refresh_summaries(employees, target_date, now_local)
+
+        pending = self.repository.get_pending_daily_summaries(target_date - timedelta(days=lookback_days), target_date)
+        employees_by_id = {employee.id: employee for employee in employees}
+        for pending_date, employee_ids in pending.items():
+            self.refresh_summaries(
+                [employees_by_id[employee_id] for employee_id in employee_ids if employee_id in employees_by_id],
+                pending_date, now_local
+            )
+
+        frozen_count = sum(1 for summary in summaries if summary.is_frozen)
+        logger.info(f"Closed attendance day {target_date}: {frozen_count}/{len(summaries)} summaries frozen")
+        return frozen_count
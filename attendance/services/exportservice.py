@@ -0,0 +1,119 @@
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from django.conf import settings
+from django.utils import timezone
+import calendar
+import csv
+import json
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+REPORT_FIELDS = ['year', 'month', 'start_date', 'end_date', 'employee', 'total_hours', 'total_lateness', 'avg_daily_hours', 'days_worked', 'days_late']
+SESSION_FIELDS = ['id', 'employee_id', 'employee', 'date', 'check_in', 'check_out', 'status']
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_KINDS = ('report', 'sessions')
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class _LineBuffer:
+    def write(self, value: str) -> str:
+        return value
+
+
+class AttendanceExportService:
+    def __init__(self, repository, report_service, chunk_size: Optional[int] = None):
+        self.repository = repository
+        self.report_service = report_service
+        self.chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+    @staticmethod
+    def _months_between(start_date: date, end_date: date) -> Iterator[tuple]:
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            yield year, month
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    @staticmethod
+    def _month_end(year: int, month: int) -> date:
+        return date(year, month, calendar.monthrange(year, month)[1])
+
+    @staticmethod
+    def _local_isoformat(value) -> Optional[str]:
+        return timezone.localtime(value).isoformat() if value else None
+
+    def iter_report_records(self, start_date: date, end_date: date, employees: Optional[List[Any]] = None) -> Iterator[Dict[str, Any]]:
+        for year, month in self._months_between(start_date, end_date):
+            month_start = max(start_date, date(year, month, 1))
+            month_end = min(end_date, self._month_end(year, month))
+            rows = self.report_service.iter_monthly_report_rows(
+                year, month, self.chunk_size, employees, clip_start=month_start, clip_end=month_end
+            )
+            for row in rows:
+                yield {'year': year, 'month': month, 'start_date': month_start.isoformat(), 'end_date': month_end.isoformat(), **row}
+
+    def iter_session_records(self, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None) -> Iterator[Dict[str, Any]]:
+        sessions = self.repository.iter_sessions_between_dates(start_date, end_date, employee_ids, self.chunk_size)
+        for attendance_id, employee_id, username, day, check_in, check_out, status in sessions:
+            yield {
+                'id': attendance_id,
+                'employee_id': employee_id,
+                'employee': username,
+                'date': day.isoformat(),
+                'check_in': self._local_isoformat(check_in),
+                'check_out': self._local_isoformat(check_out),
+                'status': status,
+            }
+
+    def iter_records(self, kind: str, start_date: date, end_date: date, employees: Optional[List[Any]] = None) -> Iterator[Dict[str, Any]]:
+        if kind == 'report':
+            return self.iter_report_records(start_date, end_date, employees)
+        employee_ids = [employee.id for employee in employees] if employees is not None else None
+        return self.iter_session_records(start_date, end_date, employee_ids)
+
+    @staticmethod
+    def fields_for(kind: str) -> List[str]:
+        return REPORT_FIELDS if kind == 'report' else SESSION_FIELDS
+
+    def _encode_csv(self, records: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+        writer = csv.DictWriter(_LineBuffer(), fieldnames=fields, extrasaction='ignore')
+        yield writer.writeheader()
+        for record in records:
+            yield writer.writerow(record)
+
+    @staticmethod
+    def _encode_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        for record in records:
+            yield json.dumps(record, default=str) + '\n'
+
+    def _batch(self, lines: Iterable[str]) -> Iterator[bytes]:
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= self.chunk_size:
+                yield ''.join(batch).encode('utf-8')
+                batch = []
+        if batch:
+            yield ''.join(batch).encode('utf-8')
+
+    @staticmethod
+    def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(wbits=GZIP_WBITS)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def stream(self, kind: str, export_format: str, start_date: date, end_date: date, employees: Optional[List[Any]] = None, compress: bool = False) -> Iterator[bytes]:
+        records = self.iter_records(kind, start_date, end_date, employees)
+        if export_format == 'csv':
+            lines = self._encode_csv(records, self.fields_for(kind))
+        else:
+            lines = self._encode_ndjson(records)
+        chunks = self._batch(lines)
+        if compress:
+            chunks = self._gzip(chunks)
+        logger.info(f"Streaming {kind} export as {export_format} for {start_date} - {end_date} (gzip={compress})")
+        return chunks
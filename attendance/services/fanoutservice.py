@@ -0,0 +1,128 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from employee_tracking_system.utils.notification_utils import send_notification
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+EVENTS_KEY = 'attendance_fanout:{employee_id}:events'
+PENDING_KEY = 'attendance_fanout:{employee_id}:pending'
+EVENTS_TTL = 60 * 60 * 24
+
+# Drops the published events; the pending flag is only cleared when nothing new was queued meanwhile.
+ACKNOWLEDGE_SCRIPT = """
+redis.call('LTRIM', KEYS[1], ARGV[1], -1)
+local remaining = redis.call('LLEN', KEYS[1])
+if remaining == 0 then
+    redis.call('DEL', KEYS[2])
+end
+return remaining
+"""
+
+
+class AttendanceFanoutService:
+    def __init__(self, real_time_service, employee_service, daily_summary_service=None, connection=None):
+        self.real_time_service = real_time_service
+        self.employee_service = employee_service
+        self.daily_summary_service = daily_summary_service
+        self._connection = connection
+        self._acknowledge_script = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_redis_connection("default")
+        return self._connection
+
+    def schedule(self, employee_id: int, action: str, at: datetime, refresh_summary: bool = False):
+        event = {'action': action, 'at': at.isoformat()}
+        if refresh_summary:
+            event['refresh_summary'] = True
+        transaction.on_commit(lambda: self.enqueue(employee_id, event))
+
+    def enqueue(self, employee_id: int, event: Dict[str, str]):
+        from ..tasks import publish_attendance_changes
+        coalesce_seconds = settings.ATTENDANCE_FANOUT_COALESCE_SECONDS
+        try:
+            events_key = EVENTS_KEY.format(employee_id=employee_id)
+            pipe = self.connection.pipeline()
+            pipe.rpush(events_key, json.dumps(event))
+            pipe.expire(events_key, EVENTS_TTL)
+            pipe.set(PENDING_KEY.format(employee_id=employee_id), 1, nx=True, ex=coalesce_seconds + 60)
+            _, _, first = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Fan-out queue unavailable for employee {employee_id}, publishing directly: {e}")
+            publish_attendance_changes.delay(employee_id, [event])
+            return
+        if first:
+            publish_attendance_changes.apply_async((employee_id,), countdown=coalesce_seconds)
+        else:
+            logger.debug(f"Fan-out for employee {employee_id} already pending, coalesced {event['action']}")
+
+    def peek(self, employee_id: int) -> List[Dict[str, str]]:
+        raw_events = self.connection.lrange(EVENTS_KEY.format(employee_id=employee_id), 0, -1)
+        return [json.loads(raw) for raw in raw_events]
+
+    def acknowledge(self, employee_id: int, count: int) -> int:
+        # Called after a successful publish, so a failed one leaves the events queued for the retry.
+        from ..tasks import publish_attendance_changes
+        if self._acknowledge_script is None:
+            self._acknowledge_script = self.connection.register_script(ACKNOWLEDGE_SCRIPT)
+        remaining = self._acknowledge_script(
+            keys=[EVENTS_KEY.format(employee_id=employee_id), PENDING_KEY.format(employee_id=employee_id)],
+            args=[count]
+        )
+        if remaining:
+            logger.debug(f"{remaining} fan-out events for employee {employee_id} queued during publish, rescheduling")
+            publish_attendance_changes.apply_async((employee_id,), countdown=settings.ATTENDANCE_FANOUT_COALESCE_SECONDS)
+        return remaining
+
+    @staticmethod
+    def _update_attendance_cache(employee_id: int, events: List[Dict[str, str]]):
+        by_date: Dict[str, List[Dict[str, str]]] = {}
+        for event in events:
+            by_date.setdefault(datetime.fromisoformat(event['at']).date().isoformat(), []).append(event)
+        for day, day_events in by_date.items():
+            cache_key = f"attendance:{employee_id}:{day}"
+            cache_data: Dict[str, Any] = cache.get(cache_key) or {}
+            for event in day_events:
+                if event['action'] == 'check_in':
+                    cache_data = {"check_in": event['at'], "check_out": None}
+                else:
+                    cache_data["check_out"] = event['at']
+            cache.set(cache_key, cache_data, timeout=86400)
+
+    def publish(self, employee_id: int, events: List[Dict[str, str]]) -> int:
+        if not events:
+            return 0
+        employee = self.employee_service.get_employee(employee_id)
+        if not employee:
+            logger.warning(f"Dropping {len(events)} fan-out events for missing employee {employee_id}")
+            return 0
+        events = sorted(events, key=lambda event: event['at'])
+        now_local = timezone.localtime(timezone.now())
+
+        # Rollups are refreshed here rather than in the check-in transaction, and before the push,
+        # so the push reads the refreshed live record.
+        summary_days = sorted({datetime.fromisoformat(event['at']).date() for event in events if event.get('refresh_summary')})
+        for day in summary_days:
+            self.daily_summary_service.refresh_summary(employee, day, now_local)
+        self.real_time_service.update_all_real_time_attendance(employee, now_local)
+        self._update_attendance_cache(employee.id, events)
+        for event in events:
+            if event['action'] == 'check_in':
+                send_notification(
+                    user=employee.user,
+                    notification_type="CHECK_IN",
+                    time=event['at'],
+                    type='temporary',
+                    severity='success',
+                )
+        logger.info(f"Published {len(events)} attendance changes for employee {employee_id} in one fan-out")
+        return len(events)
@@ -0,0 +1,198 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from ..models import Attendance, AttendanceEvent
+import logging
+
+logger = logging.getLogger(__name__)
+
+INGEST_DIRECTIONS = ('in', 'out')
+FANOUT_ACTIONS = {'in': 'check_in', 'out': 'check_out'}
+
+
+class IngestEvent:
+    __slots__ = ('index', 'key', 'employee_id', 'direction', 'timestamp', 'local', 'day')
+
+    def __init__(self, index: int, key: str, employee_id: int, direction: str, timestamp: datetime):
+        self.index = index
+        self.key = key
+        self.employee_id = employee_id
+        self.direction = direction
+        self.timestamp = timestamp
+        self.local = timezone.localtime(timestamp)
+        self.day = self.local.date()
+
+
+class AttendanceIngestionService:
+    def __init__(self, repository, employee_service, attendance_calculator, daily_summary_service, fanout_service, chunk_size: Optional[int] = None):
+        self.repository = repository
+        self.employee_service = employee_service
+        self.attendance_calculator = attendance_calculator
+        self.daily_summary_service = daily_summary_service
+        self.fanout_service = fanout_service
+        self.chunk_size = chunk_size or settings.INGEST_EMPLOYEES_PER_TRANSACTION
+
+    @staticmethod
+    def _parse(index: int, raw: Any, source: str) -> Tuple[Optional[IngestEvent], Optional[str]]:
+        if not isinstance(raw, dict):
+            return None, "Event must be an object."
+        try:
+            employee_id = int(raw['employee_id'])
+        except (KeyError, TypeError, ValueError):
+            return None, "employee_id must be an integer."
+        direction = raw.get('direction')
+        if direction not in INGEST_DIRECTIONS:
+            return None, f"direction must be one of {', '.join(INGEST_DIRECTIONS)}."
+        try:
+            timestamp = datetime.fromisoformat(str(raw['timestamp']))
+        except (KeyError, ValueError):
+            return None, "timestamp must be an ISO 8601 datetime."
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        key = str(raw.get('idempotency_key') or f"{source}:{employee_id}:{direction}:{timestamp.isoformat()}")
+        if len(key) > 128:
+            return None, "idempotency_key must be at most 128 characters."
+        return IngestEvent(index, key, employee_id, direction, timestamp), None
+
+    def ingest(self, raw_events: List[Any], source: str = '') -> Dict[str, Any]:
+        rejected = []
+        events: Dict[str, IngestEvent] = {}
+        duplicates = 0
+        for index, raw in enumerate(raw_events):
+            event, error = self._parse(index, raw, source)
+            if error:
+                rejected.append({'index': index, 'error': error})
+            elif event.key in events:
+                duplicates += 1
+            else:
+                events[event.key] = event
+
+        already_ingested = self.repository.get_ingested_event_keys(list(events))
+        duplicates += len(already_ingested)
+        pending = [event for key, event in events.items() if key not in already_ingested]
+
+        employees = {
+            employee.id: employee
+            for employee in self.employee_service.get_employees_by_ids(list({event.employee_id for event in pending}))
+        }
+        by_employee = defaultdict(list)
+        for event in pending:
+            if event.employee_id not in employees:
+                rejected.append({'index': event.index, 'idempotency_key': event.key, 'error': "Employee not found."})
+            else:
+                by_employee[event.employee_id].append(event)
+        for employee_events in by_employee.values():
+            employee_events.sort(key=lambda event: (event.timestamp, event.index))
+
+        applied = 0
+        employee_ids = sorted(by_employee)
+        for offset in range(0, len(employee_ids), self.chunk_size):
+            chunk = {employee_id: by_employee[employee_id] for employee_id in employee_ids[offset:offset + self.chunk_size]}
+            try:
+                chunk_applied, chunk_rejected = self._apply_chunk(chunk, employees, source)
+            except IntegrityError:
+                # A concurrent batch recorded some of these keys first, or a concurrent check-in opened a
+                # session; drop the duplicates and retry each employee on its own.
+                logger.warning(f"Concurrent ingestion of {len(chunk)} employees' events, retrying per employee")
+                seen = self.repository.get_ingested_event_keys([event.key for events in chunk.values() for event in events])
+                duplicates += len(seen)
+                chunk = {
+                    employee_id: [event for event in events if event.key not in seen]
+                    for employee_id, events in chunk.items()
+                }
+                chunk_applied, chunk_rejected = self._apply_per_employee(chunk, employees, source)
+            applied += chunk_applied
+            rejected.extend(chunk_rejected)
+
+        rejected.sort(key=lambda entry: entry['index'])
+        logger.info(
+            f"Ingested {len(raw_events)} attendance events from '{source}': "
+            f"{applied} applied, {duplicates} duplicates, {len(rejected)} rejected"
+        )
+        return {'received': len(raw_events), 'applied': applied, 'duplicates': duplicates, 'rejected': rejected}
+
+    def _apply_per_employee(self, chunk: Dict[int, List[IngestEvent]], employees: Dict[int, Any], source: str) -> Tuple[int, List[Dict[str, Any]]]:
+        applied, rejected = 0, []
+        for employee_id, events in chunk.items():
+            if not events:
+                continue
+            try:
+                employee_applied, employee_rejected = self._apply_chunk({employee_id: events}, employees, source)
+            except IntegrityError as e:
+                # Still conflicting: skip the employee's events without recording them, so they can be resent.
+                logger.warning(f"Skipping {len(events)} events of employee {employee_id} after a conflicting attendance change: {e}")
+                rejected.extend(
+                    {'index': event.index, 'idempotency_key': event.key, 'error': "Conflicts with a concurrent attendance change; resend the event."}
+                    for event in events
+                )
+                continue
+            applied += employee_applied
+            rejected.extend(employee_rejected)
+        return applied, rejected
+
+    @transaction.atomic
+    def _apply_chunk(self, chunk: Dict[int, List[IngestEvent]], employees: Dict[int, Any], source: str) -> Tuple[int, List[Dict[str, Any]]]:
+        dates = sorted({event.day for events in chunk.values() for event in events})
+        sessions = defaultdict(list)
+        for attendance in self.repository.get_attendances_for_update(list(chunk), dates):
+            sessions[(attendance.employee_id, attendance.date)].append(attendance)
+
+        created, updated, records, rejected = [], {}, [], []
+        touched = defaultdict(dict)
+        applied_events: List[IngestEvent] = []
+        for employee_id, events in chunk.items():
+            for event in events:
+                day_sessions = sessions[(employee_id, event.day)]
+                error = self._apply_event(event, day_sessions, created, updated)
+                records.append(AttendanceEvent(
+                    idempotency_key=event.key, employee_id=employee_id, direction=event.direction,
+                    timestamp=event.timestamp, source=source,
+                    result='rejected' if error else 'applied', detail=error or ''
+                ))
+                if error:
+                    rejected.append({'index': event.index, 'idempotency_key': event.key, 'error': error})
+                    continue
+                applied_events.append(event)
+                touched[event.day][employee_id] = employees[employee_id]
+
+        self.repository.bulk_apply_attendances(created, list(updated.values()))
+        self.repository.create_attendance_events(records)
+
+        now_local = timezone.localtime(timezone.now())
+        for day, day_employees in touched.items():
+            self.daily_summary_service.refresh_summaries(list(day_employees.values()), day, now_local)
+        # Every accepted event is queued; the fan-out coalesces them per employee but keeps each check-in notification.
+        for event in applied_events:
+            self.fanout_service.schedule(event.employee_id, FANOUT_ACTIONS[event.direction], event.local)
+        return len(records) - len(rejected), rejected
+
+    def _apply_event(self, event: IngestEvent, day_sessions: List[Attendance], created: List[Attendance], updated: Dict[int, Attendance]) -> Optional[str]:
+        if not self.attendance_calculator.is_working_time(event.local):
+            return f"Cannot check {event.direction} outside working hours."
+        if any(session.status == 'on_leave' for session in day_sessions):
+            return f"Cannot check {event.direction} while on leave."
+        stamps = [stamp for session in day_sessions for stamp in (session.check_in, session.check_out) if stamp]
+        if stamps and event.timestamp < max(stamps):
+            return "Event is older than the last recorded action."
+
+        open_sessions = [session for session in day_sessions if session.check_out is None and session.check_in]
+        if event.direction == 'out':
+            if not open_sessions:
+                return "You need to check in first."
+            open_sessions = open_sessions[-1:]
+            if event.timestamp <= open_sessions[0].check_in:
+                return "Check-out time must be after check-in time."
+
+        for session in open_sessions:
+            session.check_out = event.timestamp
+            session.status = 'checked_out'
+            if session.pk:
+                updated[session.pk] = session
+        if event.direction == 'in':
+            session = Attendance(employee_id=event.employee_id, date=event.day, check_in=event.timestamp, status='checked_in')
+            day_sessions.append(session)
+            created.append(session)
+        return None
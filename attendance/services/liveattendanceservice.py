@@ -0,0 +1,291 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+from employee_tracking_system.services.working_hours_service import WorkingHoursService
+from employee_tracking_system.utils.time_utils import TimeCalculator
+from ..attendancecalculator import AttendanceCalculator, DailyAttendanceResult
+from ..attendancereportengine import to_epoch_us, from_epoch_us
+from ..attendancerow import AttendanceLike, AttendanceRow
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+LIVE_KEY = 'live_attendance:{employee_id}:{day}'
+
+# Replaces the whole hash unless a newer version is already stored (ARGV[3] == '1' forces the write).
+WRITE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if ARGV[3] ~= '1' and current and tonumber(current) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'version', ARGV[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class LiveAttendanceRecord:
+    __slots__ = (
+        'employee_id', 'day', 'version', 'rows', 'registration_us', 'start_us', 'end_us', 'on_leave', 'any_open',
+        'open_start_us', 'work_closed_us', 'late_closed_us', 'horizon_us', 'last_action_us'
+    )
+
+    def __init__(self, employee_id: int, day: date, version: int, rows: List[list], registration_us: Optional[int],
+                 start_us: int, end_us: int, on_leave: bool, any_open: bool, open_start_us: Optional[int],
+                 work_closed_us: int, late_closed_us: int, horizon_us: int, last_action_us: Optional[int]):
+        self.employee_id = employee_id
+        self.day = day
+        self.version = version
+        self.rows = rows
+        self.registration_us = registration_us
+        self.start_us = start_us
+        self.end_us = end_us
+        self.on_leave = on_leave
+        self.any_open = any_open
+        self.open_start_us = open_start_us
+        self.work_closed_us = work_closed_us
+        self.late_closed_us = late_closed_us
+        self.horizon_us = horizon_us
+        self.last_action_us = last_action_us
+
+    def to_mapping(self) -> Dict[str, str]:
+        return {
+            'rows': json.dumps(self.rows),
+            'registration_us': '' if self.registration_us is None else str(self.registration_us),
+            'start_us': str(self.start_us),
+            'end_us': str(self.end_us),
+            'on_leave': '1' if self.on_leave else '0',
+            'any_open': '1' if self.any_open else '0',
+            'open_start_us': '' if self.open_start_us is None else str(self.open_start_us),
+            'work_closed_us': str(self.work_closed_us),
+            'late_closed_us': str(self.late_closed_us),
+            'horizon_us': str(self.horizon_us),
+            'last_action_us': '' if self.last_action_us is None else str(self.last_action_us),
+        }
+
+    @classmethod
+    def from_mapping(cls, employee_id: int, day: date, mapping: Dict[bytes, bytes]) -> 'LiveAttendanceRecord':
+        values = {key.decode(): value.decode() for key, value in mapping.items()}
+
+        def optional_int(field):
+            return int(values[field]) if values[field] else None
+
+        return cls(
+            employee_id, day, int(values['version']), json.loads(values['rows']), optional_int('registration_us'),
+            int(values['start_us']), int(values['end_us']), values['on_leave'] == '1', values['any_open'] == '1',
+            optional_int('open_start_us'), int(values['work_closed_us']), int(values['late_closed_us']),
+            int(values['horizon_us']), optional_int('last_action_us')
+        )
+
+    def attendance_rows(self) -> List[AttendanceRow]:
+        return [
+            AttendanceRow(
+                attendance_id, self.employee_id, self.day,
+                from_epoch_us(check_in) if check_in is not None else None,
+                from_epoch_us(check_out) if check_out is not None else None,
+                status
+            )
+            for attendance_id, check_in, check_out, status in self.rows
+        ]
+
+    def session_times(self) -> Tuple[List[datetime], List[datetime]]:
+        check_ins = [from_epoch_us(check_in) for _, check_in, _, _ in self.rows if check_in is not None]
+        check_outs = [from_epoch_us(check_out) for _, _, check_out, _ in self.rows if check_out is not None]
+        return check_ins, check_outs
+
+
+class LiveAttendanceService:
+    def __init__(self, connection=None):
+        self._connection = connection
+        self._write_script = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_redis_connection("default")
+        return self._connection
+
+    @staticmethod
+    def key(employee_id: int, day: date) -> str:
+        return LIVE_KEY.format(employee_id=employee_id, day=day.isoformat())
+
+    @staticmethod
+    def _closed_presence_us(closed: List[AttendanceLike], window_start: datetime, window_end: datetime) -> int:
+        return AttendanceCalculator.merged_presence_us(
+            AttendanceCalculator.clipped_intervals(closed, window_start, window_end), presorted=True
+        )
+
+    def build_record(self, employee: Any, day: date, attendances: Iterable[AttendanceLike], version: int) -> LiveAttendanceRecord:
+        attendances = sorted(attendances, key=lambda att: att.id)
+        start_of_work, end_of_work = WorkingHoursService.get_work_bounds(day)
+        registration_dt = getattr(employee, 'registration_datetime', None)
+        lateness_start = start_of_work
+        if registration_dt and registration_dt.date() == day and registration_dt > start_of_work:
+            lateness_start = registration_dt
+
+        open_starts = [att.check_in for att in attendances if att.check_out is None and att.check_in and att.status != 'on_leave']
+        open_start = min(open_starts) if open_starts else None
+        # Sorted by check_in once, so both presence sums below merge without re-sorting.
+        closed = sorted(
+            (att for att in attendances if att.check_out is not None and att.check_in),
+            key=lambda att: att.check_in
+        )
+        # Closed sessions only count up to the open session; from there on the open session covers the rest.
+        closed_end = min(open_start, end_of_work) if open_start else end_of_work
+        stamps = [to_epoch_us(value) for att in attendances for value in (att.check_in, att.check_out) if value]
+        last_action_time = AttendanceCalculator._last_action_time(attendances)
+
+        return LiveAttendanceRecord(
+            employee_id=employee.id,
+            day=day,
+            version=version,
+            rows=[
+                [att.id, to_epoch_us(att.check_in) if att.check_in else None,
+                 to_epoch_us(att.check_out) if att.check_out else None, att.status]
+                for att in attendances
+            ],
+            registration_us=to_epoch_us(registration_dt) if registration_dt else None,
+            start_us=to_epoch_us(start_of_work),
+            end_us=to_epoch_us(end_of_work),
+            on_leave=any(att.status == 'on_leave' for att in attendances),
+            any_open=any(att.check_out is None for att in attendances),
+            open_start_us=to_epoch_us(open_start) if open_start else None,
+            work_closed_us=self._closed_presence_us(closed, start_of_work, closed_end),
+            late_closed_us=self._closed_presence_us(closed, lateness_start, closed_end),
+            horizon_us=max(stamps, default=0),
+            last_action_us=to_epoch_us(last_action_time) if last_action_time else None,
+        )
+
+    def write(self, records: List[LiveAttendanceRecord], force: bool = False) -> int:
+        if not records:
+            return 0
+        if self._write_script is None:
+            self._write_script = self.connection.register_script(WRITE_SCRIPT)
+        ttl = settings.LIVE_ATTENDANCE_TTL
+        try:
+            pipe = self.connection.pipeline(transaction=False)
+            for record in records:
+                args = [record.version, ttl, '1' if force else '0']
+                for field, value in record.to_mapping().items():
+                    args.extend((field, value))
+                self._write_script(keys=[self.key(record.employee_id, record.day)], args=args, client=pipe)
+            written = sum(pipe.execute())
+            logger.debug(f"Live attendance: wrote {written}/{len(records)} records")
+            return written
+        except Exception as e:
+            logger.warning(f"Live attendance write failed for {len(records)} records: {e}")
+            return 0
+
+    def write_on_commit(self, records: List[LiveAttendanceRecord]):
+        if records:
+            transaction.on_commit(lambda: self.write(records))
+
+    def discard_on_commit(self, employee_id: int, day: date):
+        # Readers fall back to the database until the next summary refresh writes the record again.
+        transaction.on_commit(lambda: self.discard(employee_id, day))
+
+    def discard(self, employee_id: int, day: date):
+        try:
+            self.connection.delete(self.key(employee_id, day))
+        except Exception as e:
+            logger.warning(f"Failed to discard live attendance record of employee {employee_id} on {day}: {e}")
+
+    def get_records(self, employee_ids: List[int], day: date) -> Dict[int, LiveAttendanceRecord]:
+        if not employee_ids:
+            return {}
+        try:
+            pipe = self.connection.pipeline(transaction=False)
+            for employee_id in employee_ids:
+                pipe.hgetall(self.key(employee_id, day))
+            mappings = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Live attendance read failed, falling back to the database: {e}")
+            return {}
+        records = {}
+        for employee_id, mapping in zip(employee_ids, mappings):
+            if not mapping:
+                continue
+            try:
+                records[employee_id] = LiveAttendanceRecord.from_mapping(employee_id, day, mapping)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Ignoring malformed live attendance record for employee {employee_id} on {day}: {e}")
+        return records
+
+    def get_record(self, employee_id: int, day: date) -> Optional[LiveAttendanceRecord]:
+        return self.get_records([employee_id], day).get(employee_id)
+
+    def backfill(self, employees: Iterable[Any], day: date, sessions: Dict[Tuple[int, date], List[AttendanceLike]]) -> int:
+        # Version 0 never replaces a record written by a summary refresh.
+        return self.write([self.build_record(employee, day, sessions.get((employee.id, day), []), 0) for employee in employees])
+
+    def evaluate(self, record: LiveAttendanceRecord, now_local: datetime, include_no_check_in: bool = True) -> DailyAttendanceResult:
+        now_us = to_epoch_us(now_local)
+        start_of_work, end_of_work = WorkingHoursService.get_work_bounds(record.day)
+        if (
+            now_local.date() != record.day
+            or now_us < record.horizon_us
+            or to_epoch_us(start_of_work) != record.start_us
+            or to_epoch_us(end_of_work) != record.end_us
+        ):
+            return self._evaluate_rows(record, now_local, include_no_check_in)
+
+        start_us, end_us = record.start_us, record.end_us
+        scheduled_end = min(now_us, end_us)
+        has_rows = bool(record.rows)
+
+        def presence(window_start: int, closed_us: int) -> int:
+            if record.open_start_us is None:
+                return closed_us
+            return closed_us + max(scheduled_end - max(record.open_start_us, window_start), 0)
+
+        work_us = presence(start_us, record.work_closed_us) if has_rows and not record.on_leave else 0
+
+        lateness_us = 0
+        lateness_start = start_us
+        registered_after_work = False
+        if record.registration_us is not None and from_epoch_us(record.registration_us).date() == record.day:
+            registered_after_work = record.registration_us > end_us
+            if record.registration_us > start_us:
+                lateness_start = record.registration_us
+        scheduled_work_us = scheduled_end - lateness_start
+        if not registered_after_work and scheduled_work_us >= 0 and not record.on_leave:
+            if not has_rows:
+                if include_no_check_in and TimeCalculator.is_working_day(record.day) and now_us > lateness_start:
+                    lateness_us = scheduled_work_us
+            else:
+                present_us = work_us if lateness_start == start_us else presence(lateness_start, record.late_closed_us)
+                lateness_us = max(scheduled_work_us - present_us, 0)
+
+        if not TimeCalculator.is_working_day(record.day):
+            status = 'not_working_day'
+        elif not start_us <= now_us <= end_us:
+            status = 'not_working_hour'
+        elif record.on_leave:
+            status = 'on_leave'
+        elif not has_rows:
+            status = 'not_checked_in'
+        elif record.any_open:
+            status = 'checked_in'
+        else:
+            status = 'checked_out'
+
+        return DailyAttendanceResult(
+            timedelta(microseconds=lateness_us),
+            timedelta(microseconds=work_us),
+            status,
+            from_epoch_us(record.last_action_us) if record.last_action_us is not None else None
+        )
+
+    @staticmethod
+    def _evaluate_rows(record: LiveAttendanceRecord, now_local: datetime, include_no_check_in: bool) -> DailyAttendanceResult:
+        registration = from_epoch_us(record.registration_us) if record.registration_us is not None else None
+        return AttendanceCalculator.calculate_batch(
+            {(record.employee_id, record.day): record.attendance_rows()},
+            now=now_local,
+            registrations={record.employee_id: registration},
+            include_no_check_in=include_no_check_in
+        )[(record.employee_id, record.day)]
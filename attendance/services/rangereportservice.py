@@ -0,0 +1,184 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from employee_tracking_system.services.holiday_calendar_service import HolidayCalendarService
+from ..attendancereportengine import AttendanceReportEngine, EmployeeTotals
+from .reportcacheservice import ReportCacheService
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+RANGE_GROUPS = ('total', 'week', 'month')
+RANGE_PRESETS = ('month', 'quarter', 'last_quarter', 'ytd')
+RANGE_REPORT_VERSION_KEY = 'range_report:version:{year}_{month}'
+
+Segment = Tuple[date, date]
+
+
+class AttendanceRangeReportService:
+    def __init__(self, repository, employee_service, report_engine=None):
+        self.repository = repository
+        self.employee_service = employee_service
+        self.report_engine = report_engine or AttendanceReportEngine()
+
+    @staticmethod
+    def preset_range(preset: str, today: date) -> Segment:
+        quarter_start = date(today.year, 3 * ((today.month - 1) // 3) + 1, 1)
+        if preset == 'month':
+            return today.replace(day=1), today
+        if preset == 'quarter':
+            return quarter_start, today
+        if preset == 'last_quarter':
+            last_quarter_end = quarter_start - timedelta(days=1)
+            return date(last_quarter_end.year, last_quarter_end.month - 2, 1), last_quarter_end
+        if preset == 'ytd':
+            return date(today.year, 1, 1), today
+        raise ValueError(f"Unknown range preset '{preset}'")
+
+    @staticmethod
+    def _month_end(day: date) -> date:
+        next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+
+    def _month_segments(self, start_date: date, end_date: date) -> List[Segment]:
+        segments = []
+        segment_start = start_date
+        while segment_start <= end_date:
+            segment_end = min(self._month_end(segment_start), end_date)
+            segments.append((segment_start, segment_end))
+            segment_start = segment_end + timedelta(days=1)
+        return segments
+
+    @staticmethod
+    def _week_segments(start_date: date, end_date: date) -> List[Segment]:
+        segments = []
+        segment_start = start_date
+        while segment_start <= end_date:
+            segment_end = min(segment_start + timedelta(days=6 - segment_start.weekday()), end_date)
+            segments.append((segment_start, segment_end))
+            segment_start = segment_end + timedelta(days=1)
+        return segments
+
+    def _is_closed_month(self, segment: Segment, today: date) -> bool:
+        segment_start, segment_end = segment
+        return segment_start.day == 1 and segment_end == self._month_end(segment_start) and segment_end < today
+
+    def _compute_segments(self, employees: List[Any], segments: List[Segment], now_local: datetime) -> np.ndarray:
+        start_date, end_date = segments[0][0], segments[-1][1]
+        frozen_summaries = self.repository.get_frozen_daily_summaries(start_date, end_date)
+        open_attendances = self.repository.get_unfrozen_attendances_between_dates(start_date, end_date)
+        working_days = HolidayCalendarService.working_days_between(start_date, end_date)
+        matrix = self.report_engine.employee_matrix(
+            employees, open_attendances, start_date, end_date, working_days, now_local, frozen_summaries
+        )
+        bucket_starts = [(segment_start - start_date).days for segment_start, _ in segments]
+        return self.report_engine.bucket_totals(matrix, bucket_starts)
+
+    def _cached_month_totals(self, employees: List[Any], month_start: date) -> Optional[np.ndarray]:
+        cached = cache.get(ReportCacheService.monthly_totals_key(month_start.year, month_start.month))
+        if not cached or any(employee.id not in cached for employee in employees):
+            return None
+        return np.array([cached[employee.id] for employee in employees], dtype=np.int64)
+
+    def _store_month_totals(self, employees: List[Any], month_start: date, values: np.ndarray):
+        cache.set(
+            ReportCacheService.monthly_totals_key(month_start.year, month_start.month),
+            {employee.id: [int(value) for value in row] for employee, row in zip(employees, values)},
+            settings.MONTHLY_REPORT_CACHE_TIMEOUT
+        )
+
+    def _monthly_totals(self, employees: List[Any], segments: List[Segment], now_local: datetime) -> np.ndarray:
+        today = now_local.date()
+        results: List[Optional[np.ndarray]] = [None] * len(segments)
+        for idx, segment in enumerate(segments):
+            if self._is_closed_month(segment, today):
+                results[idx] = self._cached_month_totals(employees, segment[0])
+
+        pending = [idx for idx, values in enumerate(results) if values is None]
+        runs = []
+        for idx in pending:
+            if runs and runs[-1][-1] == idx - 1:
+                runs[-1].append(idx)
+            else:
+                runs.append([idx])
+        for run in runs:
+            values = self._compute_segments(employees, [segments[idx] for idx in run], now_local)
+            for idx, segment_values in zip(run, values):
+                results[idx] = segment_values
+                if self._is_closed_month(segments[idx], today):
+                    self._store_month_totals(employees, segments[idx][0], segment_values)
+        logger.info(f"Range report used {len(segments) - len(pending)} cached monthly partials, computed {len(pending)} segments")
+        return np.stack(results)
+
+    def _rows(self, employees: List[Any], values: np.ndarray, report_name: str) -> List[Dict[str, Any]]:
+        return self.report_engine.build_rows(employees, EmployeeTotals.from_array(values), report_name)
+
+    @staticmethod
+    def _version_keys(months: Iterable[Tuple[int, int]]) -> List[str]:
+        return [RANGE_REPORT_VERSION_KEY.format(year=year, month=month) for year, month in months]
+
+    def _version(self, start_date: date, end_date: date) -> str:
+        # Versioned per month, so a change only invalidates the ranges that cover its month.
+        keys = self._version_keys(
+            (segment_start.year, segment_start.month) for segment_start, _ in self._month_segments(start_date, end_date)
+        )
+        try:
+            versions = cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Range report version lookup failed: {e}")
+            versions = {}
+        return '.'.join(str(versions.get(key, 0)) for key in keys)
+
+    def get_range_report(self, start_date: date, end_date: date, group_by: str = 'total') -> Dict[str, Any]:
+        if group_by not in RANGE_GROUPS:
+            raise ValueError(f"Unknown range grouping '{group_by}'")
+        now_local = timezone.localtime(timezone.now())
+        today = now_local.date()
+        end_date = min(end_date, today)
+        if start_date > end_date:
+            raise ValueError("Range starts after its (clamped) end date")
+
+        cache_key = ReportCacheService.range_key(self._version(start_date, end_date), start_date, end_date, group_by)
+        report = cache.get(cache_key)
+        if report:
+            logger.info(f"Fetching range report from cache {cache_key}")
+            return report
+
+        employees = list(self.employee_service.get_all_employees().order_by('id'))
+        if group_by == 'week':
+            segments = self._week_segments(start_date, end_date)
+            values = self._compute_segments(employees, segments, now_local)
+        else:
+            segments = self._month_segments(start_date, end_date)
+            values = self._monthly_totals(employees, segments, now_local)
+
+        report = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'group_by': group_by,
+            'totals': self._rows(employees, values.sum(axis=0), 'range'),
+            'buckets': [] if group_by == 'total' else [
+                {
+                    'start_date': segment_start.isoformat(),
+                    'end_date': segment_end.isoformat(),
+                    'rows': self._rows(employees, segment_values, group_by),
+                }
+                for (segment_start, segment_end), segment_values in zip(segments, values)
+            ],
+        }
+        timeout = settings.MONTHLY_REPORT_CACHE_TIMEOUT if end_date < today else settings.RANGE_REPORT_CACHE_TIMEOUT
+        cache.set(cache_key, report, timeout)
+        return report
+
+    def invalidate(self, dates: Iterable[date]):
+        months = sorted({(day.year, day.month) for day in dates})
+        cache.delete_many([ReportCacheService.monthly_totals_key(year, month) for year, month in months])
+        for key in self._version_keys(months):
+            try:
+                cache.add(key, 0, timeout=None)
+                cache.incr(key)
+            except Exception as e:
+                logger.warning(f"Range report version bump failed for {key}: {e}")
@@ -0,0 +1,90 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django_redis import get_redis_connection
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'realtime_snapshot:{day}:seq'
+STATE_KEY = 'realtime_snapshot:{day}'
+LOG_KEY = 'realtime_snapshot:{day}:log'
+
+# Stores the changed payloads in the day's state hash and appends them to the day's delta log under a new sequence number.
+# Sequence, state and log share the day, so a sequence number always refers to the state it was recorded against.
+RECORD_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+for i = 4, #ARGV, 2 do
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+redis.call('LPUSH', KEYS[3], seq .. ' ' .. ARGV[3])
+redis.call('LTRIM', KEYS[3], 0, tonumber(ARGV[2]) - 1)
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[1])
+end
+return seq
+"""
+
+
+class RealTimeSnapshotService:
+    def __init__(self, connection=None):
+        self._connection = connection
+        self._record_script = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_redis_connection("default")
+        return self._connection
+
+    @staticmethod
+    def state_key(day: date) -> str:
+        return STATE_KEY.format(day=day.isoformat())
+
+    @staticmethod
+    def sequence_key(day: date) -> str:
+        return SEQUENCE_KEY.format(day=day.isoformat())
+
+    @staticmethod
+    def log_key(day: date) -> str:
+        return LOG_KEY.format(day=day.isoformat())
+
+    def record(self, messages: List[dict], day: date) -> Optional[int]:
+        if self._record_script is None:
+            self._record_script = self.connection.register_script(RECORD_SCRIPT)
+        args = [settings.REALTIME_FINGERPRINT_TTL, settings.REALTIME_DELTA_LOG_SIZE, json.dumps(messages)]
+        for message in messages:
+            args.extend((message['id'], json.dumps(message)))
+        try:
+            return self._record_script(keys=[self.sequence_key(day), self.state_key(day), self.log_key(day)], args=args)
+        except Exception as e:
+            logger.warning(f"Failed to record {len(messages)} real-time payloads in the snapshot: {e}")
+            return None
+
+    def snapshot(self, day: date) -> Tuple[int, Dict[int, dict]]:
+        pipe = self.connection.pipeline()
+        pipe.get(self.sequence_key(day))
+        pipe.hgetall(self.state_key(day))
+        seq, state = pipe.execute()
+        return int(seq or 0), {int(employee_id): json.loads(message) for employee_id, message in state.items()}
+
+    def deltas_since(self, since: int, day: date) -> Optional[List[Tuple[int, List[dict]]]]:
+        # None means the day's log no longer reaches back to `since`, so the client needs a full snapshot.
+        pipe = self.connection.pipeline()
+        pipe.get(self.sequence_key(day))
+        pipe.lrange(self.log_key(day), 0, -1)
+        seq, entries = pipe.execute()
+        seq = int(seq or 0)
+        if since > seq:
+            return None
+        deltas = []
+        for entry in entries:
+            entry_seq, messages = entry.split(b' ', 1)
+            if int(entry_seq) <= since:
+                break
+            deltas.append((int(entry_seq), json.loads(messages)))
+        deltas.reverse()
+        if len(deltas) != seq - since:
+            return None
+        return deltas
@@ -1,54 +1,48 @@
-from django.core.cache import cache  
+from django.conf import settings
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from django.utils import timezone
+from datetime import datetime, timedelta
+from django_redis import get_redis_connection
 from ..iattendancerepository import IAttendanceRepository
 from employee.services import EmployeeService
 from ..attendancecalculator import AttendanceCalculator
+from .liveattendanceservice import LiveAttendanceService
+from .realtimesnapshotservice import RealTimeSnapshotService
 from employee_tracking_system.utils.time_utils import TimeCalculator
-from employee.models import Employee
-from ..models import Attendance  
+from employee_tracking_system.services.working_hours_service import WorkingHoursService
+from employee_tracking_system.services.presence_service import PresenceService
 
+import asyncio
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+FINGERPRINT_KEY = 'realtime_fingerprints:{day}'
+TRANSITION_KEY = 'realtime_transition:{at}'
+TRANSITION_LOCK_GRACE = 60
+RATE_PROBE = timedelta(seconds=1)
+AUTHORIZED_GROUP = 'authorized_attendance'
+
 class RealTimeUpdateService:
-    def __init__(self, repository: IAttendanceRepository, employee_service: EmployeeService):
+    def __init__(self, repository: IAttendanceRepository, employee_service: EmployeeService, live_attendance_service: LiveAttendanceService = None, snapshot_service: RealTimeSnapshotService = None, presence_service: PresenceService = None, connection=None):
         self.repository = repository
         self.employee_service = employee_service
+        self.live_attendance_service = live_attendance_service or LiveAttendanceService()
+        self.snapshot_service = snapshot_service or RealTimeSnapshotService()
+        self.presence_service = presence_service or PresenceService()
         self.channel_layer = get_channel_layer()
+        self._connection = connection
 
-    def send_real_time_update_to_employee(self, employee: Employee, message: dict):
-        group_name = f"user_{employee.id}_employee_attendance"
-        try:
-            async_to_sync(self.channel_layer.group_send)(
-                group_name,
-                {
-                    'type': 'employee_realtime_attendance_update',
-                    'message': message,
-                    'id' : employee.id
-                }
-            )
-            logger.info(f"Sent real-time update to {group_name}: {message}")
-        except Exception as e:
-            logger.error(f"Error sending real-time update to employee: {e}") 
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_redis_connection("default")
+        return self._connection
 
-    def send_real_time_update_to_authorized(self, message):
-        group_name = 'authorized_attendance'
-        try:
-            async_to_sync(self.channel_layer.group_send)(
-                group_name,
-                {
-                    'type': 'realtime_attendance_update',
-                    'message': message
-                }
-            )
-            logger.info(f"Sent real-time update to {group_name}: {message}")
-        except Exception as e:
-            logger.error(f"Error sending real-time update to authorized: {e}")
-            
-    def update_all_real_time_attendance(self, employee=None, now_local=None):
+    def update_all_real_time_attendance(self, employee=None, now_local=None, full: bool = False):
         try:
             if employee and now_local:
                 self._send_single_employee_update(employee, now_local)
@@ -57,71 +51,221 @@ class RealTimeUpdateService:
                 now_utc = timezone.now()
                 local_timezone = timezone.get_default_timezone()
                 current_time_local = timezone.localtime(now_utc, local_timezone)
-                today = current_time_local.date()
-                
+
                 employees = self.employee_service.get_all_employees()
 
                 if not employees:
                     logger.info("update_all_real_time_attendance: No employees found.")
                     return
 
-                for employee in employees:
-                    self._send_single_employee_update(employee, current_time_local)
+                self.send_batch_update(list(employees), current_time_local, full=full)
+                self.schedule_next_transition(current_time_local)
 
 
         except Exception as e:
             logger.error(f"Error during real-time update: {e}")
             raise
-        
-        
-    def _send_single_employee_update(self, employee, current_time_local):
+
+    def send_batch_update(self, employees, current_time_local, full: bool = False) -> int:
         today = current_time_local.date()
-        attendances = self.repository.get_employee_attendances(employee.id, today)
+        snapshot = self.build_snapshot(employees, current_time_local)
+        fingerprints = {message['id']: self._fingerprint(message) for message in snapshot}
+        if full:
+            changed = snapshot
+        else:
+            sent = self._sent_fingerprints(list(fingerprints), today)
+            changed = [message for message in snapshot if sent.get(message['id']) != fingerprints[message['id']]]
+        if not changed:
+            logger.info(f"Real-time attendance unchanged for {len(employees)} employees, nothing sent.")
+            return 0
 
-        lateness = AttendanceCalculator.calculate_lateness(
-            attendances=attendances,
-            now=current_time_local,
-            include_no_check_in=True
-        )
-        work_duration = AttendanceCalculator.calculate_work_duration(
-            attendances=attendances,
-            now=current_time_local
+        failed = self._publish(changed, fingerprints, current_time_local)
+        logger.info(
+            f"Real-time attendance {'snapshot' if full else 'delta'} sent for {len(changed)} of {len(employees)} employees "
+            f"({failed} group sends failed)."
         )
+        return len(changed)
+
+    def _publish(self, changed, fingerprints, current_time_local) -> int:
+        today = current_time_local.date()
+        # The aggregate is always recorded, so a dashboard that connects later still gets current state.
+        seq = self.snapshot_service.record(changed, today)
+        groups = {f"user_{message['id']}_employee_attendance": message for message in changed}
+        listening = self.presence_service.listening([*groups, AUTHORIZED_GROUP])
+        # Employee dashboards resync on connect, so groups nobody listens to can be skipped.
+        events = [
+            (
+                group_name,
+                {
+                    'type': 'employee_realtime_attendance_update',
+                    'message': {key: value for key, value in message.items() if key != 'id'},
+                    'id': message['id']
+                }
+            )
+            for group_name, message in groups.items()
+            if group_name in listening
+        ]
+        if AUTHORIZED_GROUP in listening:
+            events.append((AUTHORIZED_GROUP, {
+                'type': 'realtime_attendance_delta',
+                'day': today.isoformat(),
+                'seq': seq,
+                'server_time': timezone.localtime(timezone.now()).isoformat(),
+                'message': changed
+            }))
+        logger.debug(f"Real-time attendance: {len(events)} of {len(groups) + 1} groups have listeners")
+        failed = async_to_sync(self._flush)(events) if events else 0
+        self._remember_fingerprints({message['id']: fingerprints[message['id']] for message in changed}, today)
+        return failed
 
-        remaining_leave = employee.remaining_leave - lateness
+    def get_authorized_snapshot(self, current_time_local) -> dict:
+        today = current_time_local.date()
+        employees = list(self.employee_service.get_all_employees())
+        seq, state = self.snapshot_service.snapshot(today)
+        missing = [employee for employee in employees if employee.id not in state]
+        if missing:
+            # First connection of the day, a new employee or a flushed Redis: publish their payloads, then re-read.
+            self.send_batch_update(missing, current_time_local, full=True)
+            seq, state = self.snapshot_service.snapshot(today)
+        return {
+            'day': today.isoformat(),
+            'seq': seq,
+            'server_time': timezone.localtime(timezone.now()).isoformat(),
+            'data': [state[employee.id] for employee in employees if employee.id in state],
+        }
 
-        remaining_leave_display = self.employee_service.get_remaining_leave_displayy(employee, remaining_leave)
+    def build_snapshot(self, employees, current_time_local) -> list:
+        current_time_local = current_time_local.replace(microsecond=0)
+        today = current_time_local.date()
+        results, probes = self._live_results(employees, (current_time_local, current_time_local + RATE_PROBE))
+        return [
+            self._build_message(employee, results[(employee.id, today)], probes[(employee.id, today)], current_time_local)
+            for employee in employees
+        ]
 
-        status = Attendance.objects.determine_attendance_status(attendances, current_time_local, today)
-        
-        last_action_time = None
-        if attendances:
-            sorted_attendances = attendances.order_by('-check_out', '-check_in')
-            last_attendance = sorted_attendances.first()
-            last_action_time = last_attendance.check_out or last_attendance.check_in
+    @staticmethod
+    def next_transition(current_time_local: datetime):
+        # Counters change rate only at the work bounds or on an attendance change, which pushes on its own.
+        return next((bound for bound in WorkingHoursService.get_work_bounds(current_time_local.date()) if bound > current_time_local), None)
 
-        if last_action_time:
-            last_action_time_display = last_action_time.strftime('%Y-%m-%d %H:%M')
-        else:
-            last_action_time_display = "N/A"
-
-        message = {
-            "remaining_leave": remaining_leave_display,
-            "lateness": TimeCalculator.timedelta_to_hhmm(lateness),
-            "work_duration": TimeCalculator.timedelta_to_hhmm(work_duration),
-            "status": status,
-            "last_action_time": last_action_time_display
-        }
-        self.send_real_time_update_to_employee(employee, message)
+    def schedule_next_transition(self, current_time_local: datetime):
+        from ..tasks import update_real_time_attendance
+        transition = self.next_transition(current_time_local)
+        if transition is None:
+            return None
+        # The lock only lives until just after the ETA, so a later run can reschedule if the update was lost.
+        lock_ttl = max(int((transition - current_time_local).total_seconds()) + TRANSITION_LOCK_GRACE, 1)
+        try:
+            if not self.connection.set(TRANSITION_KEY.format(at=transition.isoformat()), 1, nx=True, ex=lock_ttl):
+                return transition
+        except Exception as e:
+            logger.warning(f"Transition lock unavailable, scheduling the {transition} update anyway: {e}")
+        # One second past the bound, so the update already sees the new status.
+        update_real_time_attendance.apply_async(eta=transition + timedelta(seconds=1))
+        logger.info(f"Real-time attendance transition update scheduled for {transition}.")
+        return transition
 
-        authorized_message = {
+    @staticmethod
+    def _fingerprint(message: dict) -> str:
+        # Counters are fingerprinted by rate and intercept, so linear growth the client extrapolates is not a change.
+        as_of = int(datetime.fromisoformat(message['as_of']).timestamp())
+        state = [
+            message['username'], message['annual_leave'], message['status'], message['last_action_time'], message['valid_until']
+        ]
+        for name in sorted(message['counters']):
+            counter = message['counters'][name]
+            state.append([name, counter['rate'], counter['seconds'] - counter['rate'] * as_of])
+        return hashlib.blake2b(json.dumps(state).encode(), digest_size=8).hexdigest()
+
+    def _sent_fingerprints(self, employee_ids, day) -> dict:
+        # Without the store every payload counts as changed, so clients never miss an update.
+        try:
+            values = self.connection.hmget(FINGERPRINT_KEY.format(day=day.isoformat()), employee_ids)
+        except Exception as e:
+            logger.warning(f"Real-time fingerprints unavailable, sending full payloads: {e}")
+            return {}
+        return {employee_id: value.decode() for employee_id, value in zip(employee_ids, values) if value}
+
+    def _remember_fingerprints(self, fingerprints: dict, day):
+        if not fingerprints:
+            return
+        key = FINGERPRINT_KEY.format(day=day.isoformat())
+        try:
+            pipe = self.connection.pipeline()
+            pipe.hset(key, mapping=fingerprints)
+            pipe.expire(key, settings.REALTIME_FINGERPRINT_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to store real-time fingerprints for {len(fingerprints)} employees: {e}")
+
+    async def _flush(self, events) -> int:
+        results = await asyncio.gather(
+            *(self.channel_layer.group_send(group_name, event) for group_name, event in events),
+            return_exceptions=True
+        )
+        failed = 0
+        for (group_name, _), result in zip(events, results):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.error(f"Error sending real-time update to {group_name}: {result}")
+        return failed
+
+    def _live_results(self, employees, times):
+        # One result dict per time; all times fall on the same day.
+        today = times[0].date()
+        records = self.live_attendance_service.get_records([employee.id for employee in employees], today)
+        results = [
+            {
+                (employee_id, today): self.live_attendance_service.evaluate(record, at)
+                for employee_id, record in records.items()
+            }
+            for at in times
+        ]
+        missing = [employee for employee in employees if employee.id not in records]
+        if missing:
+            attendances = self.repository.get_attendances_for_employees([employee.id for employee in missing], today)
+            sessions = AttendanceCalculator.group_sessions(attendances)
+            sessions = {(employee.id, today): sessions.get((employee.id, today), []) for employee in missing}
+            registrations = {employee.id: getattr(employee, 'registration_datetime', None) for employee in missing}
+            for at, at_results in zip(times, results):
+                at_results.update(AttendanceCalculator.calculate_batch(
+                    sessions,
+                    now=at,
+                    registrations=registrations,
+                    include_no_check_in=True,
+                    presorted=True
+                ))
+            self.live_attendance_service.backfill(missing, today, sessions)
+            logger.debug(f"Live attendance: {len(missing)} of {len(employees)} employees loaded from the database")
+        return results
+
+    def _build_message(self, employee, result, probe, current_time_local) -> dict:
+        remaining_leave = employee.remaining_leave - result.lateness
+        last_action_time = result.last_action_time
+        # Counters grow linearly until the next transition, so one probe a second later gives their rate.
+        lateness_rate = round((probe.lateness - result.lateness) / RATE_PROBE)
+        work_rate = round((probe.work_duration - result.work_duration) / RATE_PROBE)
+        remaining_leave_rate = -lateness_rate
+        valid_until = self.next_transition(current_time_local)
+        return {
             "id": employee.id,
-            "remaining_leave": remaining_leave_display,
-            "lateness": TimeCalculator.timedelta_to_hhmm(lateness),
-            "work_duration": TimeCalculator.timedelta_to_hhmm(work_duration),
-            "status": status,
-            "last_action_time": last_action_time_display
+            "username": employee.user.username,
+            "annual_leave": employee.annual_leave,
+            "remaining_leave": self.employee_service.get_remaining_leave_displayy(employee, remaining_leave),
+            "lateness": TimeCalculator.timedelta_to_hhmm(result.lateness),
+            "work_duration": TimeCalculator.timedelta_to_hhmm(result.work_duration),
+            "status": result.status,
+            "last_action_time": last_action_time.strftime('%Y-%m-%d %H:%M') if last_action_time else "N/A",
+            "as_of": current_time_local.isoformat(),
+            "valid_until": valid_until.isoformat() if valid_until else None,
+            "counters": {
+                "lateness": {"seconds": result.lateness // timedelta(seconds=1), "rate": lateness_rate},
+                "work_duration": {"seconds": result.work_duration // timedelta(seconds=1), "rate": work_rate},
+                "remaining_leave": {"seconds": remaining_leave // timedelta(seconds=1), "rate": remaining_leave_rate},
+            },
         }
-        self.send_real_time_update_to_authorized(authorized_message)
 
-        logger.info(f"Real-time attendance update sent for employee {employee.id}.")
\ No newline at end of file
+    def _send_single_employee_update(self, employee, current_time_local):
+        message = self.build_snapshot([employee], current_time_local)[0]
+        self._publish([message], {employee.id: self._fingerprint(message)}, current_time_local)
+        logger.info(f"Real-time attendance update sent for employee {employee.id}.")
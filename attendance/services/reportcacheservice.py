@@ -0,0 +1,174 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.exceptions import WatchError, LockError
+import json
+import math
+import random
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+GENERATION_FIELD = '__generation__'
+EXPIRES_AT_FIELD = '__expires_at__'
+DELTA_FIELD = '__delta__'
+META_FIELDS = (GENERATION_FIELD, EXPIRES_AT_FIELD, DELTA_FIELD)
+STATS_KEY = 'report_cache_stats'
+STORE_RETRIES = 3
+
+
+class ReportCacheService:
+    def __init__(self, connection=None):
+        self._connection = connection
+        self.lock_timeout = getattr(settings, 'REPORT_LOCK_TIMEOUT', 60)
+        self.lock_wait = getattr(settings, 'REPORT_LOCK_WAIT', 15)
+        self.stale_grace = getattr(settings, 'REPORT_STALE_GRACE', 60 * 60)
+        self.early_refresh_beta = getattr(settings, 'REPORT_EARLY_REFRESH_BETA', 1.0)
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_redis_connection("default")
+        return self._connection
+
+    @staticmethod
+    def monthly_key(year: int, month: int) -> str:
+        return f"monthly_report_rows_{year}_{month}"
+
+    @staticmethod
+    def weekly_key(year: int, month: int, week: int) -> str:
+        return f"weekly_report_rows_{year}_{month}_{week}"
+
+    @staticmethod
+    def monthly_totals_key(year: int, month: int) -> str:
+        return f"monthly_report_totals_{year}_{month}"
+
+    @staticmethod
+    def range_key(version: str, start_date, end_date, group_by: str) -> str:
+        return f"range_report_{version}_{start_date.isoformat()}_{end_date.isoformat()}_{group_by}"
+
+    @staticmethod
+    def _patched_key(key: str) -> str:
+        return f"{key}:patched"
+
+    def lock(self, key: str):
+        return self.connection.lock(f"{key}:lock", timeout=self.lock_timeout)
+
+    def record(self, event: str, amount: int = 1):
+        try:
+            self.connection.hincrby(STATS_KEY, event, amount)
+        except Exception as e:
+            logger.warning(f"Error recording report cache stat {event}: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        try:
+            return {field.decode(): int(value) for field, value in self.connection.hgetall(STATS_KEY).items()}
+        except Exception as e:
+            logger.error(f"Error reading report cache stats: {e}")
+            return {}
+
+    def exists(self, key: str) -> bool:
+        try:
+            return bool(self.connection.exists(key))
+        except Exception as e:
+            logger.error(f"Error checking report cache {key}: {e}")
+            return False
+
+    def get_rows(self, key: str, employee_ids: Iterable[int]) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Any]]:
+        employee_ids = list(employee_ids)
+        try:
+            pipe = self.connection.pipeline(transaction=False)
+            pipe.hmget(key, list(META_FIELDS))
+            pipe.hmget(key, [str(employee_id) for employee_id in employee_ids] or ['__none__'])
+            meta_values, values = pipe.execute()
+        except Exception as e:
+            logger.error(f"Error reading report cache {key}: {e}")
+            return {}, {}
+        generation, expires_at, delta = meta_values
+        meta = {}
+        if generation is not None:
+            meta = {
+                'generation': int(generation),
+                'expires_at': float(expires_at) if expires_at is not None else 0.0,
+                'delta': float(delta) if delta is not None else 0.0,
+            }
+        rows = {
+            employee_id: json.loads(value)
+            for employee_id, value in zip(employee_ids, values)
+            if value is not None
+        }
+        return rows, meta
+
+    def is_expired(self, meta: Dict[str, Any], now: Optional[float] = None) -> bool:
+        return not meta or (now or time.time()) >= meta['expires_at']
+
+    def should_refresh_early(self, meta: Dict[str, Any], now: Optional[float] = None) -> bool:
+        if not meta or not meta['delta']:
+            return False
+        now = now or time.time()
+        jitter = -meta['delta'] * self.early_refresh_beta * math.log(1.0 - random.random())
+        return now + jitter >= meta['expires_at']
+
+    def begin_rebuild(self, key: str):
+        try:
+            self.connection.delete(self._patched_key(key))
+        except Exception as e:
+            logger.warning(f"Error resetting patched set for {key}: {e}")
+
+    def store_rows(self, key: str, rows: Dict[int, Dict[str, Any]], timeout: int, full: bool = False, delta: float = 0.0) -> bool:
+        patched_key = self._patched_key(key)
+        for _ in range(STORE_RETRIES):
+            try:
+                with self.connection.pipeline() as pipe:
+                    pipe.watch(key, patched_key)
+                    patched = {int(member) for member in pipe.smembers(patched_key)}
+                    mapping = {
+                        str(employee_id): json.dumps(row)
+                        for employee_id, row in rows.items()
+                        if employee_id not in patched
+                    }
+                    pipe.multi()
+                    if mapping:
+                        pipe.hset(key, mapping=mapping)
+                    pipe.hsetnx(key, GENERATION_FIELD, 0)
+                    if full:
+                        pipe.hset(key, mapping={EXPIRES_AT_FIELD: time.time() + timeout, DELTA_FIELD: delta})
+                        pipe.expire(key, timeout + self.stale_grace)
+                        pipe.delete(patched_key)
+                    pipe.execute()
+                logger.info(f"Stored {len(mapping)} rows in report cache {key} (full={full}, kept {len(patched)} patched)")
+                return True
+            except WatchError:
+                logger.info(f"Report cache {key} patched during store, retrying")
+            except Exception as e:
+                logger.error(f"Error storing report cache {key}: {e}")
+                return False
+        return False
+
+    def patch_rows(self, key: str, rows: Dict[int, Dict[str, Any]], timeout: int) -> Optional[int]:
+        if not rows:
+            return None
+        mapping = {str(employee_id): json.dumps(row) for employee_id, row in rows.items()}
+        patched_key = self._patched_key(key)
+        try:
+            pipe = self.connection.pipeline()
+            pipe.hset(key, mapping=mapping)
+            pipe.hincrby(key, GENERATION_FIELD, 1)
+            pipe.sadd(patched_key, *rows.keys())
+            pipe.expire(patched_key, self.lock_timeout)
+            pipe.ttl(key)
+            _, generation, _, _, ttl = pipe.execute()
+            if ttl is not None and ttl < 0:
+                self.connection.expire(key, timeout + self.stale_grace)
+            logger.info(f"Patched {len(mapping)} rows in report cache {key} (generation={generation})")
+            return generation
+        except Exception as e:
+            logger.error(f"Error patching report cache {key}: {e}")
+            return None
+
+    def release(self, lock):
+        try:
+            lock.release()
+        except LockError:
+            logger.warning(f"Report lock {lock.name} expired before release")
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Sent with employee_ids and dates whenever a daily summary changes.
+attendance_changed = Signal()
@@ -1,10 +1,11 @@
-from celery import shared_task
+from celery import shared_task, chord, group
 from django.utils import timezone
+from django.conf import settings
+from datetime import date, datetime, timedelta
 from employee_tracking_system.utils.notification_utils import send_notification 
-from typing import List, Dict, Any  
-from django.dispatch import receiver  
-from django.db.models.signals import post_save  
-from .models import Attendance
+from employee_tracking_system.services.working_hours_service import WorkingHoursService
+from employee_tracking_system.services.holiday_calendar_service import HolidayCalendarService
+from typing import List, Dict, Any, Optional  
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,9 +14,10 @@ from .utils import (
     get_realtime_update_service, 
     get_attendance_report_service, 
     get_employee_service,
-    get_attendance_calculator,
-    get_working_hours_service,
-    get_check_in_out_service
+    get_check_in_out_service,
+    get_daily_summary_service,
+    get_attendance_range_report_service,
+    get_attendance_fanout_service
 )
 
 @shared_task
@@ -53,10 +55,10 @@ def check_employee_lateness():
     retry_kwargs={'max_retries': 5, 'countdown': 10},
     retry_backoff=True,
 )
-def update_real_time_attendance():
+def update_real_time_attendance(full: bool = False):
     try:
         realtime_update_service = get_realtime_update_service()
-        realtime_update_service.update_all_real_time_attendance()
+        realtime_update_service.update_all_real_time_attendance(full=full)
         logger.info("update_real_time_attendance: Task executed successfully")
     except Exception as e:
         logger.error(f"Error in update_real_time_attendance task: {e}")
@@ -82,6 +84,99 @@ def generate_weekly_report_task(year: int, month: int, week: int) -> List[Dict[s
         logger.error(f"Error in generate_weekly_report_task: {e}")
         return []
 
+@shared_task
+def compute_report_shard(report_name: str, period: List[int], employee_ids: List[int], now_local: str) -> Optional[Dict[int, Dict[str, Any]]]:
+    try:
+        report_service = get_attendance_report_service()
+        return report_service.compute_report_shard(report_name, period, employee_ids, datetime.fromisoformat(now_local))
+    except Exception as e:
+        logger.error(f"Error in compute_report_shard task for {report_name} {period} ({len(employee_ids)} employees): {e}")
+        # None marks the shard as failed, so the merge does not store the report as complete.
+        return None
+
+@shared_task
+def merge_report_shards(shard_rows: List[Dict[str, Dict[str, Any]]], report_name: str, period: List[int], started_at: float) -> int:
+    try:
+        report_service = get_attendance_report_service()
+        merged = report_service.store_report_shards(
+            report_name, period, shard_rows, delta=timezone.now().timestamp() - started_at
+        )
+        logger.info(f"merge_report_shards: Stored {merged} rows from {len(shard_rows)} shards for {report_name} {period}.")
+        return merged
+    except Exception as e:
+        logger.error(f"Error in merge_report_shards task: {e}")
+        return 0
+
+@shared_task
+def generate_report_sharded(report_name: str, period: List[int], shard_size: Optional[int] = None, local: bool = False) -> str:
+    try:
+        report_service = get_attendance_report_service()
+        shard_size = shard_size or settings.REPORT_SHARD_SIZE
+        if local:
+            merged = report_service.build_report_locally(report_name, period, shard_size, settings.REPORT_LOCAL_WORKERS)
+            return f"generate_report_sharded: Built {merged} {report_name} rows for {period} locally."
+        shards = report_service.shard_employee_ids(shard_size)
+        now = timezone.now()
+        now_local = timezone.localtime(now).isoformat()
+        chord(
+            group(compute_report_shard.s(report_name, period, employee_ids, now_local) for employee_ids in shards)
+        )(merge_report_shards.s(report_name, period, now.timestamp()))
+        return f"generate_report_sharded: Dispatched {len(shards)} shards for {report_name} {period}."
+    except Exception as e:
+        logger.error(f"Error in generate_report_sharded task: {e}")
+        return f"generate_report_sharded: Failed for {report_name} {period}."
+
+@shared_task
+def generate_monthly_report_sharded(year: Optional[int] = None, month: Optional[int] = None, shard_size: Optional[int] = None) -> str:
+    if year is None or month is None:
+        previous_month = timezone.localdate().replace(day=1) - timedelta(days=1)
+        year, month = previous_month.year, previous_month.month
+    return generate_report_sharded(
+        'monthly', [year, month], shard_size, settings.REPORT_SHARD_LOCAL
+    )
+
+@shared_task
+def patch_report_rows(employee_id: int, dates: List[str]) -> int:
+    try:
+        employee = get_employee_service().get_employee(employee_id)
+        if not employee:
+            return 0
+        changed_dates = [date.fromisoformat(day) for day in dates]
+        report_service = get_attendance_report_service()
+        patched = report_service.patch_employee_rows(employee, changed_dates)
+        get_attendance_range_report_service().invalidate(changed_dates)
+        logger.info(f"patch_report_rows: Patched {patched} cached reports for employee {employee_id}.")
+        return patched
+    except Exception as e:
+        logger.error(f"Error in patch_report_rows task: {e}")
+        return 0
+
+@shared_task
+def close_attendance_day(target_date: str = None) -> int:
+    try:
+        daily_summary_service = get_daily_summary_service()
+        day = date.fromisoformat(target_date) if target_date else None
+        frozen_count = daily_summary_service.close_day(day)
+        logger.info(f"close_attendance_day: Froze {frozen_count} daily summaries.")
+        return frozen_count
+    except Exception as e:
+        logger.error(f"Error in close_attendance_day task: {e}")
+        return 0
+
+@shared_task
+def refresh_daily_summaries(dates: List[str]) -> int:
+    try:
+        # The change that unfroze these days has committed; reload the calendars this worker may still cache.
+        WorkingHoursService.reload()
+        HolidayCalendarService.reload()
+        daily_summary_service = get_daily_summary_service()
+        frozen_count = daily_summary_service.refresh_days([date.fromisoformat(day) for day in dates])
+        logger.info(f"refresh_daily_summaries: Froze {frozen_count} daily summaries on {len(dates)} days.")
+        return frozen_count
+    except Exception as e:
+        logger.error(f"Error in refresh_daily_summaries task: {e}")
+        return 0
+
 @shared_task
 def send_check_in_notification(user_id, check_in_time_str):
     from django.contrib.auth import get_user_model
@@ -104,7 +199,28 @@ def send_check_in_notification(user_id, check_in_time_str):
     logger.info(f"send_check_in_notification: Notified user {user.username}.")
     return f"send_check_in_notification: Notified user {user.username}."
 
-@receiver(post_save, sender=Attendance)
-def check_in_post_save(sender, instance, created, **kwargs):
-    if created and instance.status == 'checked_in':
-        send_check_in_notification.delay(instance.employee.user.id, instance.check_in.isoformat())
\ No newline at end of file
+@shared_task
+def push_real_time_attendance(employee_ids: List[int]) -> int:
+    try:
+        realtime_update_service = get_realtime_update_service()
+        employees = get_employee_service().get_employees_by_ids(employee_ids)
+        return realtime_update_service.send_batch_update(list(employees), timezone.localtime(timezone.now()))
+    except Exception as e:
+        logger.error(f"Error in push_real_time_attendance task for employees {employee_ids}: {e}")
+        return 0
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_kwargs={'max_retries': 5, 'countdown': 5},
+    retry_backoff=True,
+)
+def publish_attendance_changes(employee_id: int, events: Optional[List[Dict[str, str]]] = None) -> int:
+    try:
+        fanout_service = get_attendance_fanout_service()
+        queued = fanout_service.peek(employee_id)
+        published = fanout_service.publish(employee_id, queued + (events or []))
+        fanout_service.acknowledge(employee_id, len(queued))
+        return published
+    except Exception as e:
+        logger.error(f"Error in publish_attendance_changes task for employee {employee_id}: {e}")
+        raise
@@ -1,3 +1,596 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from employee.models import Employee
+from employee_tracking_system.models import WorkingHours
+from employee_tracking_system.utils.query_metrics import QueryMetrics, query_budget
+from .attendancecalculator import AttendanceCalculator
+from .attendancereportengine import AttendanceReportEngine
+from .models import Attendance, AttendanceDailySummary, AttendanceEvent
+from .services.realtimeupdateservice import TRANSITION_KEY
+from .utils import (
+    get_attendance_ingestion_service,
+    get_attendance_range_report_service,
+    get_attendance_report_service,
+    get_check_in_out_service,
+    get_daily_summary_service,
+    get_live_attendance_service,
+    get_realtime_snapshot_service,
+    get_realtime_update_service,
+)
+from . import tasks
+import numpy as np
+import csv
+import gzip
+import io
+import json
+import random
 
 
+def local_datetime(day: date, hour: int, minute: int = 0) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def create_employee(username: str, registered: datetime) -> Employee:
+    employee = Employee.objects.create(user=get_user_model().objects.create(username=username))
+    Employee.objects.filter(pk=employee.pk).update(registration_datetime=registered)
+    employee.registration_datetime = registered
+    return employee
+
+
+def create_sessions(employees, start_date: date, end_date: date, seed: int = 7):
+    # Overlapping and open sessions, leave days and days off, so every presence rule gets exercised.
+    rng = random.Random(seed)
+    attendances = []
+    for employee in employees:
+        day = start_date
+        while day <= end_date:
+            roll = rng.random()
+            if roll < 0.1:
+                attendances.append(Attendance(employee=employee, date=day, status='on_leave'))
+            elif roll < 0.85:
+                check_in = local_datetime(day, 7) + timedelta(minutes=rng.randint(0, 180))
+                for _ in range(rng.choice([1, 1, 2, 3])):
+                    check_out = check_in + timedelta(minutes=rng.randint(10, 400))
+                    if rng.random() < 0.08:
+                        attendances.append(Attendance(employee=employee, date=day, check_in=check_in, status='checked_in'))
+                        break
+                    attendances.append(Attendance(
+                        employee=employee, date=day, check_in=check_in, check_out=check_out, status='checked_out'
+                    ))
+                    check_in = check_out + timedelta(minutes=rng.randint(-60, 90))
+            day += timedelta(days=1)
+    Attendance.objects.bulk_create(attendances)
+
+
+def create_staff(count: int, prefix: str = 'employee'):
+    # Registrations before the period, on a working day mid-period and after that day's working hours.
+    registrations = [
+        local_datetime(date(2024, 12, 1), 8),
+        local_datetime(date(2025, 3, 12), 9, 30),
+        local_datetime(date(2025, 3, 5), 19),
+    ]
+    return [
+        create_employee(f"{prefix}{index:02d}", registrations[index % len(registrations)])
+        for index in range(count)
+    ]
+
+
+class MergedPresenceTests(SimpleTestCase):
+    def test_merged_presence_matches_interval_union(self):
+        rng = random.Random(3)
+        groups = []
+        for _ in range(200):
+            groups.append([
+                (start, start + rng.randint(-5, 40))
+                for start in (rng.randint(0, 100) for _ in range(rng.randint(0, 6)))
+            ])
+        for intervals in groups:
+            covered = {point for start, end in intervals for point in range(start, end)}
+            self.assertEqual(AttendanceCalculator.merged_presence_us(intervals), len(covered))
+            self.assertEqual(AttendanceCalculator.merged_presence_us(sorted(intervals), presorted=True), len(covered))
+
+        group_ids = [idx for idx, intervals in enumerate(groups) for _ in intervals]
+        starts = [start for intervals in groups for start, _ in intervals]
+        ends = [max(start, end) for intervals in groups for start, end in intervals]
+        merged = AttendanceReportEngine.merged_presence(
+            *(np.array(values, dtype=np.int64) for values in (group_ids, starts, ends)), len(groups)
+        )
+        self.assertEqual(list(merged), [AttendanceCalculator.merged_presence_us(intervals) for intervals in groups])
+
+
+class DailyParityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employees = create_staff(6)
+        create_sessions(self.employees, date(2025, 3, 1), date(2025, 3, 19))
+        self.now = timezone.localtime(local_datetime(date(2025, 3, 19), 12, 15))
+
+    def test_report_engine_matches_calculate_batch(self):
+        start_date, end_date = date(2025, 3, 1), self.now.date()
+        report_service = get_attendance_report_service()
+        _, _, working_days = report_service._monthly_period(2025, 3, end_date)
+        attendances = list(Attendance.objects.all())
+        matrix = report_service.report_engine.employee_matrix(
+            self.employees, attendances, start_date, end_date, working_days, self.now
+        )
+        sessions = AttendanceCalculator.group_sessions(attendances)
+        results = AttendanceCalculator.calculate_batch(
+            {
+                (employee.id, day): sessions.get((employee.id, day), [])
+                for employee in self.employees for day in matrix.days
+            },
+            now=self.now,
+            registrations={employee.id: employee.registration_datetime for employee in self.employees},
+            include_no_check_in=True
+        )
+        for idx, employee in enumerate(self.employees):
+            for offset, day in enumerate(matrix.days):
+                if day < employee.registration_datetime.date():
+                    continue
+                result = results[(employee.id, day)]
+                with self.subTest(employee=employee.id, day=day):
+                    self.assertEqual(matrix.work_us[idx, offset], result.work_duration // timedelta(microseconds=1))
+                    self.assertEqual(matrix.lateness_us[idx, offset], result.lateness // timedelta(microseconds=1))
+
+
+class WeeklyReportTests(TestCase):
+    # Week 2 of March 2025 runs from Monday the 10th to Sunday the 16th; working hours are 08:00-18:00.
+    def setUp(self):
+        cache.clear()
+        self.employee = create_employee('weekly', local_datetime(date(2024, 1, 1), 9))
+        Attendance.objects.create(
+            employee=self.employee, date=date(2025, 3, 10), status='checked_out',
+            check_in=local_datetime(date(2025, 3, 10), 8), check_out=local_datetime(date(2025, 3, 10), 17)
+        )
+        Attendance.objects.create(
+            employee=self.employee, date=date(2025, 3, 12), status='checked_in',
+            check_in=local_datetime(date(2025, 3, 12), 8, 30)
+        )
+        self.now = local_datetime(date(2025, 3, 12), 12)
+
+    def weekly_row(self):
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            return get_attendance_report_service().get_weekly_report(2025, 3, 2)[0]
+
+    def test_weekly_report_clips_sessions_to_todays_window(self):
+        # Every session is clipped to today's working window, so Monday's full day adds no presence,
+        # and the Tuesday without sessions is skipped rather than counted late.
+        self.assertEqual(self.weekly_row(), {
+            'employee': 'weekly',
+            'total_hours': '03:30',
+            'total_lateness': '04:30',
+            'avg_daily_hours': '01:45',
+            'days_worked': 2,
+            'days_late': 2,
+        })
+
+
+class ReportParityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employees = create_staff(6)
+        create_sessions(self.employees, date(2025, 3, 1), date(2025, 3, 19))
+        self.now = local_datetime(date(2025, 3, 19), 12, 15)
+        self.report_service = get_attendance_report_service()
+
+    def raw_report(self, start_date: date, end_date: date, working_days, report_name: str):
+        return self.report_service.report_engine.period_report(
+            self.employees, Attendance.objects.all(), start_date, end_date, working_days,
+            timezone.localtime(self.now), report_name=report_name
+        )
+
+    def test_reports_with_frozen_rollups_match_raw_sessions(self):
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            frozen = get_daily_summary_service().refresh_days(
+                [date(2025, 3, 1) + timedelta(days=offset) for offset in range(18)]
+            )
+            monthly = self.report_service.get_monthly_report(2025, 3)
+            weekly = self.report_service.get_weekly_report(2025, 3, 2)
+            employee_monthly = [self.report_service.get_employee_monthly_report(employee, 2025, 3) for employee in self.employees]
+        self.assertEqual(frozen, 6 * 18)
+        self.assertEqual(monthly, self.raw_report(*self.report_service._monthly_period(2025, 3, self.now.date()), 'monthly'))
+        start_date, end_date, _ = self.report_service._weekly_period(2025, 3, 2)
+        self.assertEqual(weekly, self.report_service.report_engine.weekly_report(
+            self.employees, Attendance.objects.filter(date__range=(start_date, end_date)), timezone.localtime(self.now)
+        ))
+        self.assertEqual(employee_monthly, monthly)
+
+    def test_sharded_report_matches_full_report(self):
+        employee_ids = [employee.id for employee in self.employees]
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            now_local = timezone.localtime(self.now)
+            shards = [
+                self.report_service.compute_report_shard('monthly', (2025, 3), employee_ids[offset:offset + 4], now_local)
+                for offset in range(0, len(employee_ids), 4)
+            ]
+            self.assertEqual(self.report_service.store_report_shards('monthly', (2025, 3), shards), len(employee_ids))
+            sharded = self.report_service.get_monthly_report(2025, 3)
+        self.assertEqual(sharded, self.raw_report(*self.report_service._monthly_period(2025, 3, self.now.date()), 'monthly'))
+
+
+@override_settings(QUERY_METRICS_ENABLED=True)
+class ReportQueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = local_datetime(date(2025, 3, 19), 12, 15)
+
+    def cold_monthly_report(self) -> QueryMetrics:
+        cache.clear()
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            with query_budget(4, 'cold monthly report') as metrics:
+                get_attendance_report_service().get_monthly_report(2025, 3)
+        return metrics
+
+    def test_monthly_report_query_count_does_not_grow_with_staff(self):
+        employees = create_staff(3)
+        create_sessions(employees, date(2025, 3, 1), date(2025, 3, 19))
+        small = self.cold_monthly_report()
+        more_employees = create_staff(9, prefix='extra')
+        create_sessions(more_employees, date(2025, 3, 1), date(2025, 3, 19), seed=11)
+        large = self.cold_monthly_report()
+        self.assertEqual(large.count, small.count)
+        self.assertEqual(large.duplicates(), [])
+
+
+def result_fields(result) -> tuple:
+    return result.lateness, result.work_duration, result.status, result.last_action_time
+
+
+class LiveAttendanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employees = create_staff(9)
+        # Wednesday to Saturday, so a day off is covered too.
+        create_sessions(self.employees, date(2025, 3, 19), date(2025, 3, 22))
+        self.service = get_live_attendance_service()
+
+    def test_stored_records_evaluate_like_the_calculator(self):
+        registrations = {employee.id: employee.registration_datetime for employee in self.employees}
+        for day in (date(2025, 3, 19), date(2025, 3, 20), date(2025, 3, 21), date(2025, 3, 22)):
+            grouped = AttendanceCalculator.group_sessions(Attendance.objects.filter(date=day))
+            sessions = {(employee.id, day): grouped.get((employee.id, day), []) for employee in self.employees}
+            records = [self.service.build_record(employee, day, sessions[(employee.id, day)], 1) for employee in self.employees]
+            self.assertEqual(self.service.write(records), len(records))
+            stored = self.service.get_records([employee.id for employee in self.employees], day)
+            for minutes in range(5 * 60, 22 * 60, 25):
+                now = local_datetime(day, 0) + timedelta(minutes=minutes)
+                for include_no_check_in in (True, False):
+                    results = AttendanceCalculator.calculate_batch(
+                        sessions, now=now, registrations=registrations, include_no_check_in=include_no_check_in
+                    )
+                    for employee in self.employees:
+                        with self.subTest(employee=employee.id, now=now, include_no_check_in=include_no_check_in):
+                            self.assertEqual(
+                                result_fields(self.service.evaluate(stored[employee.id], now, include_no_check_in)),
+                                result_fields(results[(employee.id, day)])
+                            )
+
+    def test_backfill_never_replaces_a_refreshed_record(self):
+        employee, day = self.employees[0], date(2025, 3, 19)
+        sessions = AttendanceCalculator.group_sessions(Attendance.objects.filter(employee=employee, date=day))
+        self.assertEqual(self.service.write([self.service.build_record(employee, day, sessions.get((employee.id, day), []), 3)]), 1)
+        self.assertEqual(self.service.backfill([employee], day, {}), 0)
+        self.assertEqual(self.service.get_record(employee.id, day).version, 3)
+
+
+class IngestionTests(TestCase):
+    # Monday 24 March 2025, inside working hours.
+    def setUp(self):
+        cache.clear()
+        self.employees = create_staff(2)
+        self.service = get_attendance_ingestion_service()
+        self.now = local_datetime(date(2025, 3, 24), 16)
+
+    def event(self, employee, direction: str, hour: int) -> dict:
+        return {'employee_id': employee.id, 'direction': direction, 'timestamp': local_datetime(date(2025, 3, 24), hour).isoformat()}
+
+    def ingest(self, events):
+        with mock.patch('django.utils.timezone.now', return_value=self.now), \
+                mock.patch.object(self.service.fanout_service, 'schedule') as schedule:
+            result = self.service.ingest(events, 'door-1')
+        return result, [(call.args[0], call.args[1]) for call in schedule.call_args_list]
+
+    def test_duplicate_keys_are_applied_once(self):
+        first, second = self.employees
+        events = [self.event(first, 'in', 9), self.event(first, 'in', 9), self.event(second, 'in', 9)]
+        result, scheduled = self.ingest(events)
+        self.assertEqual((result['applied'], result['duplicates'], result['rejected']), (2, 1, []))
+        self.assertEqual(scheduled, [(first.id, 'check_in'), (second.id, 'check_in')])
+
+        result, scheduled = self.ingest(events + [self.event(first, 'out', 12)])
+        self.assertEqual((result['applied'], result['duplicates'], result['rejected']), (1, 3, []))
+        self.assertEqual(scheduled, [(first.id, 'check_out')])
+        self.assertEqual(AttendanceEvent.objects.count(), 3)
+        self.assertEqual(Attendance.objects.filter(check_out__isnull=True).count(), 1)
+
+    def test_concurrently_recorded_keys_count_as_duplicates(self):
+        first, second = self.employees
+        events = [self.event(first, 'in', 9), self.event(second, 'in', 9)]
+        self.ingest(events[:1])
+        real_lookup = self.service.repository.get_ingested_event_keys
+        lookups = []
+
+        def first_lookup_misses(keys):
+            # As if another batch recorded the key right after the first lookup.
+            lookups.append(keys)
+            return set() if len(lookups) == 1 else real_lookup(keys)
+
+        with mock.patch.object(self.service.repository, 'get_ingested_event_keys', side_effect=first_lookup_misses):
+            result, scheduled = self.ingest(events)
+        self.assertEqual((result['applied'], result['duplicates'], result['rejected']), (1, 1, []))
+        self.assertEqual(scheduled, [(second.id, 'check_in')])
+        self.assertEqual(Attendance.objects.filter(employee=first).count(), 1)
+
+    def test_open_session_conflict_rejects_only_that_employee(self):
+        first, second = self.employees
+        Attendance.objects.create(
+            employee=first, date=date(2025, 3, 24), check_in=local_datetime(date(2025, 3, 24), 8), status='checked_in'
+        )
+        hidden = self.service.repository.get_attendances_for_update
+        # A check-in that commits after the batch locked its rows: the batch cannot see the open session.
+        with mock.patch.object(
+            self.service.repository, 'get_attendances_for_update',
+            side_effect=lambda employee_ids, dates: hidden(employee_ids, dates).exclude(employee=first)
+        ):
+            result, scheduled = self.ingest([self.event(first, 'in', 9), self.event(second, 'in', 9), self.event(second, 'out', 10)])
+        self.assertEqual(result['applied'], 2)
+        self.assertEqual([(entry['index'], entry['error']) for entry in result['rejected']], [
+            (0, "Conflicts with a concurrent attendance change; resend the event."),
+        ])
+        self.assertEqual(scheduled, [(second.id, 'check_in'), (second.id, 'check_out')])
+        self.assertFalse(AttendanceEvent.objects.filter(employee=first).exists())
+        self.assertEqual(Attendance.objects.filter(employee=first).count(), 1)
+
+    def test_rejected_event_can_be_resent_with_the_same_key(self):
+        first, _ = self.employees
+        result, _ = self.ingest([self.event(first, 'out', 10)])
+        self.assertEqual([entry['error'] for entry in result['rejected']], ["You need to check in first."])
+
+        result, scheduled = self.ingest([self.event(first, 'in', 9), self.event(first, 'out', 10)])
+        self.assertEqual((result['applied'], result['duplicates'], result['rejected']), (2, 0, []))
+        self.assertEqual(scheduled, [(first.id, 'check_in'), (first.id, 'check_out')])
+        self.assertEqual(list(AttendanceEvent.objects.values_list('direction', 'result')), [('in', 'applied'), ('out', 'applied')])
+
+
+class TransitionScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = get_realtime_update_service()
+
+    def test_transition_is_scheduled_once_and_locked_only_until_its_eta(self):
+        now = timezone.localtime(local_datetime(date(2025, 3, 24), 7))
+        with mock.patch.object(tasks.update_real_time_attendance, 'apply_async') as apply_async:
+            transition = self.service.schedule_next_transition(now)
+            self.service.schedule_next_transition(now + timedelta(minutes=15))
+        self.assertEqual(transition, local_datetime(date(2025, 3, 24), 8))
+        self.assertEqual([call.kwargs['eta'] for call in apply_async.call_args_list], [transition + timedelta(seconds=1)])
+        lock_ttl = self.service.connection.ttl(TRANSITION_KEY.format(at=transition.isoformat()))
+        self.assertTrue(0 < lock_ttl <= 60 * 60 + 60)
+
+    def test_lost_transition_is_rescheduled_once_the_lock_expires(self):
+        now = timezone.localtime(local_datetime(date(2025, 3, 24), 7))
+        with mock.patch.object(tasks.update_real_time_attendance, 'apply_async') as apply_async:
+            transition = self.service.schedule_next_transition(now)
+            self.service.connection.delete(TRANSITION_KEY.format(at=transition.isoformat()))
+            self.service.schedule_next_transition(now + timedelta(minutes=15))
+        self.assertEqual(apply_async.call_count, 2)
+
+
+class CheckInOutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = create_staff(1)[0]
+        self.now = local_datetime(date(2025, 3, 24), 9)
+
+    def test_check_in_defers_the_rollup_to_the_fanout_job(self):
+        service = get_check_in_out_service()
+        with mock.patch('django.utils.timezone.now', return_value=self.now), \
+                mock.patch.object(tasks.publish_attendance_changes, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks() as callbacks:
+                status = service.handle_check_in(self.employee)
+            self.assertEqual(status['status'], 'checked_in')
+            self.assertFalse(AttendanceDailySummary.objects.exists())
+
+            for callback in callbacks:
+                callback()
+            self.assertEqual(service.fanout_service.peek(self.employee.id), [
+                {'action': 'check_in', 'at': timezone.localtime(self.now).isoformat(), 'refresh_summary': True}
+            ])
+            self.assertEqual(apply_async.call_count, 1)
+            with mock.patch('attendance.services.fanoutservice.send_notification'):
+                self.assertEqual(tasks.publish_attendance_changes(self.employee.id), 1)
+
+        summary = AttendanceDailySummary.objects.get(employee=self.employee, date=date(2025, 3, 24))
+        self.assertEqual((summary.status, summary.session_count, summary.lateness), ('checked_in', 1, timedelta(hours=1)))
+        self.assertEqual(service.fanout_service.peek(self.employee.id), [])
+
+
+class RefreezeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = create_staff(1)[0]
+        self.now = local_datetime(date(2025, 3, 19), 20)
+        days = [date(2025, 2, 27), date(2025, 3, 3), date(2025, 3, 4)]
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            get_daily_summary_service().refresh_days(days)
+
+    def test_working_hours_change_refreezes_only_the_current_month_one_task_per_day(self):
+        with mock.patch('django.utils.timezone.now', return_value=self.now), \
+                mock.patch.object(tasks.refresh_daily_summaries, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                working_hours = WorkingHours.get_current()
+                working_hours.start_time = time(9)
+                working_hours.save()
+        frozen = dict(AttendanceDailySummary.objects.values_list('date', 'is_frozen'))
+        self.assertEqual(frozen, {date(2025, 2, 27): True, date(2025, 3, 3): False, date(2025, 3, 4): False})
+        self.assertEqual([call.args for call in delay.call_args_list], [(['2025-03-03'],), (['2025-03-04'],)])
+
+
+
+class RealTimeDeltaTests(TestCase):
+    # Monday 24 March 2025, inside working hours.
+    def setUp(self):
+        cache.clear()
+        self.employees = create_staff(3)
+        self.service = get_realtime_update_service()
+        self.day = date(2025, 3, 24)
+
+    def send(self, hour: int, minute: int = 0, full: bool = False, listening=set):
+        # Every group has a listener unless the test says otherwise.
+        now = timezone.localtime(local_datetime(self.day, hour, minute))
+        with mock.patch('django.utils.timezone.now', return_value=now), \
+                mock.patch.object(self.service.presence_service, 'listening', side_effect=listening), \
+                mock.patch.object(self.service, '_flush') as flush:
+            sent = self.service.send_batch_update(self.employees, now, full=full)
+        return sent, flush
+
+    def test_only_changed_payloads_are_sent(self):
+        sent, flush = self.send(10)
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(flush.call_args.args[0]), 4)
+        self.assertEqual(self.send(10)[0], 0)
+
+        first = self.employees[0]
+        Attendance.objects.create(employee=first, date=self.day, check_in=local_datetime(self.day, 9, 30), status='checked_in')
+        self.service.live_attendance_service.discard(first.id, self.day)
+        self.assertEqual(self.send(10)[0], 1)
+        seq, state = self.service.snapshot_service.snapshot(self.day)
+        self.assertEqual(seq, 2)
+        self.assertEqual(state[first.id]['status'], 'checked_in')
+        self.assertEqual([len(messages) for _, messages in self.service.snapshot_service.deltas_since(1, self.day)], [1])
+
+        self.assertEqual(self.send(10, full=True)[0], 3)
+
+
+    def test_groups_without_listeners_are_skipped_but_recorded(self):
+        first = self.employees[0]
+        sent, flush = self.send(10, listening=lambda groups: {f"user_{first.id}_employee_attendance"})
+        self.assertEqual(sent, 3)
+        self.assertEqual([group for group, _ in flush.call_args.args[0]], [f"user_{first.id}_employee_attendance"])
+        self.assertEqual(len(self.service.snapshot_service.snapshot(self.day)[1]), 3)
+
+        sent, flush = self.send(10, full=True, listening=lambda groups: set())
+        self.assertEqual(sent, 3)
+        flush.assert_not_called()
+        self.assertEqual(self.service.snapshot_service.snapshot(self.day)[0], 2)
+
+    def test_linear_counter_growth_is_not_a_change(self):
+        first = self.employees[0]
+        Attendance.objects.create(employee=first, date=self.day, check_in=local_datetime(self.day, 9), status='checked_in')
+        self.assertEqual(self.send(10)[0], 3)
+        # Lateness and work time keep growing at the rate the clients already extrapolate.
+        self.assertEqual(self.send(11, 20)[0], 0)
+        counters = self.service.snapshot_service.snapshot(self.day)[1][first.id]['counters']
+        self.assertEqual((counters['work_duration']['seconds'], counters['work_duration']['rate']), (3600, 1))
+
+        # At the end of the working day every rate changes.
+        self.assertEqual(self.send(18, 5)[0], 3)
+        counters = self.service.snapshot_service.snapshot(self.day)[1][first.id]['counters']
+        self.assertEqual((counters['work_duration']['seconds'], counters['work_duration']['rate']), (9 * 3600, 0))
+
+
+class RealTimeSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = get_realtime_snapshot_service()
+
+    def test_sequence_and_log_are_kept_per_day(self):
+        monday, tuesday = date(2025, 3, 24), date(2025, 3, 25)
+        self.assertEqual(self.service.record([{'id': 1, 'status': 'checked_in'}], monday), 1)
+        self.assertEqual(self.service.record([{'id': 2, 'status': 'checked_in'}], monday), 2)
+        self.assertEqual(self.service.record([{'id': 1, 'status': 'not_checked_in'}], tuesday), 1)
+
+        self.assertEqual(self.service.snapshot(monday), (2, {1: {'id': 1, 'status': 'checked_in'}, 2: {'id': 2, 'status': 'checked_in'}}))
+        self.assertEqual(self.service.deltas_since(1, monday), [(2, [{'id': 2, 'status': 'checked_in'}])])
+        self.assertEqual(self.service.deltas_since(2, monday), [])
+        self.assertEqual(self.service.deltas_since(0, tuesday), [(1, [{'id': 1, 'status': 'not_checked_in'}])])
+        # A sequence number from a newer log than the day's own cannot be resumed.
+        self.assertIsNone(self.service.deltas_since(3, monday))
+
+    @override_settings(REALTIME_DELTA_LOG_SIZE=2)
+    def test_resume_past_the_trimmed_log_needs_a_snapshot(self):
+        day = date(2025, 3, 24)
+        for employee_id in range(1, 5):
+            self.service.record([{'id': employee_id}], day)
+        self.assertEqual([seq for seq, _ in self.service.deltas_since(2, day)], [3, 4])
+        self.assertIsNone(self.service.deltas_since(1, day))
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employees = create_staff(3)
+        create_sessions(self.employees, date(2025, 3, 1), date(2025, 3, 19))
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='manager', user_type='authorized'))
+        self.now = local_datetime(date(2025, 3, 19), 20)
+
+    def export(self, kind: str, start: str, end: str, **params) -> bytes:
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            response = self.client.get(f"/api/v1/attendance/export/{kind}/", {'start': start, 'end': end, **params})
+            self.assertEqual(response.status_code, 200)
+            return b''.join(response.streaming_content)
+
+    def test_session_export_covers_only_the_range(self):
+        content = self.export('sessions', '2025-03-10', '2025-03-12')
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        expected = Attendance.objects.filter(date__range=(date(2025, 3, 10), date(2025, 3, 12)))
+        self.assertEqual(sorted(int(row['id']) for row in rows), sorted(expected.values_list('id', flat=True)))
+        self.assertEqual(gzip.decompress(self.export('sessions', '2025-03-10', '2025-03-12', gzip='1')), content)
+
+    def test_report_export_is_clipped_to_the_range(self):
+        content = self.export('report', '2025-02-24', '2025-03-07', export_format='ndjson')
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(
+            sorted({(record['start_date'], record['end_date']) for record in records}),
+            [('2025-02-24', '2025-02-28'), ('2025-03-01', '2025-03-07')]
+        )
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            totals = get_attendance_range_report_service().get_range_report(date(2025, 3, 1), date(2025, 3, 7))['totals']
+        march = [record for record in records if record['month'] == 3]
+        self.assertEqual(
+            [{key: value for key, value in record.items() if key in totals[0]} for record in march],
+            totals
+        )
+
+    def test_employees_export_only_their_own_sessions(self):
+        employee = self.employees[1]
+        self.client.force_authenticate(employee.user)
+        records = [json.loads(line) for line in self.export('sessions', '2025-03-01', '2025-03-19', export_format='ndjson').decode().splitlines()]
+        self.assertTrue(records)
+        self.assertEqual({record['employee_id'] for record in records}, {employee.id})
+
+    def test_invalid_exports_are_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/attendance/export/payroll/', {'start': '2025-03-01', 'end': '2025-03-02'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/attendance/export/sessions/', {'start': '2025-03-02', 'end': '2025-03-01'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/attendance/export/sessions/', {'start': '2025-03-01'}).status_code, 400)
+
+
+class RangePresetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = get_attendance_range_report_service()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='manager', user_type='authorized'))
+
+    def test_presets_resolve_relative_to_today(self):
+        today = date(2025, 3, 19)
+        self.assertEqual(self.service.preset_range('month', today), (date(2025, 3, 1), today))
+        self.assertEqual(self.service.preset_range('quarter', today), (date(2025, 1, 1), today))
+        self.assertEqual(self.service.preset_range('last_quarter', today), (date(2024, 10, 1), date(2024, 12, 31)))
+        self.assertEqual(self.service.preset_range('last_quarter', date(2025, 8, 2)), (date(2025, 4, 1), date(2025, 6, 30)))
+        self.assertEqual(self.service.preset_range('ytd', today), (date(2025, 1, 1), today))
+
+    def test_range_report_view_accepts_presets(self):
+        create_sessions(create_staff(2), date(2025, 3, 1), date(2025, 3, 19))
+        with mock.patch('django.utils.timezone.now', return_value=local_datetime(date(2025, 3, 19), 20)):
+            response = self.client.get('/api/v1/attendance/range-report/', {'preset': 'quarter', 'group_by': 'month'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data['start_date'], response.data['end_date']), ('2025-01-01', '2025-03-19'))
+            self.assertEqual([bucket['start_date'] for bucket in response.data['buckets']], ['2025-01-01', '2025-02-01', '2025-03-01'])
+            self.assertEqual(self.client.get('/api/v1/attendance/range-report/', {'preset': 'fortnight'}).status_code, 400)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import AttendanceViewSet, AttendanceStatusView, CheckInAPIView,CheckOutAPIView, DetailedMonthlyReportView , DetailedMonthlyWorkHoursAPIView
+from .views import AttendanceViewSet, AttendanceStatusView, CheckInAPIView,CheckOutAPIView, DetailedMonthlyReportView , DetailedMonthlyWorkHoursAPIView, AttendanceExportAPIView, RangeReportAPIView, AttendanceIngestAPIView
 
 router = DefaultRouter()
 router.register(r'attendances', AttendanceViewSet, basename='attendance')
@@ -13,4 +13,7 @@ urlpatterns = [
     path('check-out/', CheckOutAPIView.as_view(), name='check_out'),
     path('detailed-monthly-report/', DetailedMonthlyReportView.as_view(), name='detailed_monthly_report'),
     path('monthly-report/<int:year>/<int:month>/', DetailedMonthlyWorkHoursAPIView.as_view(), name='monthly_report'),
+    path('range-report/', RangeReportAPIView.as_view(), name='range_report'),
+    path('export/<str:kind>/', AttendanceExportAPIView.as_view(), name='attendance_export'),
+    path('ingest/', AttendanceIngestAPIView.as_view(), name='attendance_ingest'),
 ]
\ No newline at end of file
@@ -1,9 +1,10 @@
 from .services.checkinoutservice import CheckInOutService
 from .services.realtimeupdateservice import RealTimeUpdateService
+from .services.dailysummaryservice import DailySummaryService
 from .attendancerepository import AttendanceRepository
 from employee.employeerepository import EmployeeRepository
 from employee.services import EmployeeService
-from employee_tracking_system.common.helpers import get_attendance_calculator, get_working_hours_service
+from employee_tracking_system.common.helpers import get_attendance_calculator, get_attendance_report_engine, get_working_hours_service, get_presence_service
 
 
 def get_attendance_repository():
@@ -17,23 +18,78 @@ def get_attendance_report_service():
     attendance_repository = get_attendance_repository()
     attendance_calculator = get_attendance_calculator()
     employee_service = get_employee_service()
-    return AttendanceReportService(attendance_repository, attendance_calculator, employee_service)
+    report_engine = get_attendance_report_engine()
+    return AttendanceReportService(attendance_repository, attendance_calculator, employee_service, report_engine)
+
+def get_attendance_range_report_service():
+    from .services.rangereportservice import AttendanceRangeReportService
+    attendance_repository = get_attendance_repository()
+    employee_service = get_employee_service()
+    report_engine = get_attendance_report_engine()
+    return AttendanceRangeReportService(attendance_repository, employee_service, report_engine)
+
+def get_attendance_export_service():
+    from .services.exportservice import AttendanceExportService
+    attendance_repository = get_attendance_repository()
+    report_service = get_attendance_report_service()
+    return AttendanceExportService(attendance_repository, report_service)
 
 def get_employee_service():
     attendance_repository = get_attendance_repository()
     employee_repository = get_employee_repository()
     return EmployeeService(employee_repository, attendance_repository)
 
+def get_live_attendance_service():
+    from .services.liveattendanceservice import LiveAttendanceService
+    return LiveAttendanceService()
+
+def get_realtime_snapshot_service():
+    from .services.realtimesnapshotservice import RealTimeSnapshotService
+    return RealTimeSnapshotService()
+
 def get_realtime_update_service():
     attendance_repository = get_attendance_repository()
     employee_service = get_employee_service()
-    return RealTimeUpdateService(attendance_repository, employee_service)
+    live_attendance_service = get_live_attendance_service()
+    snapshot_service = get_realtime_snapshot_service()
+    presence_service = get_presence_service()
+    return RealTimeUpdateService(attendance_repository, employee_service, live_attendance_service, snapshot_service, presence_service)
+
+def get_daily_summary_service() -> DailySummaryService:
+    repository = get_attendance_repository()
+    employee_service = get_employee_service()
+    report_engine = get_attendance_report_engine()
+    live_attendance_service = get_live_attendance_service()
+    return DailySummaryService(repository, employee_service, report_engine, live_attendance_service)
+
+def get_attendance_fanout_service():
+    from .services.fanoutservice import AttendanceFanoutService
+    real_time_service = get_realtime_update_service()
+    employee_service = get_employee_service()
+    daily_summary_service = get_daily_summary_service()
+    return AttendanceFanoutService(real_time_service, employee_service, daily_summary_service)
+
+def get_attendance_ingestion_service():
+    from .services.ingestionservice import AttendanceIngestionService
+    repository = get_attendance_repository()
+    employee_service = get_employee_service()
+    attendance_calculator = get_attendance_calculator()
+    daily_summary_service = get_daily_summary_service()
+    fanout_service = get_attendance_fanout_service()
+    return AttendanceIngestionService(repository, employee_service, attendance_calculator, daily_summary_service, fanout_service)
 
 def get_check_in_out_service() -> CheckInOutService:
     repository = get_attendance_repository()
     employee_service = get_employee_service()
     real_time_service = get_realtime_update_service()
     attendance_calculator = get_attendance_calculator()
-    return CheckInOutService(repository, employee_service, real_time_service, attendance_calculator)
+    daily_summary_service = get_daily_summary_service()
+    fanout_service = get_attendance_fanout_service()
+    live_attendance_service = get_live_attendance_service()
+    return CheckInOutService(
+        repository, employee_service, real_time_service, attendance_calculator,
+        daily_summary_service, fanout_service, live_attendance_service
+    )
 def get_working_hours_service(): 
+    from employee_tracking_system.common.helpers import get_working_hours_service
     return get_working_hours_service()
\ No newline at end of file
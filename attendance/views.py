@@ -3,11 +3,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from .serializers import AttendanceSerializer
 from .models import Attendance
 from django.views.generic import TemplateView
 from django.contrib.auth.models import AnonymousUser
-from .utils import  get_check_in_out_service, get_attendance_report_service
+from .utils import  get_check_in_out_service, get_attendance_report_service, get_daily_summary_service, get_attendance_export_service, get_attendance_range_report_service, get_attendance_ingestion_service
+from .services.exportservice import EXPORT_FORMATS, EXPORT_KINDS
+from .services.rangereportservice import RANGE_GROUPS, RANGE_PRESETS
+from datetime import date
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +29,28 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             return Attendance.objects.all()
         return Attendance.objects.filter(employee=user.employee)
 
+    def _refresh_daily_summary(self, employee, target_date):
+        try:
+            get_daily_summary_service().refresh_summary(employee, target_date)
+        except Exception as e:
+            logger.error(f"Error refreshing daily summary for employee {employee.id} on {target_date}: {e}")
+
+    def perform_create(self, serializer):
+        attendance = serializer.save()
+        self._refresh_daily_summary(attendance.employee, attendance.date)
+
+    def perform_update(self, serializer):
+        previous_date = serializer.instance.date
+        attendance = serializer.save()
+        self._refresh_daily_summary(attendance.employee, attendance.date)
+        if previous_date != attendance.date:
+            self._refresh_daily_summary(attendance.employee, previous_date)
+
+    def perform_destroy(self, instance):
+        employee, target_date = instance.employee, instance.date
+        instance.delete()
+        self._refresh_daily_summary(employee, target_date)
+
 class CheckInAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -91,10 +118,9 @@ class DetailedMonthlyWorkHoursAPIView(APIView):
                 report_data = report_service.get_monthly_report(year, month)
             else:
                 employee = report_service.employee_service.get_employee(request.user.employee.id)
-                report_data = [
-                    report for report in report_service.get_monthly_report(year, month)
-                    if report['employee'] == employee.user.username
-                ]
+                if not employee:
+                    return Response({"error": "Employee not found."}, status=status.HTTP_404_NOT_FOUND)
+                report_data = [report_service.get_employee_monthly_report(employee, year, month)]
 
             logger.debug(f"Report data: {report_data}")
             return Response(report_data, status=200)
@@ -102,3 +128,94 @@ class DetailedMonthlyWorkHoursAPIView(APIView):
         except Exception as e:
             logger.error(f"Error generating monthly report: {e}")
             return Response({'error': "Failed to generate monthly report."}, status=500)
+
+class RangeReportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.user_type != 'authorized':
+            return Response({"error": "Only authorized users can view range reports."}, status=status.HTTP_403_FORBIDDEN)
+        group_by = request.query_params.get('group_by', 'total')
+        if group_by not in RANGE_GROUPS:
+            return Response({"error": f"group_by must be one of {', '.join(RANGE_GROUPS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        preset = request.query_params.get('preset')
+        try:
+            if preset:
+                if preset not in RANGE_PRESETS:
+                    return Response({"error": f"preset must be one of {', '.join(RANGE_PRESETS)}."}, status=status.HTTP_400_BAD_REQUEST)
+                start_date, end_date = get_attendance_range_report_service().preset_range(preset, timezone.localdate())
+            else:
+                start_date = date.fromisoformat(request.query_params['start'])
+                end_date = date.fromisoformat(request.query_params['end'])
+        except (KeyError, ValueError):
+            return Response({"error": "Provide a preset or start and end as ISO dates (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date or start_date > timezone.localdate():
+            return Response({"error": "start must not be after end or in the future."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report_data = get_attendance_range_report_service().get_range_report(start_date, end_date, group_by)
+            return Response(report_data, status=200)
+        except Exception as e:
+            logger.error(f"Error generating range report: {e}")
+            return Response({'error': "Failed to generate range report."}, status=500)
+
+class AttendanceExportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, kind):
+        if kind not in EXPORT_KINDS:
+            return Response({"error": f"Unknown export kind '{kind}'."}, status=status.HTTP_404_NOT_FOUND)
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": f"Unsupported export format '{export_format}'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start_date = date.fromisoformat(request.query_params['start'])
+            end_date = date.fromisoformat(request.query_params['end'])
+        except (KeyError, ValueError):
+            return Response({"error": "start and end must be ISO dates (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+        if start_date > end_date:
+            return Response({"error": "start must not be after end."}, status=status.HTTP_400_BAD_REQUEST)
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            export_service = get_attendance_export_service()
+            employees = None
+            if request.user.user_type != 'authorized':
+                employee = export_service.report_service.employee_service.get_employee(request.user.employee.id)
+                if not employee:
+                    return Response({"error": "Employee not found."}, status=status.HTTP_404_NOT_FOUND)
+                employees = [employee]
+            chunks = export_service.stream(kind, export_format, start_date, end_date, employees, compress)
+        except Exception as e:
+            logger.error(f"Error starting {kind} export: {e}")
+            return Response({'error': "Failed to export attendance data."}, status=500)
+
+        filename = f"attendance_{kind}_{start_date}_{end_date}.{export_format}"
+        content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        if compress:
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+class AttendanceIngestAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.user_type != 'authorized':
+            return Response({"error": "Only authorized users can ingest attendance events."}, status=status.HTTP_403_FORBIDDEN)
+        events = request.data.get('events')
+        if not isinstance(events, list) or not events:
+            return Response({"error": "events must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > settings.INGEST_MAX_EVENTS:
+            return Response({"error": f"At most {settings.INGEST_MAX_EVENTS} events per request."}, status=status.HTTP_400_BAD_REQUEST)
+        source = str(request.data.get('source') or '')[:64]
+
+        try:
+            result = get_attendance_ingestion_service().ingest(events, source)
+            return Response(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(f"Error ingesting {len(events)} attendance events from '{source}': {e}")
+            return Response({"error": "Failed to ingest attendance events."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
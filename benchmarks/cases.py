@@ -0,0 +1,120 @@
+from datetime import datetime
+from typing import Any, Callable, Dict
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from attendance.models import Attendance
+from attendance.services.reportcacheservice import ReportCacheService
+from attendance.utils import (
+    get_attendance_report_service,
+    get_check_in_out_service,
+    get_daily_summary_service,
+    get_employee_service,
+    get_realtime_update_service,
+)
+from employee.views import EmployeeOverviewAPIView
+
+# Each case returns func plus optional setup, teardown and budget (max queries per run, independent of data size).
+CASES: Dict[str, Callable[['BenchmarkContext'], Dict[str, Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(factory):
+        CASES[name] = factory
+        return factory
+    return register
+
+
+class BenchmarkContext:
+    __slots__ = ('now', 'year', 'month', 'week', 'employee', 'authorized_user')
+
+    def __init__(self, now: datetime, year: int, month: int, week: int, employee, authorized_user):
+        self.now = now
+        self.year = year
+        self.month = month
+        self.week = week
+        self.employee = employee
+        self.authorized_user = authorized_user
+
+
+def _drop_report(cache_key: str):
+    ReportCacheService().connection.delete(cache_key, f"{cache_key}:patched")
+    cache.delete_pattern(f"{cache_key}_employee_*")
+
+
+@benchmark('monthly_report_cold')
+def monthly_report_cold(context: BenchmarkContext) -> Dict[str, Any]:
+    report_service = get_attendance_report_service()
+    cache_key = ReportCacheService.monthly_key(context.year, context.month)
+    return {
+        'func': lambda: report_service.get_monthly_report(context.year, context.month),
+        'setup': lambda: _drop_report(cache_key),
+        'budget': 4,
+    }
+
+
+@benchmark('monthly_report_warm')
+def monthly_report_warm(context: BenchmarkContext) -> Dict[str, Any]:
+    report_service = get_attendance_report_service()
+    report_service.get_monthly_report(context.year, context.month)
+    return {'func': lambda: report_service.get_monthly_report(context.year, context.month), 'budget': 1}
+
+
+@benchmark('weekly_report_cold')
+def weekly_report_cold(context: BenchmarkContext) -> Dict[str, Any]:
+    report_service = get_attendance_report_service()
+    cache_key = ReportCacheService.weekly_key(context.year, context.month, context.week)
+    return {
+        'func': lambda: report_service.get_weekly_report(context.year, context.month, context.week),
+        'setup': lambda: _drop_report(cache_key),
+        'budget': 4,
+    }
+
+
+@benchmark('employee_overview')
+def employee_overview(context: BenchmarkContext) -> Dict[str, Any]:
+    factory = APIRequestFactory()
+    view = EmployeeOverviewAPIView.as_view()
+
+    def request_overview():
+        request = factory.get('/employee/overview/')
+        force_authenticate(request, user=context.authorized_user)
+        response = view(request)
+        response.render()
+        if response.status_code != 200:
+            raise RuntimeError(f"Overview returned {response.status_code}: {response.content[:200]}")
+
+    return {'func': request_overview, 'budget': 3}
+
+
+@benchmark('check_in_check_out')
+def check_in_check_out(context: BenchmarkContext) -> Dict[str, Any]:
+    check_in_out_service = get_check_in_out_service()
+    employee = context.employee
+    today = context.now.date()
+    existing_ids = set(Attendance.objects.filter(employee=employee, date=today).values_list('id', flat=True))
+
+    def check_in_and_out():
+        for result in (check_in_out_service.handle_check_in(employee), check_in_out_service.handle_check_out(employee)):
+            if 'error' in result:
+                raise RuntimeError(f"Check-in/out failed: {result['error']}")
+
+    def restore():
+        Attendance.objects.filter(employee=employee, date=today).exclude(id__in=existing_ids).delete()
+        Attendance.objects.filter(id__in=existing_ids, check_out=context.now).update(check_out=None, status='checked_in')
+        get_daily_summary_service().refresh_summary(employee, today)
+
+    return {'func': check_in_and_out, 'teardown': restore, 'budget': 30}
+
+
+@benchmark('realtime_tick')
+def realtime_tick(context: BenchmarkContext) -> Dict[str, Any]:
+    realtime_update_service = get_realtime_update_service()
+    employee_service = get_employee_service()
+
+    # A full snapshot, as at a day transition; steady-state ticks send nothing.
+    def full_tick():
+        employees = list(employee_service.get_all_employees())
+        realtime_update_service.send_batch_update(employees, timezone.localtime(timezone.now()), full=True)
+
+    return {'func': full_tick, 'budget': 3}
@@ -0,0 +1,82 @@
+from typing import Any, Callable, Dict, List, Optional
+from employee_tracking_system.utils.query_metrics import QueryMetrics
+import statistics
+import time
+import tracemalloc
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkResult:
+    __slots__ = ('name', 'runs', 'wall_ms', 'queries', 'db_ms', 'duplicates', 'peak_kb')
+
+    def __init__(self, name: str, runs: int, wall_ms: List[float], metrics: QueryMetrics, peak_kb: float):
+        self.name = name
+        self.runs = runs
+        self.wall_ms = wall_ms
+        self.queries = metrics.count
+        self.db_ms = metrics.db_time_ms
+        self.duplicates = sum(count - 1 for _, count in metrics.duplicates())
+        self.peak_kb = peak_kb
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'runs': self.runs,
+            'wall_ms_min': round(min(self.wall_ms), 3),
+            'wall_ms_median': round(statistics.median(self.wall_ms), 3),
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 3),
+            'duplicate_queries': self.duplicates,
+            'peak_kb': round(self.peak_kb, 1),
+        }
+
+
+def _run(name: str, func: Callable[[], Any], setup: Optional[Callable[[], Any]], teardown: Optional[Callable[[], Any]], trace_memory: bool):
+    if setup:
+        setup()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with QueryMetrics(f"benchmark {name}") as metrics:
+            started = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - started) * 1000
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        if teardown:
+            teardown()
+    return elapsed, metrics, peak
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int = 5, setup: Optional[Callable[[], Any]] = None,
+            teardown: Optional[Callable[[], Any]] = None, budget: Optional[int] = None) -> BenchmarkResult:
+    wall_ms, metrics = [], None
+    for _ in range(repeat):
+        elapsed, metrics, _ = _run(name, func, setup, teardown, trace_memory=False)
+        wall_ms.append(elapsed)
+    # tracemalloc slows allocation-heavy code down, so peak memory comes from a separate run.
+    _, _, peak = _run(name, func, setup, teardown, trace_memory=True)
+    result = BenchmarkResult(name, repeat, wall_ms, metrics, peak / 1024)
+    logger.info(f"Benchmark {name}: {result.as_dict()}")
+    if budget is not None:
+        metrics.check_budget(budget)
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    previous = {entry['name']: entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry['name'])
+        if not before:
+            continue
+        if entry['queries'] > before['queries']:
+            regressions.append(f"{entry['name']}: queries {before['queries']} -> {entry['queries']}")
+        for metric in ('wall_ms_median', 'peak_kb'):
+            if before[metric] and entry[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{entry['name']}: {metric} {before[metric]} -> {entry[metric]}")
+    return regressions
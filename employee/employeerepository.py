@@ -23,11 +23,14 @@ class EmployeeRepository(IEmployeeRepository):
 
     def get_all_employees(self) -> List[Employee]:
         try:
-            return Employee.objects.all()
+            return Employee.objects.select_related('user').all()
         except Exception as e:
             logger.error(f"Error getting all employee: {e}")
             return []
 
+    def get_employees_by_ids(self, employee_ids: List[int]) -> List[Employee]:
+        return list(Employee.objects.select_related('user').filter(id__in=employee_ids))
+
     def get_employees_without_checkin(self, target_date: date) -> List[Employee]:
         try:
             return Employee.objects.exclude(
@@ -13,6 +13,10 @@ class IEmployeeRepository(ABC):
     def get_all_employees(self) -> List[Employee]:
         pass
 
+    @abstractmethod
+    def get_employees_by_ids(self, employee_ids: List[int]) -> List[Employee]:
+        pass
+
     @abstractmethod
     def get_employees_without_checkin(self, target_date: date) -> List[Employee]:
         pass
@@ -10,7 +10,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from attendance.iattendancerepository import IAttendanceRepository
 from .utils import get_attendance_repository,get_attendance_calculator, get_working_hours_service
 from datetime import date  
-from attendance.models import Attendance 
+from .signals import leave_balance_changed
 from django.db import transaction 
 import logging
 
@@ -38,6 +38,13 @@ class EmployeeService:
                 logger.error(f"Error getting employee by id: {e}")
                 return None
 
+    def get_employees_by_ids(self, employee_ids: List[int]) -> List[Employee]:
+        try:
+            return self.repository.get_employees_by_ids(employee_ids)
+        except Exception as e:
+            logger.error(f"Error retrieving employees by id: {e}")
+            return []
+
     def get_all_employees(self) -> List[Employee]:
         try:
             employees = self.repository.get_all_employees()
@@ -56,6 +63,7 @@ class EmployeeService:
                 employee.remaining_leave = timedelta()
 
             employee.save()
+            leave_balance_changed.send(sender=self.__class__, employee_id=employee.id)
             logger.info(f"Leave balance updated for employee {employee.id} by lateness of {lateness}")
 
 
@@ -101,6 +109,7 @@ class EmployeeService:
             employee.total_lateness = 0  
             employee.total_work_duration = timedelta()
             employee.save()
+            leave_balance_changed.send(sender=self.__class__, employee_id=employee.id)
             logger.info(f"Annual leave reset for employee {employee.id}")
             send_notification(
                 employee.user, 
@@ -170,6 +179,7 @@ class EmployeeService:
                 employee.remaining_leave = timedelta()
 
             employee.save()
+            leave_balance_changed.send(sender=self.__class__, employee_id=employee.id)
             logger.info(f"Leave balance updated for employee {employee.id} by {change} days")
 
             if employee.remaining_leave <= timedelta(days=3):
@@ -207,56 +217,53 @@ class EmployeeService:
             return []
         
     def get_daily_attendance_summary(self, employee: Employee, target_date: date) -> dict:
-        try:
-            now = timezone.now()
-            logger.debug(f"Fetching attendances for employee_id={employee.id} on date={target_date}")
-            attendances = self.attendance_repository.get_employee_attendances(employee.id, target_date)
-            logger.debug(f"Attendances fetched: {attendances.count()} records")
-
-            reg_dt = getattr(employee, 'registration_datetime', None)
+        return self.get_daily_attendance_summaries([employee], target_date)[0]
 
-            status = Attendance.objects.determine_attendance_status(attendances, now, target_date)
-            logger.debug(f"Determined status: {status}")
-
-            daily_lateness = self.attendance_calculator.calculate_lateness(
-                attendances=attendances,
+    def get_daily_attendance_summaries(self, employees: List[Employee], target_date: date) -> List[dict]:
+        employees = list(employees)
+        try:
+            now = timezone.localtime(timezone.now())
+            attendances = self.attendance_repository.get_attendances_for_employees(
+                [employee.id for employee in employees], target_date
+            )
+            sessions = self.attendance_calculator.group_sessions(attendances)
+            logger.debug(f"Attendances fetched for {len(employees)} employees on date={target_date}")
+            results = self.attendance_calculator.calculate_batch(
+                {(employee.id, target_date): sessions.get((employee.id, target_date), []) for employee in employees},
                 now=now,
+                registrations={employee.id: getattr(employee, 'registration_datetime', None) for employee in employees},
                 include_no_check_in=True,
-                registration_dt=reg_dt  # <-- YENİ
-            )
-            logger.debug(f"Calculated daily lateness: {daily_lateness}")
-
-            daily_work = self.attendance_calculator.calculate_work_duration(
-                attendances=attendances,
-                now=now
+                presorted=True
             )
-            logger.debug(f"Calculated daily work duration: {daily_work}")
-
-            last_attendance = attendances.order_by('-check_out', '-check_in').first()
-            last_action_time = last_attendance.check_out or last_attendance.check_in if last_attendance else None
-            logger.debug(f"Last action time: {last_action_time}")
+        except Exception as e:
+            logger.error(f"Error in get_daily_attendance_summaries for {len(employees)} employees on {target_date}: {e}")
+            return [self._unavailable_daily_summary(employee) for employee in employees]
 
+        summaries = []
+        for employee in employees:
+            result = results[(employee.id, target_date)]
             summary = {
                 "id": employee.id,
                 "username": employee.user.username,
-                "status": status,
-                "last_action_time": TimeCalculator.format_datetime(last_action_time),
-                "lateness": TimeCalculator.timedelta_to_hhmm(daily_lateness),
-                "work_duration": TimeCalculator.timedelta_to_hhmm(daily_work),
+                "status": result.status,
+                "last_action_time": TimeCalculator.format_datetime(result.last_action_time),
+                "lateness": TimeCalculator.timedelta_to_hhmm(result.lateness),
+                "work_duration": TimeCalculator.timedelta_to_hhmm(result.work_duration),
                 "remaining_leave": self.get_remaining_leave_display(employee),
                 "annual_leave": employee.annual_leave
             }
             logger.debug(f"Summary for employee_id={employee.id}: {summary}")
-            return summary
-        except Exception as e:
-            logger.error(f"Error in get_daily_attendance_summary for employee_id={employee.id}: {e}")
-            return {
-                "id": employee.id,
-                "username": employee.user.username if employee and employee.user else "N/A",
-                "status": "N/A",
-                "last_action_time": "N/A",
-                "lateness": "0m",
-                "work_duration": "0m",
-                "remaining_leave": self.get_remaining_leave_display(employee) if employee else "0d 0h 0m",
-                "annual_leave": employee.annual_leave if employee else 0
-            }
\ No newline at end of file
+            summaries.append(summary)
+        return summaries
+
+    def _unavailable_daily_summary(self, employee: Employee) -> dict:
+        return {
+            "id": employee.id,
+            "username": employee.user.username if employee and employee.user else "N/A",
+            "status": "N/A",
+            "last_action_time": "N/A",
+            "lateness": "0m",
+            "work_duration": "0m",
+            "remaining_leave": self.get_remaining_leave_display(employee) if employee else "0d 0h 0m",
+            "annual_leave": employee.annual_leave if employee else 0
+        }
\ No newline at end of file
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Sent with employee_id whenever an employee's leave balance is written.
+leave_balance_changed = Signal()
@@ -96,18 +96,23 @@ def update_employee_totals():
     try:
         employee_service = get_employee_service()
         employees = employee_service.get_all_employees()
-        today = timezone.now().date()
+        now_local = timezone.localtime(timezone.now())
+        today = now_local.date()
+        employees = list(employees)
+        attendance_calculator = get_attendance_calculator()
+        attendances = employee_service.attendance_repository.get_attendances_for_employees(
+            [emp.id for emp in employees], today
+        )
+        sessions = attendance_calculator.group_sessions(attendances)
+        results = attendance_calculator.calculate_batch(
+            {(emp.id, today): sessions.get((emp.id, today), []) for emp in employees},
+            now=now_local,
+            include_no_check_in=False,
+            presorted=True
+        )
         for emp in employees:
-            attendances = emp.attendances.filter(date=today)
-            daily_lateness = get_attendance_calculator().calculate_lateness(
-                attendances=attendances,
-                now=timezone.localtime(timezone.now()),
-                include_no_check_in=False
-            )
-            daily_work_duration = get_attendance_calculator().calculate_work_duration(
-                attendances=attendances,
-                now=timezone.localtime(timezone.now())
-            )
+            daily_lateness = results[(emp.id, today)].lateness
+            daily_work_duration = results[(emp.id, today)].work_duration
             employee_service.increment_total_work_duration(emp, daily_work_duration)
             employee_service.increment_total_lateness(emp, daily_lateness)
             employee_service.update_remaining_leave(emp,daily_lateness)
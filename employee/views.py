@@ -32,13 +32,7 @@ class EmployeeOverviewAPIView(APIView):
                     return Response({"error": "Employee not found"}, status=404)
                 employees = [employee]
 
-            overview_data = []
-            for emp in employees:
-                if emp is None:
-                    logger.warning(f"Employee is None for user id {request.user.employee.id}")
-                    continue
-                summary = employee_service.get_daily_attendance_summary(emp, today)
-                overview_data.append(summary)
+            overview_data = employee_service.get_daily_attendance_summaries(employees, today)
 
             serializer = EmployeeOverviewSerializer(overview_data, many=True)
             logger.debug(f"Serialized overview data: {serializer.data}")
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import WorkingHours, HolidayCalendar
+
+
+@admin.register(HolidayCalendar)
+class HolidayCalendarAdmin(admin.ModelAdmin):
+    list_display = ('date', 'name')
+    list_filter = ('date',)
+
+
+admin.site.register(WorkingHours)
@@ -1,6 +1,7 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_prerun, task_postrun
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'employee_tracking_system.settings')
 
@@ -9,12 +10,14 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.conf.broker_url = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
 
 app.conf.beat_schedule = {
+    # Safety net for the ETA transition updates: a lost one is pushed by the next run, and unchanged
+    # payloads are not re-sent, so the runs in between are cheap.
     'update-real-time-attendance': {
         'task': 'attendance.tasks.update_real_time_attendance',
-        'schedule': crontab(minute='*/5', hour='0-19',day_of_week='1-5'),  
+        'schedule': crontab(minute='*/15'),
     },
     'calculate-monthly-total-work-duration': {
-        'task': 'attendance.tasks.generate_monthly_report_task',
+        'task': 'attendance.tasks.generate_monthly_report_sharded',
         'schedule': crontab(hour=0, minute=0, day_of_month='1'),
     },
     'reset-annual-leave': {
@@ -29,10 +32,26 @@ app.conf.beat_schedule = {
         'task': 'employee.tasks.notify_no_check_in_for_today',
         'schedule': crontab(hour=10, minute=0),  
     },
+    'close-attendance-day': {
+        'task': 'attendance.tasks.close_attendance_day',
+        'schedule': crontab(hour=23, minute=55),
+    },
     'update_employee_totals': {
         'task': 'employee.tasks.update_employee_totals',
         'schedule': crontab(hour=19, minute=00),
     },
 }
 
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+
+@task_prerun.connect
+def start_task_query_metrics(task_id=None, task=None, **kwargs):
+    from employee_tracking_system.utils.query_metrics import task_started
+    task_started(task_id=task_id, task=task)
+
+
+@task_postrun.connect
+def log_task_query_metrics(task_id=None, **kwargs):
+    from employee_tracking_system.utils.query_metrics import task_finished
+    task_finished(task_id=task_id)
\ No newline at end of file
@@ -1,8 +1,16 @@
 from attendance.attendancecalculator import AttendanceCalculator
+from attendance.attendancereportengine import AttendanceReportEngine
 from ..services.working_hours_service import WorkingHoursService
+from ..services.presence_service import PresenceService
 
 def get_attendance_calculator():
     return AttendanceCalculator()
 
+def get_attendance_report_engine():
+    return AttendanceReportEngine()
+
 def get_working_hours_service():
-    return WorkingHoursService()
\ No newline at end of file
+    return WorkingHoursService()
+
+def get_presence_service():
+    return PresenceService()
\ No newline at end of file
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from attendance.models import Attendance
+from leave.models import Leave
+from notification.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the hot attendance, leave and notification queries and checks that they use their indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Refresh planner statistics (ANALYZE) before explaining")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the full plan of every query")
+
+    def sample_values(self):
+        attendance = Attendance.objects.filter(check_in__isnull=False).order_by('-date', 'id').first()
+        leave = Leave.objects.order_by('-start_date', 'id').first()
+        notification = Notification.objects.order_by('-created_at', 'id').first()
+        if not (attendance and leave and notification):
+            raise CommandError("Not enough data to explain against; run seed_benchmark_data first.")
+        return attendance, leave, notification
+
+    def hot_queries(self):
+        attendance, leave, notification = self.sample_values()
+        employee_id, day = attendance.employee_id, attendance.date
+        # Each query lists the indexes that serve it; the plan must use one of them.
+        return [
+            ('attendance by employee and date',
+             Attendance.objects.filter(employee_id=employee_id, date=day),
+             ['attendance_employee_date_idx', 'attendance_date_employee_idx']),
+            ('open attendance session',
+             Attendance.objects.filter(employee_id=employee_id, date=day, check_in__isnull=False, check_out__isnull=True),
+             ['attendance_one_open_session', 'attendance_employee_date_idx', 'attendance_date_employee_idx']),
+            ('attendance on leave',
+             Attendance.objects.filter(employee_id=employee_id, date=day, status='on_leave'),
+             ['attendance_on_leave_idx', 'attendance_employee_date_idx', 'attendance_date_employee_idx']),
+            ('attendance for employees on a date',
+             Attendance.objects.filter(employee_id__in=[employee_id], date=day),
+             ['attendance_date_employee_idx', 'attendance_employee_date_idx']),
+            ('attendance in a week',
+             Attendance.objects.filter(date__range=(day - timedelta(days=6), day)),
+             ['attendance_date_employee_idx']),
+            ('overlapping leaves',
+             Leave.objects.filter(
+                 employee_id=leave.employee_id, status__in=[Leave.PENDING, Leave.APPROVED],
+                 start_date__lte=leave.end_date, end_date__gte=leave.start_date
+             ),
+             ['leave_employee_status_idx']),
+            ('unread notifications',
+             Notification.objects.filter(user_id=notification.user_id, is_read=False).order_by('-created_at'),
+             ['notification_unread_idx']),
+            ('user notifications',
+             Notification.objects.filter(user_id=notification.user_id).order_by('-created_at'),
+             ['notification_user_created_idx']),
+        ]
+
+    def analyze(self):
+        tables = [Attendance._meta.db_table, Leave._meta.db_table, Notification._meta.db_table]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+            else:
+                for table in tables:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+
+    def handle(self, *args, **options):
+        if options['analyze']:
+            self.analyze()
+        queries = self.hot_queries()
+        failures = []
+        for name, queryset, indexes in queries:
+            plan = queryset.explain()
+            used = next((index for index in indexes if index in plan), None)
+            if used:
+                self.stdout.write(self.style.SUCCESS(f"{name}: {used}"))
+            else:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: none of {', '.join(indexes)} used"))
+            if options['verbose_plans'] or not used:
+                self.stdout.write(f"  {queryset.query}")
+                self.stdout.write('\n'.join(f"    {line}" for line in plan.splitlines()))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries do not use their indexes: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"All {len(queries)} hot queries use their indexes"))
@@ -0,0 +1,61 @@
+import csv
+import json
+import sys
+from itertools import islice
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from attendance.utils import get_attendance_ingestion_service
+
+
+class Command(BaseCommand):
+    help = 'Applies badge reader / turnstile events (employee_id, direction, timestamp[, idempotency_key]) from a CSV, JSON or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help="Event file; '-' reads NDJSON from stdin")
+        parser.add_argument('--source', type=str, default='', help="Device or feed name stored with each event")
+        parser.add_argument('--format', type=str, choices=['csv', 'json', 'ndjson'], default=None, help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=None, help="Events per ingestion batch")
+
+    def read_events(self, path, file_format):
+        if path == '-':
+            return (json.loads(line) for line in sys.stdin if line.strip())
+        handle = open(path, newline='')
+        if file_format == 'csv':
+            return csv.DictReader(handle)
+        if file_format == 'json':
+            with handle:
+                events = json.load(handle)
+            return iter(events['events'] if isinstance(events, dict) else events)
+        return (json.loads(line) for line in handle if line.strip())
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('ndjson' if path == '-' else path.rsplit('.', 1)[-1].lower())
+        if file_format not in ('csv', 'json', 'ndjson'):
+            raise CommandError(f"Cannot infer the format of {path}; pass --format")
+        batch_size = options['batch_size'] or settings.INGEST_MAX_EVENTS
+        try:
+            events = self.read_events(path, file_format)
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        ingestion_service = get_attendance_ingestion_service()
+        totals = {'received': 0, 'applied': 0, 'duplicates': 0, 'rejected': 0}
+        offset = 0
+        while True:
+            batch = list(islice(events, batch_size))
+            if not batch:
+                break
+            result = ingestion_service.ingest(batch, options['source'])
+            for rejection in result['rejected']:
+                self.stdout.write(self.style.WARNING(f"Event {offset + rejection['index']}: {rejection['error']}"))
+            totals['received'] += result['received']
+            totals['applied'] += result['applied']
+            totals['duplicates'] += result['duplicates']
+            totals['rejected'] += len(result['rejected'])
+            offset += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Received {totals['received']} events: {totals['applied']} applied, "
+            f"{totals['duplicates']} duplicates, {totals['rejected']} rejected"
+        ))
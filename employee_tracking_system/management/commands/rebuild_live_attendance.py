@@ -0,0 +1,36 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from attendance.attendancecalculator import AttendanceCalculator
+from attendance.utils import get_attendance_repository, get_employee_service, get_live_attendance_service
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the Redis live attendance read model for a day from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=str, default=None, help="Day to rebuild (YYYY-MM-DD), defaults to today")
+        parser.add_argument('--batch-size', type=int, default=500, help="Employees per database query and Redis pipeline")
+
+    def handle(self, *args, **options):
+        day = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        repository = get_attendance_repository()
+        live_attendance_service = get_live_attendance_service()
+        employees = list(get_employee_service().get_all_employees())
+
+        written = 0
+        batch_size = options['batch_size']
+        for offset in range(0, len(employees), batch_size):
+            batch = employees[offset:offset + batch_size]
+            employee_ids = [employee.id for employee in batch]
+            sessions = AttendanceCalculator.group_sessions(repository.get_attendances_for_employees(employee_ids, day))
+            versions = dict(repository.get_daily_summaries(employee_ids, day).values_list('employee_id', 'version'))
+            records = [
+                live_attendance_service.build_record(
+                    employee, day, sessions.get((employee.id, day), []), versions.get(employee.id, 0)
+                )
+                for employee in batch
+            ]
+            written += live_attendance_service.write(records, force=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written}/{len(employees)} live attendance records for {day}'))
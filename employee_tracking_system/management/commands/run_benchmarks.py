@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, time, timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from employee.models import Employee
+from employee_tracking_system.celery import app as celery_app
+from employee_tracking_system.services.holiday_calendar_service import HolidayCalendarService
+from employee_tracking_system.utils.query_metrics import QueryBudgetExceeded
+from benchmarks.cases import CASES, BenchmarkContext
+from benchmarks.harness import measure, compare
+
+
+class Command(BaseCommand):
+    help = 'Runs the report, overview, check-in/out and real-time benchmarks and records wall time, query counts and peak memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='*', choices=sorted(CASES), help="Run only these benchmarks")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+        parser.add_argument('--at', type=str, default=None, help="Pretend the current time is this ISO datetime (local time)")
+        parser.add_argument('--week', type=int, default=None, help="Week number for the weekly report (defaults to the week containing --at)")
+        parser.add_argument('--output', type=str, default=None, help="Write results as JSON to this file")
+        parser.add_argument('--baseline', type=str, default=None, help="Compare against a previous --output file")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown / memory growth against the baseline")
+        parser.add_argument('--eager', action='store_true', help="Run Celery tasks inline instead of sending them to the broker")
+
+    def handle(self, *args, **options):
+        now = self.benchmark_now(options['at'])
+        celery_app.conf.task_always_eager = options['eager']
+        with override_settings(QUERY_METRICS_ENABLED=True), mock.patch('django.utils.timezone.now', return_value=now):
+            context = self.build_context(now, options['week'])
+            results, over_budget = [], []
+            for name in options['only'] or sorted(CASES):
+                case = CASES[name](context)
+                try:
+                    result = measure(
+                        name, case['func'], options['repeat'], case.get('setup'), case.get('teardown'), case.get('budget')
+                    )
+                except QueryBudgetExceeded as e:
+                    over_budget.append(str(e))
+                    self.stdout.write(self.style.ERROR(str(e)))
+                    continue
+                results.append(result.as_dict())
+                self.stdout.write(
+                    f"{name:<22} median {result.as_dict()['wall_ms_median']:>10.2f} ms  "
+                    f"min {result.as_dict()['wall_ms_min']:>10.2f} ms  "
+                    f"{result.queries:>5} queries ({result.duplicates} dup, {result.db_ms:.1f} ms)  "
+                    f"peak {result.peak_kb:>10.1f} KiB"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({'at': now.isoformat(), 'results': results}, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                regressions = compare(results, json.load(baseline)['results'], options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(regression))
+                raise CommandError(f"{len(regressions)} benchmark regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+        if over_budget:
+            raise CommandError(f"{len(over_budget)} benchmarks exceeded their query budget")
+
+    def benchmark_now(self, at):
+        if at:
+            return timezone.make_aware(datetime.fromisoformat(at)).astimezone(timezone.utc)
+        # Default to 10:30 on the most recent working day so check-in/out is allowed.
+        day = timezone.localdate()
+        while not HolidayCalendarService.is_working_day(day):
+            day -= timedelta(days=1)
+        return timezone.make_aware(datetime.combine(day, time(10, 30))).astimezone(timezone.utc)
+
+    def build_context(self, now, week):
+        now_local = timezone.localtime(now)
+        today = now_local.date()
+        authorized_user = get_user_model().objects.filter(user_type='authorized').first()
+        if authorized_user is None:
+            raise CommandError('No authorized user found; run seed_benchmark_data first')
+        employee = (
+            Employee.objects.filter(registration_datetime__lt=now, user__user_type='employee')
+            .exclude(attendances__date=today, attendances__status='on_leave')
+            .select_related('user').order_by('id').first()
+        )
+        if employee is None:
+            raise CommandError('No employee available for the check-in benchmark')
+        if week is None:
+            first_day = today.replace(day=1)
+            first_monday = first_day.toordinal() + (7 - first_day.weekday()) % 7
+            week = max((today.toordinal() - first_monday) // 7 + 1, 1)
+        return BenchmarkContext(now, today.year, today.month, week, employee, authorized_user)
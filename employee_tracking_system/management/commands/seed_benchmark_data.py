@@ -0,0 +1,158 @@
+import random
+from datetime import date, datetime, time, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from employee.models import Employee
+from attendance.models import Attendance
+from leave.models import Leave
+from notification.models import Notification
+from employee_tracking_system.services.holiday_calendar_service import HolidayCalendarService
+from employee_tracking_system.services.working_hours_service import WorkingHoursService
+
+USERNAME_PREFIX = 'bench_'
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with synthetic employees, sessions, leaves and notifications for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=200, help="Number of employees to create")
+        parser.add_argument('--days', type=int, default=60, help="Number of days of history per employee")
+        parser.add_argument('--end-date', type=str, default=None, help="Last seeded day (YYYY-MM-DD), defaults to today")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, so runs are reproducible")
+        parser.add_argument('--authorized', type=int, default=2, help="How many of the employees are authorized users")
+        parser.add_argument('--batch-size', type=int, default=5000, help="bulk_create batch size")
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded benchmark users first")
+
+    def handle(self, *args, **options):
+        if options['employees'] < 1 or options['days'] < 1:
+            raise CommandError('--employees and --days must be positive')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        end_date = date.fromisoformat(options['end_date']) if options['end_date'] else timezone.localdate()
+        start_date = end_date - timedelta(days=options['days'] - 1)
+
+        if options['clear']:
+            deleted, _ = get_user_model().objects.filter(username__startswith=USERNAME_PREFIX).delete()
+            self.stdout.write(f'Deleted {deleted} previously seeded rows')
+
+        with transaction.atomic():
+            employees = self.create_employees(options['employees'], options['authorized'], start_date, end_date)
+            leave_days = self.create_leaves(employees, start_date, end_date)
+            session_count = self.create_sessions(employees, start_date, end_date, leave_days)
+            notification_count = self.create_notifications(employees, start_date, end_date)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(employees)} employees, {session_count} attendance rows, '
+            f'{sum(len(days) for days in leave_days.values())} leave days and {notification_count} notifications '
+            f'for {start_date} - {end_date}'
+        ))
+
+    def create_employees(self, count, authorized, start_date, end_date):
+        User = get_user_model()
+        offset = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        users = User.objects.bulk_create([
+            User(
+                username=f'{USERNAME_PREFIX}{offset + idx:06d}',
+                user_type='authorized' if idx < authorized else 'employee',
+                password='!'
+            )
+            for idx in range(count)
+        ], batch_size=self.batch_size)
+        if not all(user.pk for user in users):
+            users = list(User.objects.filter(username__in=[user.username for user in users]).order_by('username'))
+        Employee.objects.bulk_create([Employee(user=user) for user in users], batch_size=self.batch_size)
+
+        employees = list(Employee.objects.filter(user__in=users).select_related('user').order_by('id'))
+        tz = timezone.get_default_timezone()
+        for employee in employees:
+            # Most employees predate the seeded window; a few join part-way through it.
+            if self.rng.random() < 0.05:
+                joined = start_date + timedelta(days=self.rng.randrange((end_date - start_date).days + 1))
+                employee.registration_datetime = timezone.make_aware(
+                    datetime.combine(joined, time(self.rng.randint(7, 18), self.rng.randint(0, 59))), tz
+                )
+            else:
+                employee.registration_datetime = timezone.make_aware(datetime.combine(start_date, time(0)), tz) - timedelta(days=365)
+        Employee.objects.bulk_update(employees, ['registration_datetime'], batch_size=self.batch_size)
+        return employees
+
+    def create_leaves(self, employees, start_date, end_date):
+        leaves, leave_days = [], {}
+        n_days = (end_date - start_date).days + 1
+        for employee in employees:
+            days = set()
+            for _ in range(self.rng.choice([0, 0, 1, 1, 2])):
+                leave_start = start_date + timedelta(days=self.rng.randrange(n_days))
+                leave_end = min(leave_start + timedelta(days=self.rng.randint(0, 4)), end_date)
+                leaves.append(Leave(
+                    employee=employee, start_date=leave_start, end_date=leave_end,
+                    reason='Synthetic benchmark leave', status=Leave.APPROVED
+                ))
+                days.update(leave_start + timedelta(days=offset) for offset in range((leave_end - leave_start).days + 1))
+            leave_days[employee.id] = days
+        Leave.objects.bulk_create(leaves, batch_size=self.batch_size)
+        return leave_days
+
+    def create_sessions(self, employees, start_date, end_date, leave_days):
+        now = timezone.localtime(timezone.now())
+        rows = []
+        created = 0
+        day = start_date
+        while day <= end_date:
+            start_of_work, end_of_work = WorkingHoursService.get_work_bounds(day)
+            is_working_day = HolidayCalendarService.is_working_day(day)
+            for employee in employees:
+                if employee.registration_datetime.date() > day:
+                    continue
+                if day in leave_days[employee.id]:
+                    if is_working_day:
+                        rows.append(Attendance(employee=employee, date=day, status='on_leave'))
+                    continue
+                if self.rng.random() > (0.9 if is_working_day else 0.03):
+                    continue
+                rows.extend(self.day_sessions(employee, day, start_of_work, end_of_work, now))
+            if len(rows) >= self.batch_size:
+                Attendance.objects.bulk_create(rows, batch_size=self.batch_size)
+                created += len(rows)
+                rows = []
+            day += timedelta(days=1)
+        Attendance.objects.bulk_create(rows, batch_size=self.batch_size)
+        return created + len(rows)
+
+    def day_sessions(self, employee, day, start_of_work, end_of_work, now):
+        sessions = []
+        check_in = start_of_work + timedelta(minutes=self.rng.gauss(10, 25))
+        for _ in range(self.rng.choice([1, 1, 1, 2, 2, 3])):
+            if check_in >= now:
+                break
+            check_out = check_in + timedelta(minutes=self.rng.randint(60, 300), seconds=self.rng.randint(0, 59))
+            if check_out >= now or (day == now.date() and self.rng.random() < 0.3):
+                sessions.append(Attendance(employee=employee, date=day, check_in=check_in, status='checked_in'))
+                break
+            sessions.append(Attendance(
+                employee=employee, date=day, check_in=check_in,
+                check_out=min(check_out, end_of_work + timedelta(minutes=30)), status='checked_out'
+            ))
+            check_in = check_out + timedelta(minutes=self.rng.randint(5, 90))
+            if check_in >= end_of_work:
+                break
+        return sessions
+
+    def create_notifications(self, employees, start_date, end_date):
+        severities = [choice for choice, _ in Notification.SEVERITY_CHOICES]
+        notifications = [
+            Notification(
+                user=employee.user,
+                message=f'Synthetic notification {idx} for {employee.user.username}',
+                type=self.rng.choice(['persistent', 'temporary']),
+                severity=self.rng.choice(severities),
+                is_read=self.rng.random() < 0.7,
+            )
+            for employee in employees
+            for idx in range(self.rng.randint(0, max((end_date - start_date).days // 7, 1)))
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=self.batch_size)
+        return len(notifications)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from employee_tracking_system.utils.query_metrics import QueryMetrics
+
+
+class QueryMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_METRICS_ENABLED', False):
+            return self.get_response(request)
+
+        with QueryMetrics(f"{request.method} {request.path}") as metrics:
+            response = self.get_response(request)
+        # Streaming responses keep querying after this point; only the view's queries are counted.
+        metrics.log()
+        if settings.DEBUG:
+            for header, value in metrics.headers().items():
+                response[header] = value
+        return response
@@ -0,0 +1,2 @@
+from .working_hours import WorkingHours
+from .holiday_calendar import HolidayCalendar
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class HolidayCalendar(models.Model):
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'employee_tracking_system'
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} - {self.name}"
@@ -0,0 +1,102 @@
+from employee_tracking_system.models.holiday_calendar import HolidayCalendar
+from employee_tracking_system.utils.versioned_cache import VersionedLocalCache
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+HOLIDAY_CALENDAR_VERSION_KEY = 'holiday_calendar:version'
+
+
+def _load_holidays() -> dict:
+    return {
+        'holidays': frozenset(HolidayCalendar.objects.values_list('date', flat=True)),
+        'years': {},
+    }
+
+
+class HolidayCalendarService:
+    _cache = VersionedLocalCache(
+        HOLIDAY_CALENDAR_VERSION_KEY,
+        _load_holidays,
+        getattr(settings, 'HOLIDAY_CALENDAR_VERSION_CHECK_INTERVAL', 60)
+    )
+
+    @staticmethod
+    def invalidate():
+        HolidayCalendarService._cache.invalidate()
+
+    @staticmethod
+    def reload():
+        HolidayCalendarService._cache.clear_local()
+
+    @staticmethod
+    def get_holidays() -> frozenset:
+        return HolidayCalendarService._cache.get()['holidays']
+
+    @staticmethod
+    def _year_table(year: int) -> Tuple[np.ndarray, np.ndarray]:
+        state = HolidayCalendarService._cache.get()
+        table = state['years'].get(year)
+        if table is None:
+            first_day = date(year, 1, 1)
+            n_days = (date(year + 1, 1, 1) - first_day).days
+            weekdays = (first_day.weekday() + np.arange(n_days)) % 7
+            working = weekdays < 5
+            for holiday in state['holidays']:
+                if holiday.year == year:
+                    working[(holiday - first_day).days] = False
+            prefix = np.zeros(n_days + 1, dtype=np.int32)
+            np.cumsum(working, out=prefix[1:])
+            table = (working, prefix)
+            state['years'][year] = table
+        return table
+
+    @staticmethod
+    def is_working_day(day: date) -> bool:
+        working, _ = HolidayCalendarService._year_table(day.year)
+        return bool(working[day.timetuple().tm_yday - 1])
+
+    @staticmethod
+    def split_working_days_by_year(start_date: date, end_date: date) -> Dict[int, int]:
+        years = {}
+        for year in range(start_date.year, end_date.year + 1):
+            _, prefix = HolidayCalendarService._year_table(year)
+            first = start_date.timetuple().tm_yday - 1 if year == start_date.year else 0
+            last = end_date.timetuple().tm_yday if year == end_date.year else len(prefix) - 1
+            years[year] = int(prefix[last] - prefix[first])
+        return years
+
+    @staticmethod
+    def count_working_days(start_date: date, end_date: date) -> int:
+        if start_date > end_date:
+            return 0
+        return sum(HolidayCalendarService.split_working_days_by_year(start_date, end_date).values())
+
+    @staticmethod
+    def working_days_between(start_date: date, end_date: date) -> List[date]:
+        working_days = []
+        for year in range(start_date.year, end_date.year + 1):
+            working, _ = HolidayCalendarService._year_table(year)
+            first = start_date.timetuple().tm_yday - 1 if year == start_date.year else 0
+            last = end_date.timetuple().tm_yday if year == end_date.year else len(working)
+            year_start = date(year, 1, 1)
+            working_days.extend(
+                year_start + timedelta(days=int(offset))
+                for offset in np.flatnonzero(working[first:last]) + first
+            )
+        return working_days
+
+
+@receiver(post_save, sender=HolidayCalendar)
+@receiver(post_delete, sender=HolidayCalendar)
+def holiday_calendar_changed(sender, instance, **kwargs):
+    # Same as working hours: a bump before commit lets other workers cache the old calendar under the new version.
+    transaction.on_commit(HolidayCalendarService.invalidate)
+    logger.info(f"Holiday calendar changed, cache invalidated: {instance}")
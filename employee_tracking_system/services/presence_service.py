@@ -0,0 +1,63 @@
+from django.conf import settings
+from django_redis import get_redis_connection
+from typing import Iterable, Set
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_KEY = 'presence:{group}'
+
+
+# Each group is a sorted set of channel names scored by when their heartbeat expires,
+# so connections of a crashed worker drop out without ever disconnecting.
+class PresenceService:
+    def __init__(self, connection=None):
+        self._connection = connection
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_redis_connection("default")
+        return self._connection
+
+    @staticmethod
+    def presence_key(group: str) -> str:
+        return PRESENCE_KEY.format(group=group)
+
+    def heartbeat(self, groups: Iterable[str], channel_name: str):
+        now = time.time()
+        try:
+            pipe = self.connection.pipeline()
+            for group in groups:
+                key = self.presence_key(group)
+                pipe.zremrangebyscore(key, '-inf', now)
+                pipe.zadd(key, {channel_name: now + settings.PRESENCE_TTL})
+                pipe.expire(key, settings.PRESENCE_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record presence of {channel_name}: {e}")
+
+    def leave(self, groups: Iterable[str], channel_name: str):
+        try:
+            pipe = self.connection.pipeline()
+            for group in groups:
+                pipe.zrem(self.presence_key(group), channel_name)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to clear presence of {channel_name}: {e}")
+
+    def listening(self, groups: Iterable[str]) -> Set[str]:
+        groups = list(groups)
+        if not groups:
+            return set()
+        try:
+            pipe = self.connection.pipeline()
+            for group in groups:
+                pipe.zcount(self.presence_key(group), time.time(), '+inf')
+            counts = pipe.execute()
+        except Exception as e:
+            # Without presence every group counts as listened to, so nobody misses an update.
+            logger.warning(f"Presence unavailable, sending to all {len(groups)} groups: {e}")
+            return set(groups)
+        return {group for group, count in zip(groups, counts) if count}
@@ -1,28 +1,81 @@
 from employee_tracking_system.models.working_hours import WorkingHours
+from employee_tracking_system.utils.versioned_cache import VersionedLocalCache
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, date
+from typing import Tuple
 import logging
 
 logger = logging.getLogger(__name__)
+
+WORKING_HOURS_VERSION_KEY = 'working_hours:version'
+MAX_CACHED_BOUNDS = 1024
+
+
+def _load_working_hours() -> dict:
+    working_hours = WorkingHours.get_current()
+    if not working_hours:
+        logger.error("No current WorkingHours configuration found.")
+        raise ValueError("Working hours configuration is missing.")
+    return {
+        'working_hours': {
+            'start_time': working_hours.start_time,
+            'end_time': working_hours.end_time
+        },
+        'bounds': {},
+    }
+
+
 class WorkingHoursService:
+    _cache = VersionedLocalCache(
+        WORKING_HOURS_VERSION_KEY,
+        _load_working_hours,
+        getattr(settings, 'WORKING_HOURS_VERSION_CHECK_INTERVAL', 5)
+    )
+
+    @staticmethod
+    def invalidate():
+        WorkingHoursService._cache.invalidate()
+
+    @staticmethod
+    def reload():
+        WorkingHoursService._cache.clear_local()
+
     @staticmethod
     def get_working_hours():
-        working_hours = WorkingHours.get_current()
-        if not working_hours:
-            logger.error("No current WorkingHours configuration found.")
-            raise ValueError("Working hours configuration is missing.")
-        return {
-            'start_time': working_hours.start_time, 
-            'end_time': working_hours.end_time
-        }
-    
+        return dict(WorkingHoursService._cache.get()['working_hours'])
+
+    @staticmethod
+    def get_work_bounds(day: date) -> Tuple[datetime, datetime]:
+        state = WorkingHoursService._cache.get()
+        bounds = state['bounds'].get(day)
+        if bounds is None:
+            working_hours = state['working_hours']
+            bounds = (
+                timezone.localtime(timezone.make_aware(datetime.combine(day, working_hours['start_time']))),
+                timezone.localtime(timezone.make_aware(datetime.combine(day, working_hours['end_time']))),
+            )
+            if len(state['bounds']) >= MAX_CACHED_BOUNDS:
+                state['bounds'].clear()
+            state['bounds'][day] = bounds
+        return bounds
+
     @staticmethod
     def is_working_hours(current_time: datetime) -> bool:
         try:
-            working_hours = WorkingHoursService.get_working_hours()
-            start_work_dt = timezone.make_aware(datetime.combine(current_time.date(), working_hours['start_time']))
-            end_work_dt = timezone.make_aware(datetime.combine(current_time.date(), working_hours['end_time']))
+            start_work_dt, end_work_dt = WorkingHoursService.get_work_bounds(current_time.date())
             return start_work_dt <= current_time <= end_work_dt
         except Exception as e:
             logger.error(f"Error in is_working_hours: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def working_hours_changed(sender, instance, **kwargs):
+    # Bumped after commit, otherwise another worker could reload the old rows under the new version.
+    transaction.on_commit(WorkingHoursService.invalidate)
+    logger.info(f"Working hours changed, cache invalidated: {instance.start_time}-{instance.end_time}")
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'employee_tracking_system.middleware.QueryMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -148,6 +149,49 @@ WEEKLY_REPORT_CACHE_TIMEOUT = 60 * 60 * 12
 
 MONTHLY_REPORT_CACHE_TIMEOUT = 60 * 60 * 24 
 
+RANGE_REPORT_CACHE_TIMEOUT = 60 * 15
+
+REPORT_LOCK_TIMEOUT = 60
+
+REPORT_LOCK_WAIT = 15
+
+REPORT_STALE_GRACE = 60 * 60
+
+REPORT_EARLY_REFRESH_BETA = 1.0
+
+EXPORT_CHUNK_SIZE = 2000
+
+REPORT_SHARD_SIZE = 200
+
+REPORT_SHARD_LOCAL = False
+
+REPORT_LOCAL_WORKERS = None
+
+ATTENDANCE_FANOUT_COALESCE_SECONDS = 1
+
+LIVE_ATTENDANCE_TTL = 60 * 60 * 48
+
+REALTIME_FINGERPRINT_TTL = 60 * 60 * 24
+
+REALTIME_DELTA_LOG_SIZE = 500
+
+PRESENCE_HEARTBEAT_INTERVAL = 30
+
+PRESENCE_TTL = 90
+
+INGEST_MAX_EVENTS = 10000
+
+INGEST_EMPLOYEES_PER_TRANSACTION = 500
+
+# Off in production by default; the benchmark command and the query-count tests switch it on explicitly.
+QUERY_METRICS_ENABLED = os.environ.get('QUERY_METRICS_ENABLED', str(DEBUG)).lower() == 'true'
+
+QUERY_METRICS_WARN_QUERIES = 50
+
+WORKING_HOURS_VERSION_CHECK_INTERVAL = 5
+
+HOLIDAY_CALENDAR_VERSION_CHECK_INTERVAL = 60
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 
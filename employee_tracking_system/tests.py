@@ -0,0 +1,54 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from employee_tracking_system.middleware import QueryMetricsMiddleware
+from employee_tracking_system.services.presence_service import PresenceService
+
+
+def count_users(request):
+    get_user_model().objects.count()
+    return HttpResponse()
+
+
+class QueryMetricsMiddlewareTests(TestCase):
+    def request(self):
+        return QueryMetricsMiddleware(count_users)(RequestFactory().get('/attendance/'))
+
+    @override_settings(QUERY_METRICS_ENABLED=True, DEBUG=True)
+    def test_enabled_metrics_report_query_headers(self):
+        response = self.request()
+        self.assertEqual(response['X-DB-Query-Count'], '1')
+        self.assertEqual(response['X-DB-Duplicate-Queries'], '0')
+
+    @override_settings(QUERY_METRICS_ENABLED=False, DEBUG=True)
+    def test_disabled_metrics_leave_the_response_alone(self):
+        self.assertNotIn('X-DB-Query-Count', self.request())
+
+
+class PresenceServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = PresenceService()
+
+    def test_only_groups_with_live_heartbeats_are_listening(self):
+        self.service.heartbeat(['user_1_employee_attendance', 'authorized_attendance'], 'channel-a')
+        self.service.heartbeat(['user_2_employee_attendance'], 'channel-b')
+        self.service.leave(['user_2_employee_attendance'], 'channel-b')
+        groups = ['user_1_employee_attendance', 'user_2_employee_attendance', 'user_3_employee_attendance', 'authorized_attendance']
+        self.assertEqual(self.service.listening(groups), {'user_1_employee_attendance', 'authorized_attendance'})
+
+    @override_settings(PRESENCE_TTL=90)
+    def test_missed_heartbeats_drop_out(self):
+        with mock.patch('employee_tracking_system.services.presence_service.time.time', return_value=1000):
+            self.service.heartbeat(['authorized_attendance'], 'channel-a')
+        with mock.patch('employee_tracking_system.services.presence_service.time.time', return_value=1089):
+            self.assertEqual(self.service.listening(['authorized_attendance']), {'authorized_attendance'})
+        with mock.patch('employee_tracking_system.services.presence_service.time.time', return_value=1091):
+            self.assertEqual(self.service.listening(['authorized_attendance']), set())
+
+    def test_unavailable_presence_counts_every_group_as_listening(self):
+        connection = mock.Mock()
+        connection.pipeline.side_effect = ConnectionError('Redis is down')
+        self.assertEqual(PresenceService(connection).listening(['a', 'b']), {'a', 'b'})
@@ -0,0 +1,122 @@
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import connections
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+def query_template(sql: str) -> str:
+    # ORM SQL is already parameterised; collapse IN lists and inlined numbers so
+    # the same query issued for different ids counts as one template.
+    return _NUMBER.sub('N', _IN_LIST.sub('(%s, ...)', sql))
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryMetrics:
+    def __init__(self, label: str = ''):
+        self.label = label
+        self.count = 0
+        self.db_time = 0.0
+        self.templates: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stack: Optional[ExitStack] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.count += 1
+                self.db_time += elapsed
+                self.templates[query_template(sql)] += 1
+
+    def start(self) -> 'QueryMetrics':
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def stop(self) -> 'QueryMetrics':
+        if self._stack is not None:
+            self._stack.close()
+            self._stack = None
+        return self
+
+    def __enter__(self) -> 'QueryMetrics':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def db_time_ms(self) -> float:
+        return self.db_time * 1000
+
+    def duplicates(self) -> List[Tuple[str, int]]:
+        return [(template, count) for template, count in self.templates.most_common() if count > 1]
+
+    def summary(self) -> str:
+        duplicates = self.duplicates()
+        summary = f"{self.label}: {self.count} queries, {self.db_time_ms:.1f} ms in the database"
+        if duplicates:
+            worst, times = duplicates[0]
+            summary += f", {len(duplicates)} duplicated templates (worst x{times}: {worst[:200]})"
+        return summary
+
+    def log(self):
+        threshold = getattr(settings, 'QUERY_METRICS_WARN_QUERIES', 50)
+        if self.count > threshold or any(count > threshold // 5 for _, count in self.duplicates()):
+            logger.warning(f"Query-heavy {self.summary()}")
+        else:
+            logger.debug(self.summary())
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            'X-DB-Query-Count': str(self.count),
+            'X-DB-Time-Ms': f"{self.db_time_ms:.1f}",
+            'X-DB-Duplicate-Queries': str(sum(count - 1 for _, count in self.duplicates())),
+        }
+
+    def check_budget(self, budget: int):
+        if self.count > budget:
+            details = '\n'.join(f"  x{count}: {template}" for template, count in self.duplicates()[:5])
+            raise QueryBudgetExceeded(
+                f"{self.label or 'Block'} ran {self.count} queries, budget is {budget}"
+                + (f"; duplicated templates:\n{details}" if details else '')
+            )
+
+
+@contextmanager
+def query_budget(budget: int, label: str = ''):
+    metrics = QueryMetrics(label)
+    with metrics:
+        yield metrics
+    metrics.check_budget(budget)
+
+
+_task_metrics: Dict[str, QueryMetrics] = {}
+
+
+def task_started(task_id=None, task=None, **kwargs):
+    if getattr(settings, 'QUERY_METRICS_ENABLED', False) and task_id:
+        _task_metrics[task_id] = QueryMetrics(f"task {task.name if task else task_id}").start()
+
+
+def task_finished(task_id=None, **kwargs):
+    metrics = _task_metrics.pop(task_id, None)
+    if metrics is not None:
+        metrics.stop().log()
@@ -1,51 +1,48 @@
 from datetime import datetime, date, timedelta
 from typing import List, Union
 from django.utils import timezone  
+from employee_tracking_system.services.holiday_calendar_service import HolidayCalendarService
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TimeCalculator:
     @staticmethod
-    def is_working_day(day: Union[datetime, date], holidays: List[Union[datetime, date]] = None) -> bool:
-        if holidays is None:
-            holidays = []
-        if isinstance(day, datetime):
-            day = day.date()
-        return day.weekday() < 5 and day not in holidays
+    def _as_date(day: Union[datetime, date]) -> date:
+        return day.date() if isinstance(day, datetime) else day
 
     @staticmethod
-    def count_working_days(start_date: Union[datetime, date], end_date: Union[datetime, date], holidays: List[Union[datetime, date]] = None) -> int:
-        if holidays is None:
-            holidays = []
+    def _extra_holidays(start_date: date, end_date: date, holidays: List[Union[datetime, date]] = None) -> set:
+        if not holidays:
+            return set()
+        return {
+            holiday for holiday in map(TimeCalculator._as_date, holidays)
+            if start_date <= holiday <= end_date and HolidayCalendarService.is_working_day(holiday)
+        }
 
-        if isinstance(start_date, datetime):
-            start_date = start_date.date()
-        if isinstance(end_date, datetime):
-            end_date = end_date.date()
+    @staticmethod
+    def is_working_day(day: Union[datetime, date], holidays: List[Union[datetime, date]] = None) -> bool:
+        day = TimeCalculator._as_date(day)
+        if holidays and day in set(map(TimeCalculator._as_date, holidays)):
+            return False
+        return HolidayCalendarService.is_working_day(day)
 
-        working_days = 0
-        current_date = start_date
-        while current_date <= end_date:
-            if TimeCalculator.is_working_day(current_date, holidays):
-                working_days += 1
-            current_date += timedelta(days=1)
-        return working_days
+    @staticmethod
+    def count_working_days(start_date: Union[datetime, date], end_date: Union[datetime, date], holidays: List[Union[datetime, date]] = None) -> int:
+        start_date = TimeCalculator._as_date(start_date)
+        end_date = TimeCalculator._as_date(end_date)
+        if start_date > end_date:
+            return 0
+        working_days = HolidayCalendarService.count_working_days(start_date, end_date)
+        return working_days - len(TimeCalculator._extra_holidays(start_date, end_date, holidays))
 
     @staticmethod
     def split_leave_across_years(start_date: date, end_date: date, holidays: List[date] = None) -> dict:
-        if holidays is None:
-            holidays = []
-
-        years = {}
-        current_date = start_date
-        while current_date <= end_date:
-            year = current_date.year
-            if year not in years:
-                years[year] = 0
-            if TimeCalculator.is_working_day(current_date, holidays):
-                years[year] += 1
-            current_date += timedelta(days=1)
+        if start_date > end_date:
+            return {}
+        years = HolidayCalendarService.split_working_days_by_year(start_date, end_date)
+        for holiday in TimeCalculator._extra_holidays(start_date, end_date, holidays):
+            years[holiday.year] -= 1
         return years
 
     @staticmethod
@@ -94,10 +91,4 @@ class TimeCalculator:
             else:
                 up_to_day = (date(year, month + 1, 1) - timedelta(days=1)).day
 
-        working_days = []
-        for day in range(1, up_to_day + 1):
-            current_day = date(year, month, day)
-            if TimeCalculator.is_working_day(current_day):
-                working_days.append(current_day)
-
-        return working_days
\ No newline at end of file
+        return HolidayCalendarService.working_days_between(first_day, date(year, month, up_to_day))
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from typing import Any, Callable
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedLocalCache:
+    def __init__(self, version_key: str, loader: Callable[[], Any], check_interval: float = 5):
+        self.version_key = version_key
+        self.loader = loader
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._value = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def remote_version(self):
+        try:
+            cache.add(self.version_key, 0, timeout=None)
+            return cache.get(self.version_key)
+        except Exception as e:
+            logger.warning(f"Version lookup failed for {self.version_key}: {e}")
+            return None
+
+    def get(self) -> Any:
+        now = time.monotonic()
+        value = self._value
+        if value is not None and now - self._checked_at < self.check_interval:
+            return value
+        with self._lock:
+            if self._value is not None and now - self._checked_at < self.check_interval:
+                return self._value
+            version = self.remote_version()
+            if self._value is None or version is None or version != self._version:
+                self._value = self.loader()
+                self._version = version
+                logger.debug(f"Reloaded {self.version_key} (version={version})")
+            self._checked_at = now
+            return self._value
+
+    def invalidate(self):
+        try:
+            cache.add(self.version_key, 0, timeout=None)
+            cache.incr(self.version_key)
+        except Exception as e:
+            logger.warning(f"Version bump failed for {self.version_key}: {e}")
+        self.clear_local()
+
+    def clear_local(self):
+        with self._lock:
+            self._value = None
+            self._checked_at = 0.0
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['employee', 'status', 'start_date', 'end_date'], name='leave_employee_status_idx'),
+        ),
+    ]
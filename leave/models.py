@@ -26,6 +26,11 @@ class Leave(models.Model):
 
     objects = LeaveManager()  
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'status', 'start_date', 'end_date'], name='leave_employee_status_idx'),
+        ]
+
     def clean(self):
        
         if self.start_date > self.end_date:
@@ -1,4 +1,8 @@
+from channels.db import database_sync_to_async
+from django.utils import timezone
+from attendance.utils import get_realtime_snapshot_service, get_realtime_update_service
 from .base import BaseConsumer
+from urllib.parse import parse_qs
 import json
 import logging
 
@@ -11,6 +15,67 @@ class AuthorizedAttendanceConsumer(BaseConsumer):
     def get_update_type(self):
         return 'attendance_update'
 
+    async def connect(self):
+        await super().connect()
+        if self.is_authorized():
+            query = parse_qs(self.scope.get('query_string', b'').decode())
+            since = query.get('since', [None])[0]
+            day = query.get('day', [None])[0]
+            await self.send_state(int(since) if since and since.isdigit() else None, day)
+
+    def is_authorized(self):
+        return self.user.is_authenticated and getattr(self.user, 'user_type', None) == 'authorized'
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+            action = data.get('action')
+        except (json.JSONDecodeError, AttributeError):
+            data, action = {}, None
+        if action not in ('resync', 'resume'):
+            await super().receive(text_data)
+            return
+        if not self.is_authorized():
+            logger.warning("Rejected attendance %s from non-authorized user %s", action, self.user.id)
+            return
+        since = data.get('since') if action == 'resume' else None
+        await self.send_state(since if isinstance(since, int) else None, data.get('day'))
+
+    async def send_state(self, since=None, day=None):
+        # Replays the deltas after `since` when they belong to today's log and it still has them, otherwise sends a full snapshot.
+        try:
+            today = timezone.localdate()
+            if since is not None and day == today.isoformat():
+                deltas = await self.get_deltas(since, today)
+                if deltas is not None:
+                    for seq, messages in deltas:
+                        await self.send_frame('realtime_attendance_delta', today.isoformat(), seq, messages)
+                    return
+            snapshot = await self.get_snapshot()
+        except Exception as e:
+            logger.error(f"Error sending attendance state to user {self.user.id}: {e}")
+            return
+        await self.send_frame(
+            'realtime_attendance_snapshot', snapshot['day'], snapshot['seq'], snapshot['data'], snapshot['server_time']
+        )
+
+    @database_sync_to_async
+    def get_snapshot(self):
+        return get_realtime_update_service().get_authorized_snapshot(timezone.localtime(timezone.now()))
+
+    @database_sync_to_async
+    def get_deltas(self, since, day):
+        return get_realtime_snapshot_service().deltas_since(since, day)
+
+    async def send_frame(self, frame_type, day, seq, messages, server_time=None):
+        await self.send(text_data=json.dumps({
+            'type': frame_type,
+            'day': day,
+            'seq': seq,
+            'server_time': server_time or timezone.localtime(timezone.now()).isoformat(),
+            'data': messages
+        }))
+
     async def realtime_attendance_update(self, event):
         message = event.get('message')
         if message:
@@ -19,4 +84,9 @@ class AuthorizedAttendanceConsumer(BaseConsumer):
                 'data': message
             }))
         else:
-            logger.warning("Received 'realtime_attendance_update' without message: %s", event)
\ No newline at end of file
+            logger.warning("Received 'realtime_attendance_update' without message: %s", event)
+
+    async def realtime_attendance_delta(self, event):
+        await self.send_frame(
+            'realtime_attendance_delta', event.get('day'), event.get('seq'), event.get('message', []), event.get('server_time')
+        )
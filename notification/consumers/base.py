@@ -1,11 +1,12 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from .presence import PresenceMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class BaseConsumer(AsyncWebsocketConsumer):
+class BaseConsumer(PresenceMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"]
         if self.user.is_authenticated:
@@ -13,11 +14,13 @@ class BaseConsumer(AsyncWebsocketConsumer):
                 self.get_group_name(),
                 self.channel_name
             )
+            await self.start_presence(self.get_group_name())
             await self.accept()
         else:
             await self.close()
 
     async def disconnect(self, close_code):
+        await self.stop_presence()
         if self.user.is_authenticated:
             await self.channel_layer.group_discard(
                 self.get_group_name(),
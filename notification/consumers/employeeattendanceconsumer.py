@@ -1,11 +1,14 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 from asgiref.sync import sync_to_async
+from django.utils import timezone
+from attendance.utils import get_realtime_update_service
+from .presence import PresenceMixin
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-class EmployeeAttendanceConsumer(AsyncWebsocketConsumer):
+class EmployeeAttendanceConsumer(PresenceMixin, AsyncWebsocketConsumer):
     async def connect(self):
         try:
             employee = await self.get_employee()
@@ -15,6 +18,7 @@ class EmployeeAttendanceConsumer(AsyncWebsocketConsumer):
                 self.group_name,
                 self.channel_name
             )
+            await self.start_presence(self.group_name)
             await self.accept()
             logger.info(f"User {self.scope['user'].id} connected to group {self.group_name}")
         except AttributeError:
@@ -29,12 +33,34 @@ class EmployeeAttendanceConsumer(AsyncWebsocketConsumer):
         return self.scope["user"].employee
 
     async def disconnect(self, close_code):
+        await self.stop_presence()
         await self.channel_layer.group_discard(
             self.group_name,
             self.channel_name
         )
         logger.info(f"User disconnected from group {self.group_name}")
 
+    async def receive(self, text_data):
+        try:
+            action = json.loads(text_data).get('action')
+        except (json.JSONDecodeError, AttributeError):
+            action = None
+        if action != 'resync':
+            logger.warning("Ignoring unsupported message from employee attendance socket: %s", text_data)
+            return
+        try:
+            message = await self.get_own_snapshot()
+        except Exception as e:
+            logger.error(f"Error building attendance resync for group {self.group_name}: {e}")
+            return
+        employee_id = message.pop('id')
+        await self.employee_realtime_attendance_update({'message': message, 'id': employee_id})
+
+    @sync_to_async
+    def get_own_snapshot(self):
+        employee = self.scope["user"].employee
+        return get_realtime_update_service().build_snapshot([employee], timezone.localtime(timezone.now()))[0]
+
     async def employee_realtime_attendance_update(self, event):
         message = event.get('message')
         employee_id = event.get('id')
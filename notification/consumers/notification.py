@@ -18,7 +18,7 @@ class NotificationConsumer(BaseConsumer):
 
     @database_sync_to_async
     def get_existing_notifications(self):
-        return list(Notification.objects.filter(user=self.user, is_read=False).values(
+        return list(Notification.objects.filter(user=self.user, is_read=False).order_by('-created_at').values(
             'id', 'message', 'created_at', 'type', 'severity'
         ))
 
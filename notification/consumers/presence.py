@@ -0,0 +1,26 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from employee_tracking_system.services.presence_service import PresenceService
+import asyncio
+
+
+class PresenceMixin:
+    presence_service = PresenceService()
+
+    async def start_presence(self, *groups):
+        self.presence_groups = groups
+        await sync_to_async(self.presence_service.heartbeat)(groups, self.channel_name)
+        self.presence_task = asyncio.ensure_future(self._presence_heartbeat())
+
+    async def stop_presence(self):
+        task = getattr(self, 'presence_task', None)
+        if task is None:
+            return
+        task.cancel()
+        self.presence_task = None
+        await sync_to_async(self.presence_service.leave)(self.presence_groups, self.channel_name)
+
+    async def _presence_heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_INTERVAL)
+            await sync_to_async(self.presence_service.heartbeat)(self.presence_groups, self.channel_name)
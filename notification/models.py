@@ -21,5 +21,11 @@ class Notification(models.Model):
     type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='temporary')
     severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES, default='info')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.created_at}"
\ No newline at end of file
@@ -1,3 +1,39 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from attendance.utils import get_realtime_snapshot_service
+from notification.consumers.authorizedattendanceconsumer import AuthorizedAttendanceConsumer
 
 
+class AuthorizedAttendanceResumeTests(SimpleTestCase):
+    # Monday 24 March 2025 with three recorded deltas.
+    def setUp(self):
+        cache.clear()
+        self.day = date(2025, 3, 24)
+        snapshot_service = get_realtime_snapshot_service()
+        for employee_id in (1, 2, 3):
+            snapshot_service.record([{'id': employee_id}], self.day)
+        self.consumer = AuthorizedAttendanceConsumer()
+        self.snapshot = {'day': self.day.isoformat(), 'seq': 3, 'server_time': '2025-03-24T10:00:00+03:00', 'data': []}
+
+    def frames(self, since, day):
+        with mock.patch('django.utils.timezone.localdate', return_value=self.day), \
+                mock.patch.object(self.consumer, 'get_snapshot', new=mock.AsyncMock(return_value=self.snapshot)), \
+                mock.patch.object(self.consumer, 'send_frame') as send_frame:
+            async_to_sync(self.consumer.send_state)(since, day)
+        return [(call.args[0], call.args[1], call.args[2]) for call in send_frame.call_args_list]
+
+    def test_resume_replays_the_missed_deltas(self):
+        self.assertEqual(self.frames(1, '2025-03-24'), [
+            ('realtime_attendance_delta', '2025-03-24', 2),
+            ('realtime_attendance_delta', '2025-03-24', 3),
+        ])
+
+    def test_resume_from_another_day_gets_a_snapshot(self):
+        self.assertEqual(self.frames(1, '2025-03-21'), [('realtime_attendance_snapshot', '2025-03-24', 3)])
+
+    def test_resume_beyond_the_log_gets_a_snapshot(self):
+        self.assertEqual(self.frames(7, '2025-03-24'), [('realtime_attendance_snapshot', '2025-03-24', 3)])
+        self.assertEqual(self.frames(None, None), [('realtime_attendance_snapshot', '2025-03-24', 3)])
@@ -2,6 +2,7 @@ import { notificationService } from './services/notificationService.js';
 import { authService } from './services/authService.js';
 import { API_URLS, ROUTE_URLS } from './constants.js';
 import { leaveService } from './services/leaveService.js';
+import { liveCounterService } from './services/liveCounterService.js';
 
 class AuthorizedDashboard {
   constructor() {
@@ -40,9 +41,33 @@ class AuthorizedDashboard {
     this.setupNotificationListeners();
     this.loadInitialData();
     this.setupWebSocketListeners(); 
+    this.startLocalCounters();
     this.setMinStartDate();
   }
 
+  startLocalCounters() {
+    // The server only pushes on state changes; growing counters are ticked here in between.
+    liveCounterService.addListener(() => {
+      const table = this.elements.employeeOverviewTable;
+      let changed = false;
+      table.rows().every(function () {
+        const rowData = this.data();
+        if (!liveCounterService.isGrowing(rowData.id)) {
+          return;
+        }
+        const values = liveCounterService.values(rowData.id);
+        rowData.lateness = liveCounterService.formatHoursMinutes(values.lateness);
+        rowData.work_duration = liveCounterService.formatHoursMinutes(values.work_duration);
+        rowData.remaining_leave = liveCounterService.formatLeave(values.remaining_leave);
+        this.data(rowData);
+        changed = true;
+      });
+      if (changed) {
+        table.draw(false);
+      }
+    });
+  }
+
   // Yeni showNotification Metodu
   showNotification(message, type) {
     const notification = document.createElement('div');
@@ -65,8 +90,12 @@ class AuthorizedDashboard {
   }
 
   setupWebSocketListeners() {
-    const wsUrl = API_URLS.WEBSOCKET.AUTHORIZED_ATTENDANCE;
+    // Resuming from the last sequence number of the day replays only the missed deltas; the first connection gets a snapshot.
+    const wsUrl = this.lastSeq === undefined || this.lastSeq === null
+      ? API_URLS.WEBSOCKET.AUTHORIZED_ATTENDANCE
+      : `${API_URLS.WEBSOCKET.AUTHORIZED_ATTENDANCE}?since=${this.lastSeq}&day=${this.lastDay}`;
     const socket = new WebSocket(wsUrl);
+    this.socket = socket;
 
     socket.onopen = () => {
       console.log('WebSocket connection established');
@@ -76,15 +105,21 @@ class AuthorizedDashboard {
     socket.onmessage = (event) => {
       const data = JSON.parse(event.data);
       console.log('WebSocket message received:', data);
-      console.log('data.message:', data.message); 
-      console.log('data.data:', data.data);       
       if (data.type === 'realtime_attendance_update') {
           this.updateEmployeeOverviewWithWebSocketData(data.data); 
+      } else if (data.type === 'realtime_attendance_snapshot') {
+          this.lastDay = data.day;
+          this.lastSeq = data.seq;
+          this.renderEmployeeOverview(data.data);
+          data.data.forEach(message => liveCounterService.update(message.id, message, data.server_time));
+      } else if (data.type === 'realtime_attendance_delta') {
+          this.applyAttendanceDelta(data);
       }
     };
 
     socket.onclose = () => {
-      console.log('WebSocket connection closed');
+      console.log('WebSocket connection closed. Trying to reconnect...');
+      setTimeout(() => this.setupWebSocketListeners(), 5000);
     };
 
     socket.onerror = (error) => {
@@ -92,6 +127,29 @@ class AuthorizedDashboard {
     };
   }
 
+  applyAttendanceDelta(data) {
+    if (data.day !== this.lastDay) {
+      // Sequence numbers restart every day, so a delta of another day needs a fresh snapshot.
+      this.socket.send(JSON.stringify({ action: 'resync' }));
+      return;
+    }
+    if (data.seq !== null && this.lastSeq !== undefined && this.lastSeq !== null) {
+      if (data.seq <= this.lastSeq) {
+        return;
+      }
+      if (data.seq > this.lastSeq + 1) {
+        // A delta went missing; the server replays everything after lastSeq, including this one.
+        this.socket.send(JSON.stringify({ action: 'resume', since: this.lastSeq, day: this.lastDay }));
+        return;
+      }
+    }
+    if (data.seq !== null) {
+      this.lastSeq = data.seq;
+    }
+    data.data.forEach(message => this.updateEmployeeOverviewWithWebSocketData(message, false, data.server_time));
+    this.elements.employeeOverviewTable.draw(false);
+  }
+
   setupEventListeners() {
     if (this.elements.addLeaveForm) {
       this.elements.addLeaveForm.addEventListener('submit', this.handleAddLeave.bind(this));
@@ -119,27 +177,10 @@ class AuthorizedDashboard {
   }
 
   loadInitialData() {
-    this.loadEmployeeOverview();
     this.loadLeaveRequests();
     this.loadEmployees();
   }
 
-  loadEmployeeOverview() {
-    authService.authenticatedFetch(API_URLS.EMPLOYEE.OVERVIEW, {
-      headers: {
-        'Authorization': `Token ${authService.getToken()}`
-      }
-    })
-    .then(data => {
-      console.log('Employee Overview Data:', data);
-      this.renderEmployeeOverview(data);
-    })
-    .catch(error => {
-      console.error('Error loading employee overview:', error);
-      this.showNotification('Failed to load employee overview', 'danger');
-    });
-  }
-
   renderEmployeeOverview(data) {
     if (!Array.isArray(data)) {
       console.error('Data is not an array:', data);
@@ -155,7 +196,7 @@ class AuthorizedDashboard {
     // "Update Leave" butonları kaldırıldığı için event listener eklemeye gerek yok
   }
 
-  updateEmployeeOverviewWithWebSocketData(message) {
+  updateEmployeeOverviewWithWebSocketData(message, redraw = true, serverTime = null) {
     const table = this.elements.employeeOverviewTable;
     const employeeId = message.id; // 'id' alanını kullanın
 
@@ -166,6 +207,7 @@ class AuthorizedDashboard {
 
     const row = table.row(`#${employeeId}`); // DataTables rowId kullanarak satırı buluyoruz
 
+    liveCounterService.update(employeeId, message, serverTime);
     if (row.any()) {
       // Mevcut satırı güncelleyin
       const rowData = row.data();
@@ -174,10 +216,17 @@ class AuthorizedDashboard {
       rowData.work_duration = message.work_duration;
       rowData.status = message.status;
       rowData.last_action_time = message.last_action_time; // 'last_action_time''ı 'check_in_time' olarak güncelleyin
-      table.row(row).data(rowData).draw(false);
+      table.row(row).data(rowData);
+      if (redraw) {
+        table.draw(false);
+      }
+    } else if (message.username) {
+      table.row.add(message);
+      if (redraw) {
+        table.draw(false);
+      }
     } else {
       console.warn(`Row for employee_id ${employeeId} not found. Cannot update existing row.`);
-      // Yeni satır eklemek istemiyorsanız, burada bir şey yapmanıza gerek yok
     }
   }
 
@@ -393,7 +442,6 @@ class AuthorizedDashboard {
         this.showNotification(data.message, 'success');
         this.elements.addLeaveForm.reset();
         this.loadLeaveRequests();
-        this.loadEmployeeOverview();
       } else if (data.error) {
         // Backend'den gelen hata mesajını göster
         const errorMessage = Array.isArray(data.error) ? data.error.join(' ') : data.error;
@@ -502,7 +550,6 @@ class AuthorizedDashboard {
         this.showNotification(responseData.message, 'success'); // responseData.message kullanıldı
         this.elements.updateLeaveBalanceForm.reset();
         this.elements.selectedEmployeeName.textContent = '';  // Seçilen çalışan adını temizle
-        this.loadEmployeeOverview();
       } else if (responseData.error) {
         const errorMessage = Array.isArray(responseData.error) ? responseData.error.join(' ') : responseData.error;
         this.showNotification(`Error: ${errorMessage}`, 'danger');
@@ -518,12 +565,10 @@ class AuthorizedDashboard {
   // Notification handlers
   handleEmployeeCheckIn(data) {
     this.showNotification(`${data.employee} checked in at ${data.time}`, 'info');
-    this.loadEmployeeOverview();
   }
 
   handleEmployeeCheckOut(data) {
     this.showNotification(`${data.employee} checked out at ${data.time}`, 'info');
-    this.loadEmployeeOverview();
   }
 
   handleLeaveRequest(data) {
@@ -533,17 +578,14 @@ class AuthorizedDashboard {
 
   handleLowLeaveBalance(data) {
     this.showNotification(`${data.employee}'s leave balance is below 3 days`, 'warning');
-    this.loadEmployeeOverview();
   }
 
   handleEmployeeLate(data) {
     this.showNotification(`${data.employee} was late by ${data.minutes} minutes`, 'warning');
-    this.loadEmployeeOverview();
   }
 
   handleNoCheckIn(data) {
     this.showNotification(`${data.employee} has not checked in today`, 'warning');
-    this.loadEmployeeOverview();
   }
 
   handleDetailedMonthlyReport(event) {
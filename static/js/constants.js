@@ -2,7 +2,7 @@ const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
 const wsHost = window.location.host;
 
 export const TIME_CONSTANTS = {
-  REFRESH_INTERVAL: 300000, // 5 minutes in milliseconds
+  COUNTER_TICK_INTERVAL: 10000, // 10 seconds in milliseconds
   NOTIFICATION_DURATION: 5000 // 5 seconds in milliseconds
 };
 
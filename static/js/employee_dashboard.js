@@ -2,7 +2,8 @@ import { notificationService } from './services/notificationService.js';
 import { authService } from './services/authService.js';
 import { attendanceService } from './services/attendanceService.js';
 import { leaveService } from './services/leaveService.js';
-import { API_URLS, ROUTE_URLS, TIME_CONSTANTS } from './constants.js';
+import { liveCounterService } from './services/liveCounterService.js';
+import { API_URLS, ROUTE_URLS } from './constants.js';
 
 class EmployeeDashboard {
     constructor() {
@@ -39,7 +40,7 @@ class EmployeeDashboard {
         this.setupEventListeners();
         this.setupNotificationListeners();
         this.refreshData();
-        this.startPeriodicRefresh();
+        this.startLocalCounters();
         this.updateWelcomeMessage();
         this.setMinStartDate();
     }
@@ -55,6 +56,7 @@ class EmployeeDashboard {
         const wsUrl = API_URLS.WEBSOCKET.EMPLOYEE_ATTENDANCE;
         this.socket = new WebSocket(wsUrl);
 
+        this.socket.onopen = () => this.socket.send(JSON.stringify({ action: 'resync' }));
         this.socket.onmessage = this.handleWebSocketMessage.bind(this);
         this.socket.onclose = this.handleWebSocketClose.bind(this);
         this.socket.onerror = this.handleWebSocketError.bind(this);
@@ -64,11 +66,12 @@ class EmployeeDashboard {
         const data = JSON.parse(event.data);
         console.log('WebSocket message received:', data);
     
-        if (data.event_type === 'employee_realtime_attendance_update' && data.id === currentEmployeeIdNumber) {
+        if (data.event_type === 'employee_realtime_attendance_update' && data.id === Number(this.currentEmployeeId)) {
             const message = data.data;
 
             if ( message.remaining_leave && message.lateness) {
 
+                liveCounterService.update(data.id, message);
                 this.updateRemainingLeaveDisplay(message.remaining_leave);
                 this.updateLatenessDisplay(message.lateness);
 
@@ -159,8 +162,16 @@ class EmployeeDashboard {
         });
     }
 
-    startPeriodicRefresh() {
-        setInterval(() => this.refreshData(), TIME_CONSTANTS.REFRESH_INTERVAL);
+    startLocalCounters() {
+        // The server only pushes on state changes; lateness and remaining leave are ticked here in between.
+        liveCounterService.addListener(() => {
+            const employeeId = Number(this.currentEmployeeId);
+            const values = liveCounterService.values(employeeId);
+            if (values && liveCounterService.isGrowing(employeeId)) {
+                this.updateLatenessDisplay(liveCounterService.formatHoursMinutes(values.lateness));
+                this.updateRemainingLeaveDisplay(liveCounterService.formatLeave(values.remaining_leave));
+            }
+        });
     }
 
     async refreshData() {
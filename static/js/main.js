@@ -1,6 +1,6 @@
 import { authService } from './services/authService.js';
 import { notificationService } from './services/notificationService.js';
-import { TIME_CONSTANTS, API_URLS, ROUTE_URLS } from './constants.js';
+import { API_URLS, ROUTE_URLS } from './constants.js';
 
 class App {
     constructor() {
@@ -74,7 +74,6 @@ class App {
     initializeApp() {
         if (authService.isAuthenticated()) {
             console.log('User is logged in.');
-            this.setupDataRefresh();
         } else {
             console.log('User is not logged in.');
             this.hideAttendanceElements();
@@ -86,17 +85,6 @@ class App {
           attendanceElements.forEach(el => el.style.display = 'none');
       }
 
-      setupDataRefresh() {
-        this.refreshData();
-        setInterval(() => this.refreshData(), TIME_CONSTANTS.REFRESH_INTERVAL);
-      }
-
-
-    refreshData() {
-        // Implement your data refresh logic here
-          console.log('Refreshing data...');
-    }
-
     updateNavbar() {
       const isLoggedIn = authService.isAuthenticated();
       const userType = authService.getUserType();
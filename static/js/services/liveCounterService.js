@@ -0,0 +1,75 @@
+import { TIME_CONSTANTS } from '../constants.js';
+
+// Extrapolates the real-time attendance counters locally: every counter grows by `rate`
+// seconds per second from the moment the payload arrived, until the payload's `valid_until`.
+class LiveCounterService {
+  constructor() {
+    this.entries = new Map();
+    this.listeners = new Set();
+    this.timer = null;
+  }
+
+  update(employeeId, message, serverTime = null) {
+    if (!message.counters) {
+      return;
+    }
+    const asOf = Date.parse(message.as_of);
+    const validUntil = message.valid_until ? Date.parse(message.valid_until) : null;
+    // A snapshot replays payloads computed earlier; backdate them by their age on the server clock.
+    const serverNow = serverTime ? Date.parse(serverTime) : NaN;
+    const ageMs = isNaN(serverNow) || isNaN(asOf) ? 0 : Math.max(serverNow - asOf, 0);
+    this.entries.set(employeeId, {
+      counters: message.counters,
+      receivedAt: Date.now() - ageMs,
+      // Both timestamps come from the server, so their difference is immune to client clock skew.
+      maxElapsedMs: validUntil !== null && !isNaN(asOf) ? Math.max(validUntil - asOf, 0) : 0,
+    });
+    this.start();
+  }
+
+  values(employeeId) {
+    const entry = this.entries.get(employeeId);
+    if (!entry) {
+      return null;
+    }
+    const elapsed = Math.floor(Math.min(Date.now() - entry.receivedAt, entry.maxElapsedMs) / 1000);
+    const values = {};
+    Object.entries(entry.counters).forEach(([name, counter]) => {
+      values[name] = counter.seconds + counter.rate * elapsed;
+    });
+    return values;
+  }
+
+  isGrowing(employeeId) {
+    const entry = this.entries.get(employeeId);
+    return Boolean(entry) && Object.values(entry.counters).some(counter => counter.rate !== 0);
+  }
+
+  addListener(listener) {
+    this.listeners.add(listener);
+  }
+
+  start() {
+    if (this.timer === null) {
+      this.timer = setInterval(() => this.listeners.forEach(listener => listener()), TIME_CONSTANTS.COUNTER_TICK_INTERVAL);
+    }
+  }
+
+  // Same formats as TimeCalculator.timedelta_to_hhmm and EmployeeService.get_remaining_leave_displayy.
+  formatHoursMinutes(seconds) {
+    const totalMinutes = Math.trunc(seconds / 60);
+    const hours = Math.trunc(totalMinutes / 60);
+    const minutes = totalMinutes - hours * 60;
+    return `${String(hours).padStart(2, '0')}:${String(minutes).padStart(2, '0')}`;
+  }
+
+  formatLeave(seconds) {
+    const days = Math.floor(seconds / 86400);
+    const remainder = seconds - days * 86400;
+    const hours = Math.floor(remainder / 3600);
+    const minutes = Math.floor((remainder % 3600) / 60);
+    return `${days}d ${hours}h ${minutes}m`;
+  }
+}
+
+export const liveCounterService = new LiveCounterService();